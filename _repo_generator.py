@@ -4,12 +4,15 @@
     and then update the md5 and addons.xml file
 """
 
-import re
 import os
+import gzip
+import json
+import time
 import shutil
 import hashlib
 import zipfile
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from xml.etree import ElementTree
 
 KODI_VERSIONS = ["krypton", "leia", "matrix", "nexus", "omega", "repo"]
@@ -23,8 +26,117 @@ IGNORE = [
     "venv",
 ]
 
-ADDON_RE = re.compile(r'(<addon id="(?!repository)(?P<id>.+?)".*?version="(?P<version>.+?)".*?</addon>)',
-                      re.DOTALL | re.MULTILINE)
+# the tree hashes of the last incremental build
+BUILD_CACHE = ".build_cache"
+MANIFEST = os.path.join(BUILD_CACHE, "manifest.json")
+
+ADDONS_XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<addons>\n'
+ADDONS_XML_FOOTER = "\n</addons>\n"
+
+
+def addon_files(addon_folder):
+    """
+    Yields (path, archive name) of every file of an addon that goes into its zip, in a stable order.
+    """
+    root_len = len(os.path.dirname(os.path.abspath(addon_folder)))
+
+    for root, dirs, files in os.walk(addon_folder):
+        # remove any unneeded artifacts
+        dirs[:] = sorted(d for d in dirs if d not in IGNORE)
+        files = sorted(f for f in files if not any(f.startswith(i) for i in IGNORE))
+
+        archive_root = os.path.abspath(root)[root_len:]
+
+        for f in files:
+            yield os.path.join(root, f), os.path.join(archive_root, f)
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST, encoding="utf-8") as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    os.makedirs(BUILD_CACHE, exist_ok=True)
+    with open(MANIFEST + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(MANIFEST + ".tmp", MANIFEST)
+
+
+def build_zip(release_path, addon_id, version, last_hash):
+    """
+    Builds the zip of an addon unless its source tree hashes to last_hash and the zip exists. Runs in a worker
+    process; returns (release, addon id, tree hash, seconds taken, built).
+    """
+    start = time.time()
+    addon_folder = os.path.join(release_path, addon_id)
+    zip_folder = os.path.join(release_path, "zips", addon_id)
+    final_zip = os.path.join(zip_folder, "{0}-{1}.zip".format(addon_id, version))
+
+    members = []
+    tree_hash = hashlib.sha1(str(version).encode("utf-8"))
+    for fullpath, archive_name in addon_files(addon_folder):
+        with open(fullpath, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        tree_hash.update("{0}\0{1}\0".format(archive_name, digest).encode("utf-8"))
+        members.append((fullpath, archive_name))
+    tree_hash = tree_hash.hexdigest()
+
+    # without a manifest entry, adopt an existing zip instead of rewriting an already published file
+    if (last_hash is None or tree_hash == last_hash) and os.path.exists(final_zip):
+        return release_path, addon_id, tree_hash, time.time() - start, False
+
+    os.makedirs(zip_folder, exist_ok=True)
+    tmp_zip = final_zip + ".tmp"
+    with zipfile.ZipFile(tmp_zip, "w", compression=zipfile.ZIP_DEFLATED) as zip:
+        for fullpath, archive_name in members:
+            with open(fullpath, "rb") as f:
+                data = f.read()
+            zinfo = zipfile.ZipInfo.from_file(fullpath, archive_name)
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+            zip.writestr(zinfo, data)
+    os.replace(tmp_zip, final_zip)
+
+    return release_path, addon_id, tree_hash, time.time() - start, True
+
+
+def build_incremental(generators):
+    """
+    Builds the zips of all releases' addons in a process pool, skipping addons whose source tree didn't change since
+    the last incremental build, then publishes each release's addons.xml with the addons that built successfully.
+    """
+    last_manifest = load_manifest()
+    # only keep entries of addons that are still in the tree
+    manifest = {}
+    built = dict((g.release_path, set()) for g in generators)
+    jobs = [(g.release_path, addon_id, version) for g in generators for addon_id, version in g.zip_jobs]
+    start = time.time()
+
+    with ProcessPoolExecutor() as executor:
+        futures = [executor.submit(build_zip, release, addon_id, version,
+                                   last_manifest.get("{0}/{1}".format(release, addon_id)))
+                   for release, addon_id, version in jobs]
+        for (release, addon_id, version), future in zip(jobs, futures):
+            try:
+                release, addon_id, tree_hash, took, rebuilt = future.result()
+            except Exception as e:
+                print("Failed building {0}/{1}: {2}".format(release, addon_id, e))
+                continue
+
+            manifest["{0}/{1}".format(release, addon_id)] = tree_hash
+            built[release].add(addon_id)
+            print("{0} {1}/{2} in {3:.2f}s".format("BUILT" if rebuilt else "UNCHANGED", release, addon_id, took))
+
+    save_manifest(manifest)
+    # member store of earlier builds, not used anymore
+    shutil.rmtree(os.path.join(BUILD_CACHE, "members"), ignore_errors=True)
+    print("Built {0} addons in {1:.2f}s".format(len(jobs), time.time() - start))
+
+    for g in generators:
+        g.publish(built[g.release_path])
 
 
 class Generator:
@@ -32,11 +144,20 @@ class Generator:
     Generates a new addons.xml file from each addons addon.xml file
     and a new addons.xml.md5 hash file. Must be run from the root of
     the checked-out repo.
+
+    In incremental mode the zips aren't built right away but collected in zip_jobs for build_incremental, which
+    publishes addons.xml once they're built.
     """
 
-    def __init__(self, release, onlyMD5=False):
+    def __init__(self, release, onlyMD5=False, incremental=False, compress=False):
         self.release_path = release
         self.zips_path = os.path.join(self.release_path, "zips")
+        self.incremental = incremental
+        self.compress = compress
+        self.zip_jobs = []
+        # (addon id, addon.xml root) of the addons found
+        self.addons = []
+        self.versions_seen = {}
 
         if not os.path.exists(self.zips_path):
             os.makedirs(self.zips_path)
@@ -45,7 +166,11 @@ class Generator:
             self._remove_binaries()
 
             self._generate_addons_file(release)
-        self._generate_md5_file()
+            if not incremental:
+                # also writes the md5 file
+                self.publish()
+        else:
+            self._generate_md5_file()
 
     def _remove_binaries(self):
         """
@@ -90,40 +215,22 @@ class Generator:
         final_zip = os.path.join(zip_folder, "{0}-{1}.zip".format(addon_id, version))
         if not os.path.exists(final_zip):
             print("CREATING ZIP FOR: {0} - version={1}".format(addon_id, version))
+            start = time.time()
             zip = zipfile.ZipFile(final_zip, "w", compression=zipfile.ZIP_DEFLATED)
-            root_len = len(os.path.dirname(os.path.abspath(addon_folder)))
-
-            for root, dirs, files in os.walk(addon_folder):
-                # remove any unneeded artifacts
-                for i in IGNORE:
-                    if i in dirs:
-                        try:
-                            dirs.remove(i)
-                        except:
-                            pass
-                    for f in files:
-                        if f.startswith(i):
-                            try:
-                                files.remove(f)
-                            except:
-                                pass
-
-                archive_root = os.path.abspath(root)[root_len:]
-
-                for f in files:
-                    fullpath = os.path.join(root, f)
-                    archive_name = os.path.join(archive_root, f)
-                    zip.write(fullpath, archive_name, zipfile.ZIP_DEFLATED)
+
+            for fullpath, archive_name in addon_files(addon_folder):
+                zip.write(fullpath, archive_name, zipfile.ZIP_DEFLATED)
 
             zip.close()
+            print("Created {0}-{1}.zip in {2:.2f}s".format(addon_id, version, time.time() - start))
 
-    def _copy_meta_files(self, addon_id, addon_folder):
+    def _copy_meta_files(self, addon_id, addon_folder, root=None):
         """
         Copy the addon.xml and relevant art files into the relevant folders in the repository.
         """
 
-        tree = ElementTree.parse(os.path.join(self.release_path, addon_id, "addon.xml"))
-        root = tree.getroot()
+        if root is None:
+            root = ElementTree.parse(os.path.join(self.release_path, addon_id, "addon.xml")).getroot()
 
         copyfiles = ["addon.xml"]
         for ext in root.findall("extension"):
@@ -145,19 +252,24 @@ class Generator:
             shutil.copy(addon_path, zips_path)
 
     def _get_existing_versions(self):
+        """
+        Yields (addon element, addon id, version) of the non-repository addons in the current addons.xml.
+        """
         try:
-            addons_xml = os.path.join(self.zips_path, "addons.xml")
-            f = open(addons_xml, encoding="utf-8").read()
-            return ADDON_RE.findall(f)
-        except IOError:
-            return {}
+            root = ElementTree.parse(os.path.join(self.zips_path, "addons.xml")).getroot()
+        except (IOError, ElementTree.ParseError) as e:
+            print("Couldn't read existing {0}/addons.xml: {1}".format(self.release_path, e))
+            return
+
+        for addon in root.iter("addon"):
+            addon_id = addon.get("id", "")
+            if addon_id and not addon_id.startswith("repository"):
+                yield addon, addon_id, addon.get("version")
 
     def _generate_addons_file(self, release_name):
         """
-        Generates a zip for each found addon, and updates the addons.xml file accordingly.
+        Generates a zip for each found addon (or collects it in zip_jobs in incremental mode).
         """
-        addons_xml = '<?xml version="1.0" encoding="UTF-8"?>\n<addons>\n'
-
         folders = [
             i
             for i in os.listdir(self.release_path)
@@ -167,83 +279,133 @@ class Generator:
             and os.path.exists(os.path.join(self.release_path, i, "addon.xml"))
         ]
 
-        existing_addons = self._get_existing_versions()
-        versions_seen = {}
-
-        for addon in folders:
+        for addon in sorted(folders):
             try:
                 _path = os.path.join(self.release_path, addon, "addon.xml")
-                xml_lines = open(_path, "r", encoding="utf-8").read().splitlines()
-                addon_xml = ""
-                version = None
-
-                # loop thru cleaning each line
-                ver_found = False
-                for line in xml_lines:
-                    if line.find("<?xml") >= 0:
-                        continue
-                    if 'version="' in line and not ver_found:
-                        version = re.compile('version="(.+?)"').findall(line)[0]
-                        ver_found = True
-                    addon_xml += line.rstrip() + "\n"
-                addons_xml += addon_xml.rstrip() + "\n\n"
+                root = ElementTree.parse(_path).getroot()
+                version = root.get("version")
 
                 if version:
-                    versions_seen[addon] = version
+                    self.versions_seen[addon] = version
 
                 # Create the zip files
-                self._create_zip(addon, version)
-                self._copy_meta_files(addon, os.path.join(self.zips_path, addon))
+                if self.incremental:
+                    self.zip_jobs.append((addon, version))
+                else:
+                    self._create_zip(addon, version)
+                self.addons.append((addon, root))
             except Exception as e:
                 print("Excluding {0}/{1}: {2}".format(release_name, _path, e))
 
-        # clean and add closing tag
-        addons_xml = addons_xml.strip()
+    def publish(self, built=None):
+        """
+        Updates the addons.xml (and md5) with the found addons, limited to built if given, so it never lists a
+        version whose zip doesn't exist.
+        """
+        addon_xmls = []
+
+        for addon, root in self.addons:
+            if built is not None and addon not in built:
+                print("Not publishing {0}/{1}, its zip wasn't built".format(self.release_path, addon))
+                continue
+
+            try:
+                self._copy_meta_files(addon, os.path.join(self.zips_path, addon), root=root)
+            except Exception as e:
+                print("Excluding {0}/{1}: {2}".format(self.release_path, addon, e))
+                continue
+            addon_xmls.append(self._serialize(root))
 
         # add old addons
-        for addon_xml, addon_id, version in existing_addons:
-            if addon_id in versions_seen and version != versions_seen[addon_id] \
+        for addon_element, addon_id, version in self._get_existing_versions():
+            if addon_id in self.versions_seen and version != self.versions_seen[addon_id] \
                     and os.path.exists(os.path.join(self.zips_path, addon_id, "{0}-{1}.zip".format(addon_id, version))):
-                print("Adding known addon: {}/{}:{}".format(release_name, addon_id, version))
-                addons_xml += "\n\n" + addon_xml.rstrip()
+                print("Adding known addon: {}/{}:{}".format(self.release_path, addon_id, version))
+                addon_xmls.append(self._serialize(addon_element))
+
+        try:
+            self._write_addons_xml(addon_xmls)
+        except Exception as e:
+            print("An error occurred saving {0}/addons.xml!\n{1}".format(self.release_path, e))
+            return
+        print("Successfully updated {}/addons.xml".format(self.release_path))
+
+    @staticmethod
+    def _serialize(element):
+        element.tail = None
+        return ElementTree.tostring(element, encoding="unicode").strip()
 
-        addons_xml += "\n</addons>\n"
-        self._save_file(
-            addons_xml.encode("utf-8"),
-            file=os.path.join(self.zips_path, "addons.xml"),
-            decode=True,
-        )
-        print("Successfully updated {}/addons.xml".format(release_name))
+    def _write_addons_xml(self, addon_xmls):
+        """
+        Streams addons.xml (and addons.xml.gz) to temporary files while hashing it, then publishes them together with
+        the md5 by renaming, so clients never see a partial addons.xml or one that doesn't match its md5.
+        """
+        addons_xml = os.path.join(self.zips_path, "addons.xml")
+        md5 = hashlib.md5()
+        published = [addons_xml]
+        gz = None
+
+        with open(addons_xml + ".tmp", "wb") as f:
+            if self.compress:
+                gz = gzip.GzipFile(addons_xml + ".gz.tmp", "wb", mtime=0)
+                published.append(addons_xml + ".gz")
+
+            def write(text):
+                data = text.encode("utf-8")
+                f.write(data)
+                md5.update(data)
+                if gz:
+                    gz.write(data)
+
+            write(ADDONS_XML_HEADER)
+            for i, addon_xml in enumerate(addon_xmls):
+                write(("\n\n" if i else "") + addon_xml)
+            write(ADDONS_XML_FOOTER)
+
+        if gz:
+            gz.close()
+
+        with open(addons_xml + ".md5.tmp", "w") as f:
+            f.write(md5.hexdigest())
+        # the md5 goes last, clients check it before fetching addons.xml
+        published.append(addons_xml + ".md5")
+
+        for path in published:
+            os.replace(path + ".tmp", path)
+        print("Successfully updated addons.xml.md5")
 
     def _generate_md5_file(self):
         """
         Generates a new addons.xml.md5 file.
         """
         try:
-            m = hashlib.md5(
-                open(os.path.join(self.zips_path, "addons.xml"), "r", encoding="utf-8")
-                .read()
-                .encode("utf-8")
-            ).hexdigest()
-            self._save_file(m, file=os.path.join(self.zips_path, "addons.xml.md5"))
+            md5 = hashlib.md5()
+            with open(os.path.join(self.zips_path, "addons.xml"), "rb") as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    md5.update(chunk)
+            self._save_file(md5.hexdigest(), file=os.path.join(self.zips_path, "addons.xml.md5"))
             print("Successfully updated addons.xml.md5")
         except Exception as e:
             print("An error occurred creating addons.xml.md5 file!\n{0}".format(e))
 
-    def _save_file(self, data, file, decode=False):
+    def _save_file(self, data, file):
         """
-        Saves a file.
+        Saves a file atomically.
         """
         try:
-            if decode:
-                open(file, "w", encoding="utf-8").write(data.decode("utf-8"))
-            else:
-                open(file, "w").write(data)
+            with open(file + ".tmp", "w") as f:
+                f.write(data)
+            os.replace(file + ".tmp", file)
         except Exception as e:
             print("An error occurred saving {0} file!\n{1}".format(file, e))
 
 
 if __name__ == "__main__":
-    onlyMD5 = len(sys.argv) > 1 and sys.argv[1] == "md5"
-    for release in [r for r in KODI_VERSIONS if os.path.exists(r)]:
-        Generator(release, onlyMD5=onlyMD5)
+    onlyMD5 = "md5" in sys.argv[1:]
+    incremental = "incremental" in sys.argv[1:]
+    # also publish addons.xml.gz, for repositories with <info compressed="true">
+    compress = "gz" in sys.argv[1:]
+    generators = [Generator(release, onlyMD5=onlyMD5, incremental=incremental, compress=compress)
+                  for release in [r for r in KODI_VERSIONS if os.path.exists(r)]]
+    if incremental:
+        build_incremental(generators)
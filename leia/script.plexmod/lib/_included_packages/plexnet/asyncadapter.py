@@ -1,10 +1,12 @@
 from __future__ import absolute_import
+import os
 import time
+import select
 import socket
+import threading
 import six
 
 import requests
-import six
 
 from requests.packages.urllib3 import HTTPConnectionPool, HTTPSConnectionPool
 from requests.packages.urllib3.connection import HTTPConnection
@@ -22,6 +24,9 @@ from requests.compat import urlparse
 #from six.moves.http_client import HTTPConnection
 import errno
 
+from . import util
+from . import tracing
+
 DEFAULT_POOLBLOCK = False
 SSL_KEYWORDS = ('key_file', 'cert_file', 'cert_reqs', 'ca_certs',
                 'ssl_version')
@@ -35,6 +40,14 @@ WIN_EHOSTUNREACH = 10065
 
 MAX_RETRIES = 3
 
+CONNECT_IN_PROGRESS = (errno.EINPROGRESS, errno.EWOULDBLOCK, WIN_EWOULDBLOCK)
+
+# delay before the next resolved address is tried while the previous attempts are still pending
+CONNECT_STAGGER = 0.25
+
+# ABORT_FLAG_FUNCTION can't wake us up, so check it at least this often while connecting
+ABORT_CHECK_INTERVAL = 0.1
+
 
 def ABORT_FLAG_FUNCTION():
     return False
@@ -79,19 +92,85 @@ class AsyncTimeout(float):
 DEFAULT_TIMEOUT = AsyncTimeout(10).setConnectTimeout(10)
 
 
-class AsyncVerifiedHTTPSConnection(VerifiedHTTPSConnection):
-    __slots__ = ("_canceled", "deadline", "_timeout")
+def _interleaveFamilies(candidates):
+    """
+    Alternate address families (e.g. IPv6, IPv4, IPv6, ...) while keeping the resolver's order within each family, so
+    a broken family doesn't delay the other one by more than one connection attempt
+    """
+    families = []
+    byFamily = {}
+    for res in candidates:
+        if res[0] not in byFamily:
+            families.append(res[0])
+            byFamily[res[0]] = []
+        byFamily[res[0]].append(res)
+
+    ret = []
+    while any(byFamily.values()):
+        for family in families:
+            if byFamily[family]:
+                ret.append(byFamily[family].pop(0))
+    return ret
+
+
+def _createWaker():
+    try:
+        return socket.socketpair()
+    except (AttributeError, socket.error):
+        # socketpair isn't available on Windows with Python 2; canceling then relies on ABORT_CHECK_INTERVAL
+        return None
+
+
+class ConnectLatency(object):
+    """
+    Keeps track of how long connecting to each host took
+    """
+    def __init__(self):
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def add(self, host, latency):
+        with self._lock:
+            count, avg, _ = self._hosts.get(host, (0, 0, 0))
+            count += 1
+            avg += (latency - avg) / count
+            self._hosts[host] = (count, avg, latency)
+
+        util.DEBUG_LOG("Connected to {0} in {1:.1f}ms (avg: {2:.1f}ms, connects: {3})", host, latency * 1000,
+                       avg * 1000, count)
+
+    def get(self, host):
+        """
+        Returns (connects, average latency, last latency) for host, latencies in seconds
+        """
+        return self._hosts.get(host)
 
-    def __init__(self, *args, **kwargs):
-        VerifiedHTTPSConnection.__init__(self, *args, **kwargs)
+
+CONNECT_LATENCY = ConnectLatency()
+
+
+class AsyncConnectionMixin(object):
+    """
+    Non-blocking connect waiting on select() instead of polling. Connection attempts to the resolved addresses are
+    started CONNECT_STAGGER apart, alternating address families, and the first one to succeed wins. cancel() wakes the
+    waiting connect immediately.
+    """
+    __slots__ = ()
+
+    def _initAsync(self):
         self._canceled = False
         self.deadline = 0
         self._timeout = AsyncTimeout(DEFAULT_TIMEOUT)
+        self._waker = None
 
     def _check_timeout(self):
         if time.time() > self.deadline:
             raise ConnectTimeoutError('connection timed out')
 
+    def _check_canceled(self):
+        if self._canceled or ABORT_FLAG_FUNCTION():
+            raise CanceledException('Request canceled')
+
     def create_connection(self, address, timeout=None, source_address=None):
         """Connect to *address* and return the socket object.
 
@@ -108,59 +187,106 @@ class AsyncVerifiedHTTPSConnection(VerifiedHTTPSConnection):
         self._timeout = timeout
 
         host, port = address
-        err = None
-        for res in socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM):
-            af, socktype, proto, canonname, sa = res
-            sock = None
-            try:
-                sock = socket.socket(af, socktype, proto)
-                sock.setblocking(False)  # this is obviously critical
-                self.deadline = time.time() + timeout.getConnectTimeout()
-                # sock.settimeout(timeout)
-
-                if source_address:
-                    sock.bind(source_address)
-                for msg in self._connect(sock, sa):
-                    if self._canceled or ABORT_FLAG_FUNCTION():
-                        raise CanceledException('Request canceled')
-                sock.setblocking(True)
-                return sock
-
-            except socket.error as _:
-                err = _
-                if sock is not None:
-                    sock.shutdown(socket.SHUT_RDWR)
-                    sock.close()
-
-        if err is not None:
-            raise err
-        else:
+        resolveStart = time.time()
+        candidates = _interleaveFamilies(socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM))
+        if not candidates:
             raise socket.error("getaddrinfo returns an empty list")
 
-    def _connect(self, sock, sa):
-        while not self._canceled and not ABORT_FLAG_FUNCTION():
-            time.sleep(0.01)
-            self._check_timeout()  # this should be done at the beginning of each loop
+        start = time.time()
+        tracing.TRACER.phase("dns", start - resolveStart)
+        self.deadline = start + timeout.getConnectTimeout()
+        self._waker = _createWaker()
+        try:
+            sock = self._connect(candidates, source_address)
+        finally:
+            self._closeWaker()
+
+        latency = time.time() - start
+        CONNECT_LATENCY.add(host, latency)
+        tracing.TRACER.phase("connect", latency)
+        sock.setblocking(True)
+        return sock
+
+    def _startConnect(self, res, source_address):
+        af, socktype, proto, canonname, sa = res
+        sock = socket.socket(af, socktype, proto)
+        try:
+            sock.setblocking(False)  # this is obviously critical
+            for opt in getattr(self, "socket_options", None) or []:
+                sock.setsockopt(*opt)
+
+            if source_address:
+                sock.bind(source_address)
             status = sock.connect_ex(sa)
-            if not status or status in (errno.EISCONN, WIN_EISCONN):
-                break
-            elif status in (errno.EINPROGRESS, WIN_EWOULDBLOCK):
-                self.deadline = time.time() + self._timeout.getConnectTimeout()
-            # elif status in (errno.EWOULDBLOCK, errno.EALREADY) or (os.name == 'nt' and status == errno.WSAEINVAL):
-            #     pass
-            yield
+        except socket.error:
+            sock.close()
+            raise
 
-        if self._canceled or ABORT_FLAG_FUNCTION():
-            raise CanceledException('Request canceled')
+        if status and status not in CONNECT_IN_PROGRESS:
+            sock.close()
+            raise socket.error(status, os.strerror(status))
+
+        return sock, not status
 
-        error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
-        if error:
-            # TODO: determine when this case can actually happen
-            raise socket.error((error,))
+    def _connect(self, candidates, source_address):
+        pending = []
+        err = None
+        nextStart = 0
+        try:
+            while True:
+                self._check_canceled()
+                now = time.time()
+
+                # start the next attempt if the others are taking too long or have failed already
+                if candidates and (not pending or now >= nextStart):
+                    try:
+                        sock, connected = self._startConnect(candidates.pop(0), source_address)
+                    except socket.error as e:
+                        err = e
+                        continue
+
+                    if connected:
+                        return sock
+
+                    pending.append(sock)
+                    nextStart = now + CONNECT_STAGGER
+                    continue
+
+                if not pending:
+                    if err is not None:
+                        raise err
+                    raise socket.error("no address could be connected to")
+
+                self._check_timeout()
+
+                wait = min(ABORT_CHECK_INTERVAL, self.deadline - now)
+                if candidates:
+                    wait = min(wait, nextStart - now)
+
+                _, writable, errored = select.select(self._waker and [self._waker[0]] or [], pending, pending,
+                                                     max(0, wait))
+
+                for sock in set(writable) | set(errored):
+                    error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    pending.remove(sock)
+                    if not error and sock not in errored:
+                        return sock
+
+                    sock.close()
+                    err = socket.error(error, os.strerror(error))
+        finally:
+            for sock in pending:
+                sock.close()
+
+    def _closeWaker(self):
+        waker, self._waker = self._waker, None
+        if waker:
+            for sock in waker:
+                sock.close()
 
     def _new_conn(self):
         sock = self.create_connection(
-            address=(self.host, self.port),
+            address=(getattr(self, "_dns_host", None) or self.host, self.port),
             timeout=self.timeout
         )
 
@@ -168,17 +294,42 @@ class AsyncVerifiedHTTPSConnection(VerifiedHTTPSConnection):
 
     def cancel(self):
         self._canceled = True
+        waker = self._waker
+        if waker:
+            try:
+                waker[1].send(b"x")
+            except socket.error:
+                pass
+
 
+class AsyncVerifiedHTTPSConnection(AsyncConnectionMixin, VerifiedHTTPSConnection):
+    __slots__ = ("_canceled", "deadline", "_timeout", "_waker")
 
-class AsyncHTTPConnection(HTTPConnection):
-    __slots__ = ("_canceled", "deadline")
     def __init__(self, *args, **kwargs):
-        HTTPConnection.__init__(self, *args, **kwargs)
-        self._canceled = False
-        self.deadline = 0
+        VerifiedHTTPSConnection.__init__(self, *args, **kwargs)
+        self._initAsync()
+
+    def connect(self):
+        span = tracing.TRACER.current()
+        if not span:
+            return VerifiedHTTPSConnection.connect(self)
+
+        # whatever connect() spends outside of create_connection() is the TLS handshake
+        before = span.phases.get("dns", 0) + span.phases.get("connect", 0)
+        start = time.time()
+        try:
+            return VerifiedHTTPSConnection.connect(self)
+        finally:
+            socketTime = span.phases.get("dns", 0) + span.phases.get("connect", 0) - before
+            span.phase("tls", max(0, time.time() - start - socketTime))
 
-    def cancel(self):
-        self._canceled = True
+
+class AsyncHTTPConnection(AsyncConnectionMixin, HTTPConnection):
+    __slots__ = ("_canceled", "deadline", "_timeout", "_waker")
+
+    def __init__(self, *args, **kwargs):
+        HTTPConnection.__init__(self, *args, **kwargs)
+        self._initAsync()
 
 
 class AsyncHTTPConnectionPool(HTTPConnectionPool):
@@ -342,6 +493,16 @@ class Session(requests.Session):
         self.mount('https://', AsyncHTTPAdapter(max_retries=MAX_RETRIES))
         self.mount('http://', AsyncHTTPAdapter(max_retries=MAX_RETRIES))
 
+    def request(self, method, url, *args, **kwargs):
+        with tracing.TRACER.span(method, "http", url=url) as span:
+            response = requests.Session.request(self, method, url, *args, **kwargs)
+            if kwargs.get("stream"):
+                # the body is read by the caller
+                span.set(status=response.status_code)
+            else:
+                span.response(response)
+            return response
+
     def cancel(self):
         for v in self.adapters.values():
             v.close()
@@ -5,6 +5,8 @@ import re
 import traceback
 import requests
 import socket
+import threading
+import time
 import urllib3
 import datetime
 from . import threadutils
@@ -17,6 +19,7 @@ from xml.etree import ElementTree
 from . import asyncadapter
 
 from . import callback
+from . import tracing
 from . import util
 
 codes = requests.codes
@@ -32,6 +35,85 @@ TODAY = datetime.date.today()
 
 _getaddrinfo = socket.getaddrinfo
 
+DNS_CACHE_TTL = 300
+DNS_NEGATIVE_TTL = 30
+# errors meaning the name doesn't exist; other failures (timeouts, temporary failures) aren't cached
+DNS_NEGATIVE_ERRORS = tuple(getattr(socket, e) for e in ("EAI_NONAME", "EAI_NODATA") if hasattr(socket, e))
+
+
+class DNSCache(object):
+    """
+    Caches getaddrinfo results for DNS_CACHE_TTL seconds and names that don't exist for DNS_NEGATIVE_TTL seconds.
+    Concurrent lookups of the same name wait for the first one instead of asking the resolver as well.
+    """
+    def __init__(self, resolve, ttl=DNS_CACHE_TTL, negativeTTL=DNS_NEGATIVE_TTL):
+        self.resolve = resolve
+        self.ttl = ttl
+        self.negativeTTL = negativeTTL
+        self._entries = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, host, port, *args, **kwargs):
+        key = (host, port, args, tuple(sorted(kwargs.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time():
+                return self._result(entry)
+
+            pending = self._pending.get(key)
+            owner = pending is None
+            if owner:
+                # [done, (expires, result, error)]
+                pending = self._pending[key] = [threading.Event(), None]
+
+        if not owner:
+            pending[0].wait()
+            return self._result(pending[1])
+
+        entry = None
+        try:
+            result = self.resolve(host, port, *args, **kwargs)
+            entry = (time.time() + self.ttl, result, None)
+        except socket.gaierror as e:
+            negative = e.args and e.args[0] in DNS_NEGATIVE_ERRORS
+            entry = (negative and time.time() + self.negativeTTL or 0, None, e)
+        except Exception as e:
+            entry = (0, None, e)
+        finally:
+            with self._lock:
+                if entry and entry[0]:
+                    self._entries[key] = entry
+                self._pending.pop(key, None)
+            pending[1] = entry or (0, None, socket.gaierror("Lookup of {0} failed".format(host)))
+            pending[0].set()
+
+        return self._result(entry)
+
+    @staticmethod
+    def _result(entry):
+        if entry[2] is not None:
+            raise entry[2].__class__(*entry[2].args)
+        return list(entry[1])
+
+    def invalidate(self, host):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == host]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+DNS_CACHE = DNSCache(_getaddrinfo)
+
+
+def invalidateHost(url):
+    host = six.moves.urllib.parse.urlparse(url).hostname
+    if host:
+        DNS_CACHE.invalidate(host)
+
 
 def pgetaddrinfo(host, port, *args, **kwargs):
     """
@@ -51,7 +133,7 @@ def pgetaddrinfo(host, port, *args, **kwargs):
         proto = kwargs.get("proto", socket.IPPROTO_TCP)
 
         return [(fam, stype, proto, '', (ip, port))]
-    return _getaddrinfo(host, port, *args, **kwargs)
+    return DNS_CACHE.lookup(host, port, *args, **kwargs)
 
 
 socket.getaddrinfo = pgetaddrinfo
@@ -211,7 +293,7 @@ class HttpRequest(object):
             if self._cancel:
                 return None
 
-            util.LOG("Got a {0} from {1}", res.status_code, util.cleanToken(self.url))
+            util.LOG("Got a {0} from {1}", res.status_code, self.url)
             # self.event = msg
             return res
         except Exception as e:
@@ -298,10 +380,8 @@ class HttpRequest(object):
         method = self.method
         if not method:
             method = body is not None and "POST" or "GET"
-        util.LOG(
-            "Starting request: {0} {1} (async={2} timeout={3})".format(method, util.cleanToken(self.url),
-                                                                       _async, timeout)
-        )
+        # tokens are redacted by the log writer, for messages that are actually written
+        util.LOG("Starting request: {0} {1} (async={2} timeout={3})", method, self.url, _async, timeout)
 
 
 class HttpResponse(object):
@@ -336,7 +416,9 @@ class HttpResponse(object):
 
     def getBodyXml(self):
         if not self.event is None:
-            return ElementTree.fromstring(self.getBodyString())
+            data = self.getBodyString()
+            with tracing.TRACER.span("parse", "xml", bytes=len(data)):
+                return ElementTree.fromstring(data)
 
         return None
 
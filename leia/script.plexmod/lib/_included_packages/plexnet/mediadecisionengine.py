@@ -1,12 +1,132 @@
 from __future__ import absolute_import
+import threading
+
 from . import mediachoice
 from . import serverdecision
 from . import plexapp
+from . import callback
 from . import util
 import six
 from six.moves import range
 
 
+def sortValue(choice, key):
+    val = getattr(choice, key, 0)
+    if type(val).__name__ == "PlexObject":
+        return val.asInt(0)
+    return val
+
+
+class DecisionCache(object):
+    """
+    Remembers the outcome of evaluateMediaVideo for media that look the same to the MDE, so play queues and playlists
+    with lots of items sharing a handful of encoding profiles don't have to be evaluated over and over again.
+    """
+    # preferences the decision depends on; a change to any of them invalidates all cached decisions
+    PREFERENCES = ("playback_features", "allowed_codecs", "allow_hevc", "allow_av1", "allow_vc1", "local_quality",
+                   "remote_quality", "online_quality", "burn_subtitles", "audio_force_ac3_cond", "audio_ac3dts",
+                   "audio_hires")
+    MAX_ENTRIES = 256
+
+    def __init__(self):
+        self._decisions = {}
+        self._fingerprint = None
+        self._registered = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _register(self):
+        if self._registered or not util.APP:
+            return
+
+        for pref in self.PREFERENCES:
+            util.APP.on("change:{0}".format(pref), callback.Callable(self.invalidate))
+        self._registered = True
+
+    def invalidate(self, *args, **kwargs):
+        with self._lock:
+            self._decisions = {}
+            self._fingerprint = None
+        util.DEBUG_LOG("MDE: Decision cache invalidated")
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._register()
+            self._fingerprint = (
+                tuple(util.INTERFACE.getPlaybackFeatures()),
+                tuple(util.INTERFACE.getAdditionalCodecs()),
+                util.INTERFACE.getGlobal("vp9Support"),
+                util.INTERFACE.getGlobal("supports1080p60"),
+            ) + tuple(util.INTERFACE.getPreference(pref) for pref in self.PREFERENCES[2:])
+        return self._fingerprint
+
+    def key(self, item, media, choice, server, partIndex=0):
+        # media we can't describe fully, or whose server can't transcode (which makes the decision depend on another
+        # server), isn't cached
+        if not server or not server.supportsVideoTranscoding or media.isIndirect() or partIndex >= len(media.parts):
+            return None
+
+        part = media.parts[partIndex]
+        if not part:
+            return None
+
+        qualityType = item.getQualityType()
+        videoStream = choice.videoStream
+        audioStream = choice.audioStream
+        subtitleStream = choice.subtitleStream
+
+        return (
+            self.fingerprint,
+            (
+                qualityType,
+                item.settings.getMaxResolution(qualityType),
+                item.settings.getMaxResolution(qualityType, True),
+                item.settings.getMaxBitrate(qualityType),
+            ),
+            (server.uuid, server.supportsVideoRemuxOnly, bool(item.isExtra), bool(item.isMediaSynthesized)),
+            (
+                media.protocol("http"), media.getVideoResolution(), media.bitrate.asInt(),
+                media.audioChannels.asInt(), media.proxyType, media.isSelected()
+            ),
+            (
+                part.get("decision"), part.get('hasChapterVideoStream').asBool(),
+                tuple((stream.streamType.asInt(), stream.codec) for stream in part.streams)
+            ),
+            videoStream and (videoStream.codec, videoStream.bitrate.asInt()),
+            audioStream and (audioStream.codec, audioStream.channels.asInt()),
+            subtitleStream and (subtitleStream.key is None),
+        )
+
+    def get(self, key):
+        with self._lock:
+            decision = self._decisions.get(key)
+            if decision:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return decision
+
+    def set(self, key, choice):
+        with self._lock:
+            if len(self._decisions) >= self.MAX_ENTRIES:
+                self._decisions = {}
+
+            self._decisions[key] = {
+                "protocol": choice.protocol,
+                "resolution": choice.resolution,
+                "forceTranscode": choice.forceTranscode,
+                "subtitleDecision": choice.subtitleDecision,
+                "hasBurnedInSubtitles": choice.hasBurnedInSubtitles,
+                "isDirectPlayable": choice.isDirectPlayable,
+                "sorts": util.AttributeDict(choice.sorts),
+            }
+
+
+DECISION_CACHE = DecisionCache()
+
+
 class MediaDecisionEngine(object):
     proxyTypes = util.AttributeDict({
         'NORMAL': 0,
@@ -86,17 +206,23 @@ class MediaDecisionEngine(object):
             return []
 
         if len(choices) > 1:
-            self.sort(choices, "bitrate")
-            self.sort(choices, "audioChannels")
-            self.sort(choices, "audioDS")
-            self.sort(choices, "resolution")
-            self.sort(choices, "videoDS")
-            self.sort(choices, "isDirectPlayable")
-            self.sort(choices, self.higherResIfCapable)
-            self.sort(choices, self.cloudIfRemote)
+            choices.sort(key=self.choiceSortKey)
 
         return choices
 
+    def choiceSortKey(self, choice):
+        # most significant first; the same order the individual stable sorts used to be applied in, reversed
+        return (
+            self.cloudIfRemote(choice),
+            self.higherResIfCapable(choice),
+            sortValue(choice, "isDirectPlayable"),
+            sortValue(choice, "videoDS"),
+            sortValue(choice, "resolution"),
+            sortValue(choice, "audioDS"),
+            sortValue(choice, "audioChannels"),
+            sortValue(choice, "bitrate"),
+        )
+
     def evaluateMediaVideo(self, item, media, partIndex=0):
         # Resolve indirects before doing anything else.
         if media.isIndirect():
@@ -110,6 +236,24 @@ class MediaDecisionEngine(object):
             return choice
 
         choice.isSelected = media.isSelected()
+
+        key = DECISION_CACHE.key(item, media, choice, server, partIndex)
+        decision = key and DECISION_CACHE.get(key)
+        if decision:
+            for attr, value in decision.items():
+                setattr(choice, attr, value)
+            choice.sorts = util.AttributeDict(decision["sorts"])
+            util.DEBUG_LOG("MDE: Using cached decision for {0}: {1}", media, choice)
+            return choice
+
+        self._evaluateMediaVideo(item, media, choice, server, partIndex)
+
+        if key:
+            DECISION_CACHE.set(key, choice)
+
+        return choice
+
+    def _evaluateMediaVideo(self, item, media, choice, server, partIndex=0):
         choice.protocol = media.protocol("http")
 
         maxResolution = item.settings.getMaxResolution(item.getQualityType(), self.isSupported4k(media, choice.videoStream))
@@ -488,10 +632,7 @@ class MediaDecisionEngine(object):
 
         # key is a stringtype, get the value and return a sort value
         def sortWithKey(choice):
-            val = getattr(choice, key, 0)
-            if type(val).__name__ == "PlexObject":
-                return getattr(choice, key).asInt(0)
-            return val
+            return sortValue(choice, key)
 
         if key is None:
             choices.sort()
@@ -117,6 +117,16 @@ class BasePlaylist(plexobjects.PlexObject, signalsmixin.SignalsMixin):
     def current(self):
         return self[self.pos]
 
+    def getNext(self):
+        if not self.hasNext():
+            return None
+
+        pos = self.pos + 1
+        if pos >= len(self._items):
+            pos = 0
+
+        return self[pos]
+
     def userCurrent(self):
         for item in self._items:
             if not item.isWatched or item.viewOffset.asInt():
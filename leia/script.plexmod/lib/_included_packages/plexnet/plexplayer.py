@@ -7,7 +7,7 @@ from . import plexrequest
 from . import mediadecisionengine
 from . import serverdecision
 from lib.util import KODI_VERSION_MAJOR
-from lib.cache import CACHE_SIZE
+from lib.cache import kcm
 
 from six.moves import range
 from six import ensure_str
@@ -290,7 +290,7 @@ class PlexPlayer(BasePlayer):
             # Global variables for all decisions
             # Kodi default is 20971520 (20MB)
             decisionPath = http.addUrlParam(decisionPath,
-                                            "mediaBufferSize={}".format(str(CACHE_SIZE * 1024)))
+                                            "mediaBufferSize={}".format(str(kcm.initialMemorySize * 1024)))
             decisionPath = http.addUrlParam(decisionPath, "hasMDE=1")
 
             decisionPath = http.addUrlParam(decisionPath, 'X-Plex-Client-Profile-Name=Generic')
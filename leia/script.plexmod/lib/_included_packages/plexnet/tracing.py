@@ -0,0 +1,225 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import collections
+import functools
+import json
+import os
+import threading
+import time
+
+from . import util
+
+# number of finished spans kept
+BUFFER_SIZE = 500
+
+# connection phases measured before the response headers arrived; they're part of requests' Response.elapsed
+CONNECT_PHASES = ("dns", "connect", "tls")
+
+
+class Span(object):
+    __slots__ = ("name", "cat", "start", "end", "thread", "args", "phases")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.phases = {}
+        self.thread = threading.current_thread().name
+        self.start = time.time()
+        self.end = None
+
+    @property
+    def duration(self):
+        return (self.end or time.time()) - self.start
+
+    def set(self, **kwargs):
+        self.args.update(kwargs)
+
+    def phase(self, name, duration):
+        self.phases[name] = self.phases.get(name, 0) + duration
+
+    def response(self, response):
+        """
+        Records the response's status and TTFB, then reads its body to measure the transfer
+        """
+        if response is None:
+            return
+
+        elapsed = response.elapsed.total_seconds()
+        self.phase("ttfb", max(0, elapsed - sum(self.phases.get(p, 0) for p in CONNECT_PHASES)))
+        # non-streamed responses have been read already
+        data = response.content
+        self.phase("transfer", max(0, time.time() - self.start - elapsed))
+        self.set(status=response.status_code, bytes=len(data or b''))
+
+    def toDict(self):
+        d = {"name": self.name, "cat": self.cat, "thread": self.thread, "start": self.start,
+             "duration": self.duration}
+        d.update(self.args)
+        for k, v in self.phases.items():
+            d[k] = v
+        return d
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        TRACER.finish(self)
+
+
+class NullSpan(object):
+    __slots__ = ()
+
+    def set(self, **kwargs):
+        pass
+
+    def phase(self, name, duration):
+        pass
+
+    def response(self, response):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def __bool__(self):
+        return False
+
+    __nonzero__ = __bool__
+
+
+NULL_SPAN = NullSpan()
+
+
+class Tracer(object):
+    """
+    Records timing spans of HTTP requests, server queries, XML parsing and background tasks into a ring buffer.
+    Does nothing unless enabled.
+    """
+    def __init__(self, size=BUFFER_SIZE):
+        self.enabled = False
+        self._spans = collections.deque(maxlen=size)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, cat, **args):
+        if not self.enabled:
+            return NULL_SPAN
+
+        if "url" in args:
+            args["url"] = util.cleanToken(args["url"])
+
+        span = Span(name, cat, args)
+        self._stack().append(span)
+        return span
+
+    def current(self):
+        """
+        Returns the innermost open span of the calling thread
+        """
+        if not self.enabled:
+            return NULL_SPAN
+
+        stack = self._stack()
+        return stack and stack[-1] or NULL_SPAN
+
+    def phase(self, name, duration):
+        self.current().phase(name, duration)
+
+    def finish(self, span):
+        span.end = time.time()
+        stack = self._stack()
+        if span in stack:
+            stack.remove(span)
+
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self):
+        with self._lock:
+            self._spans.clear()
+
+    def summary(self):
+        """
+        Returns {cat: (count, average duration, max duration)} of the buffered spans
+        """
+        stats = {}
+        for span in self.spans():
+            count, total, peak = stats.get(span.cat, (0, 0, 0))
+            stats[span.cat] = (count + 1, total + span.duration, max(peak, span.duration))
+
+        return dict((cat, (count, total / count, peak)) for cat, (count, total, peak) in stats.items())
+
+    def toJSON(self):
+        return {"spans": [s.toDict() for s in self.spans()]}
+
+    def toChromeTrace(self):
+        """
+        Returns the buffered spans in the Chrome trace event format (chrome://tracing, Perfetto)
+        """
+        events = []
+        threads = {}
+        for span in self.spans():
+            tid = threads.setdefault(span.thread, len(threads) + 1)
+            args = dict(span.args)
+            for k, v in span.phases.items():
+                args[k] = round(v * 1000, 3)
+            events.append({"name": span.name, "cat": span.cat, "ph": "X", "pid": 1, "tid": tid,
+                           "ts": int(span.start * 1000000), "dur": int(span.duration * 1000000), "args": args})
+
+        for name, tid in threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+        """
+        Writes the buffered spans to path as traces.json and traces.chrome.json
+        """
+        if not self.spans():
+            return
+
+        for fn, data in (("traces.json", self.toJSON()), ("traces.chrome.json", self.toChromeTrace())):
+            fullPath = os.path.join(path, fn)
+            try:
+                with open(fullPath, "w") as f:
+                    json.dump(data, f)
+            except (IOError, OSError):
+                util.ERROR("Couldn't export traces to {0}".format(fullPath))
+            else:
+                util.LOG("Exported traces to {0}", fullPath)
+
+
+TRACER = Tracer()
+
+
+def traced(cat):
+    """
+    Records each call of the decorated function as a span named after it
+    """
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+
+            with TRACER.span(func.__name__, cat):
+                return func(*args, **kwargs)
+        return inner
+    return wrap
@@ -0,0 +1,65 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import sys
+import threading
+import time
+
+from six.moves import builtins
+
+from .logging import log
+
+# number of modules listed in the report
+REPORT_TOP = 30
+
+
+class ImportProfiler(object):
+    """
+    Measures how long each module import of the calling thread takes, excluding the nested imports
+    """
+    def __init__(self):
+        self.times = {}
+        self._stack = []
+        self._orig = None
+        self._thread = None
+        self._start = None
+        self.total = 0
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if threading.current_thread() is not self._thread or (not level and name in sys.modules and not fromlist):
+            return self._orig(name, globals, locals, fromlist, level)
+
+        if level and globals:
+            key = '{0}.{1}'.format(globals.get('__package__') or globals.get('__name__'), name).rstrip('.')
+        else:
+            key = name
+
+        self._stack.append(0.0)
+        start = time.time()
+        try:
+            return self._orig(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.time() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.times[key] = self.times.get(key, 0) + elapsed - nested
+
+    def start(self):
+        self._thread = threading.current_thread()
+        self._orig = builtins.__import__
+        self._start = time.time()
+        builtins.__import__ = self._import
+        return self
+
+    def stop(self):
+        if self._orig:
+            builtins.__import__ = self._orig
+            self._orig = None
+            self.total = time.time() - self._start
+        return self
+
+    def report(self, what):
+        log('Import profile: {0} took {1:.0f}ms, slowest modules (self time):', what, self.total * 1000)
+        for name, t in sorted(self.times.items(), key=lambda x: x[1], reverse=True)[:REPORT_TOP]:
+            log('    {0:>7.1f}ms {1}', t * 1000, name)
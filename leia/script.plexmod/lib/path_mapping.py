@@ -4,6 +4,9 @@ import os
 import copy
 import re
 import json
+import threading
+import time
+from collections import OrderedDict
 
 import plexnet.util
 
@@ -16,16 +19,57 @@ PM_MCMT_RE = re.compile(r'/\*.+\*/\s?', re.IGNORECASE | re.MULTILINE | re.DOTALL
 PM_CMT_RE = re.compile(r'[\t ]+//.+\n?')
 PM_COMMA_RE = re.compile(r',\s*}\s*}')
 
+# how long and for how many folders the results of existence checks are kept
+EXISTS_TTL = 300
+EXISTS_MAX_FOLDERS = 64
+
 
 def norm_sep(s):
     return "\\" in s and "\\" or "/"
 
 
+def split_path(s):
+    return s.split(norm_sep(s))
+
+
+class PathTrie(object):
+    """
+    Maps path components of the PMS paths to the mappings starting with them; a mapping is stored at the node of its
+    last complete component
+    """
+    def __init__(self, mapping):
+        self.root = ({}, [])
+        for map_path, pms_path in mapping.items():
+            node = self.root
+            for part in split_path(pms_path)[:-1]:
+                node = node[0].setdefault(part, ({}, []))
+            node[1].append((map_path, pms_path))
+
+    def longestMatch(self, path):
+        nodes = [self.root]
+        node = self.root
+        for part in split_path(path):
+            node = node[0].get(part)
+            if node is None:
+                break
+            nodes.append(node)
+
+        # any match of a deeper node is longer than the ones of the nodes above it
+        for node in reversed(nodes):
+            matches = [m for m in node[1] if path.startswith(m[1])]
+            if matches:
+                return max(matches, key=lambda m: len(m[1]))
+        return None, None
+
+
 class PathMappingManager(object):
     mapfile = os.path.join(translatePath(ADDON.getAddonInfo("profile")), "path_mapping.json")
     PATH_MAP = {}
 
     def __init__(self):
+        self._tries = {}
+        self._folders = OrderedDict()
+        self._lock = threading.Lock()
         self.load()
 
     def load(self):
@@ -42,6 +86,7 @@ class PathMappingManager(object):
 
                 data = PM_COMMA_RE.sub("}}", data)
                 self.PATH_MAP = json.loads(data)
+                self._tries = {}
                 f.close()
             except:
                 ERROR("Couldn't read path_mapping.json")
@@ -54,18 +99,48 @@ class PathMappingManager(object):
 
     def getMappedPathFor(self, path, server):
         if self.mapping:
-            match = ("", "")
+            trie = self._tries.get(server.name)
+            if trie is None:
+                trie = self._tries[server.name] = PathTrie(self.PATH_MAP.get(server.name, {}))
 
-            for map_path, pms_path in self.PATH_MAP.get(server.name, {}).items():
-                # the longest matching path wins
-                if path.startswith(pms_path) and len(pms_path) > len(match[1]):
-                    match = (map_path, pms_path)
-
-            if all(match):
-                map_path, pms_path = match
+            # the longest matching path wins
+            map_path, pms_path = trie.longestMatch(path)
+            if map_path and pms_path:
                 return map_path, pms_path
         return None, None
 
+    def exists(self, path):
+        """
+        Checks whether a mapped file exists by listing its folder once and keeping the listing for EXISTS_TTL seconds,
+        so that the files of one folder don't each need to be probed on the share
+        """
+        sep = norm_sep(path)
+        folder, name = path.rsplit(sep, 1)
+
+        with self._lock:
+            entry = self._folders.pop(folder, None)
+            if entry is None or entry[0] < time.time():
+                try:
+                    files = set(xbmcvfs.listdir(folder + sep)[1])
+                except:
+                    files = set()
+                entry = (time.time() + EXISTS_TTL, files, {})
+            self._folders[folder] = entry
+            while len(self._folders) > EXISTS_MAX_FOLDERS:
+                self._folders.popitem(last=False)
+
+        if name in entry[1]:
+            return True
+
+        # listings might not match the name exactly (unicode normalization on some shares), ask for the file itself
+        if name not in entry[2]:
+            entry[2][name] = bool(xbmcvfs.exists(path))
+        return entry[2][name]
+
+    def clearExistsCache(self):
+        with self._lock:
+            self._folders.clear()
+
     def deletePathMapping(self, target, server=None, save=True):
         server = server or plexnet.util.SERVERMANAGER.selectedServer
         if not server:
@@ -82,6 +157,8 @@ class PathMappingManager(object):
             if target == t:
                 deleted = s
                 del self.PATH_MAP[server.name][s]
+                self._tries.pop(server.name, None)
+                self.clearExistsCache()
                 break
         if save and deleted and self.save():
             LOG("Path mapping stored after deletion of {}:{}".format(deleted, target))
@@ -106,6 +183,8 @@ class PathMappingManager(object):
             target += sep
 
         self.PATH_MAP[server.name][source] = target
+        self._tries.pop(server.name, None)
+        self.clearExistsCache()
         if save and self.save():
             LOG("Path mapping stored for {}:{}".format(source, target))
 
@@ -12,6 +12,9 @@ from kodi_six import xbmcgui
 from . import backgroundthread
 from . import kodijsonrpc
 from . import colors
+from . import lookahead
+from . import subtitlecache
+from . import plex
 from .windows import seekdialog, windowutils
 from . import util
 from plexnet import plexplayer
@@ -229,6 +232,7 @@ class SeekPlayerHandler(BasePlayerHandler):
         self.stoppedManually = False
         self.prePlayWitnessed = False
         self.queuingNext = False
+        self.lookaheadAt = None
 
     def setup(self, duration, meta, offset, bif_url, title='', title2='', seeking=NO_SEEK, chapters=None):
         self.ended = False
@@ -248,6 +252,7 @@ class SeekPlayerHandler(BasePlayerHandler):
         self.inBingeMode = False
         self.skipPostPlay = False
         self.prePlayWitnessed = False
+        self.lookaheadAt = None
         self.getDialog(setup=True)
         self.dialog.setup(self.duration, meta, int(self.baseOffset * 1000), self.bifURL, self.title, self.title2,
                           chapters=self.chapters, keepMarkerDef=seeking == self.SEEK_IN_PROGRESS)
@@ -646,8 +651,8 @@ class SeekPlayerHandler(BasePlayerHandler):
             if do_sleep:
                 xbmc.sleep(100)
 
-            path = subs.getSubtitleServerPath()
             if self.isDirectPlay:
+                path = subtitlecache.CACHE.getPath(subs, self.player.video)
                 self.player.showSubtitles(False)
                 if path:
                     util.DEBUG_LOG('Setting subtitle path: {0} ({1})', path, subs)
@@ -752,10 +757,36 @@ class SeekPlayerHandler(BasePlayerHandler):
                 and not self.queuingNext and not self.stoppedManually and self.player.isPlayingVideo() and
                 self.player.playState != self.player.STATE_STOPPED):
             self.updateNowPlaying()
+            self.checkLookahead()
 
         if self.dialog and getattr(self.dialog, "_ignoreTick", None) is not True:
             self.dialog.tick()
 
+    def checkLookahead(self):
+        """
+        Resolve the next play queue item once we've reached the final credits marker or the last
+        resolve_next_item_lead seconds of the current item
+        """
+        if self.lookaheadAt is False or not self.duration or not self.playlist or not lookahead.RESOLVER.enabled:
+            return
+
+        if self.lookaheadAt is None:
+            self.lookaheadAt = self.duration - util.addonSettings.resolveNextItemLead * 1000
+            credits = [m.startTimeOffset.asInt() for m in getattr(self.player.video, "markers", None) or []
+                       if m.type == "credits"]
+            if credits:
+                self.lookaheadAt = min(self.lookaheadAt, max(credits))
+
+        if self.trueTime * 1000 < self.lookaheadAt:
+            return
+
+        self.lookaheadAt = False
+        nextItem = self.playlist.getNext()
+        if not nextItem or nextItem is self.player.video or not nextItem.get('ratingKey'):
+            return
+
+        lookahead.RESOLVER.resolve(nextItem, decide=self.isDirectPlay)
+
     def close(self):
         self.hideOSD(delete=True)
 
@@ -765,6 +796,7 @@ class SeekPlayerHandler(BasePlayerHandler):
             return
         self.ended = True
         util.DEBUG_LOG('Player: Video session ended')
+        lookahead.RESOLVER.clear()
         self.player.trigger('session.ended', session_id=self.sessionID)
         self.hideOSD(delete=True)
 
@@ -1226,10 +1258,19 @@ class PlexPlayer(xbmc.Player, signalsmixin.SignalsMixin):
             url=self.video.defaultArt.asTranscodedImageURL(1920, 1080, opacity=60, background=colors.noAlpha.Background)
         )
         try:
-            if not playerObject:
+            decided = False
+            resolved = not playerObject and not offset and lookahead.RESOLVER.take(self.video)
+            if resolved:
+                playerObject, decided = resolved
+
+            if playerObject:
+                self.playerObject = playerObject
+            else:
                 self.playerObject = plexplayer.PlexPlayer(self.video, offset, forceUpdate=force_update)
                 self.playerObject.build()
-            self.playerObject = self.playerObject.getServerDecision()
+
+            if not decided:
+                self.playerObject = self.playerObject.getServerDecision()
         except plexplayer.DecisionFailure as e:
             util.showNotification(e.reason, header=util.T(32448, 'Playback Failed!'))
             return
@@ -1240,6 +1281,10 @@ class PlexPlayer(xbmc.Player, signalsmixin.SignalsMixin):
         meta = self.playerObject.metadata
         url = meta.streamUrls[0]
 
+        if not meta.isTranscoded:
+            # have the subtitles ready by the time playback starts
+            subtitlecache.CACHE.prefetch(self.video)
+
         bifURL = self.playerObject.getBifUrl()
         util.DEBUG_LOG('Playing URL(+{1}ms): {0}{2}', plexnetUtil.cleanToken(url), offset, bifURL and ' - indexed' or '')
 
@@ -1806,3 +1851,5 @@ def shutdown():
 
 
 PLAYER = PlexPlayer().init()
+# playback might have changed watch states
+PLAYER.on('session.ended', plex.onWatchStateChange)
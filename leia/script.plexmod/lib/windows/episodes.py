@@ -8,6 +8,7 @@ from plexnet import plexapp, playlist, plexplayer
 from lib import backgroundthread
 from lib import metadata
 from lib import player
+from lib import preload
 from lib import util
 from lib.util import T
 from . import busy
@@ -297,7 +298,7 @@ class EpisodesWindow(kodigui.ControlledWindow, windowutils.UtilMixin, SeasonsMix
 
     def doAutoPlay(self):
         # First reload the video to get all the other info
-        self.initialEpisode.reload(checkFiles=1, **VIDEO_RELOAD_KW)
+        preload.PRELOADER.reload(self.initialEpisode, checkFiles=1, **VIDEO_RELOAD_KW)
 
         # We're not hitting onFirstInit when autoplaying from home, setup hooks here, so we can grab video progress
         self._setup_hooks()
@@ -405,7 +406,7 @@ class EpisodesWindow(kodigui.ControlledWindow, windowutils.UtilMixin, SeasonsMix
         player.PLAYER.on('video.progress', self.onVideoProgress)
 
     def _setup(self):
-        (self.season or self.show_).reload(checkFiles=1, **VIDEO_RELOAD_KW)
+        preload.PRELOADER.reload(self.season or self.show_, checkFiles=1, **VIDEO_RELOAD_KW)
 
         if not self.episodesPaginator:
             self.episodesPaginator = EpisodesPaginator(self.episodeListControl,
@@ -1027,12 +1028,12 @@ class EpisodesWindow(kodigui.ControlledWindow, windowutils.UtilMixin, SeasonsMix
         if choice['key'] == 'play_next':
             xbmc.executebuiltin('PlayerControl(Next)')
         elif choice['key'] == 'mark_watched':
-            mli.dataSource.markWatched(**VIDEO_RELOAD_KW)
-            self.updateItems(mli)
+            mli.dataSource.setWatched(True, parents=(self.season, self.show_))
+            self.updateItems(mli, reload_parent=False)
             util.MONITOR.watchStatusChanged()
         elif choice['key'] == 'mark_unwatched':
-            mli.dataSource.markUnwatched(**VIDEO_RELOAD_KW)
-            self.updateItems(mli)
+            mli.dataSource.setWatched(False, parents=(self.season, self.show_))
+            self.updateItems(mli, reload_parent=False)
             util.MONITOR.watchStatusChanged()
         elif choice['key'] == 'mark_season_watched':
             self.season.markWatched(**VIDEO_RELOAD_KW)
@@ -1170,13 +1171,14 @@ class EpisodesWindow(kodigui.ControlledWindow, windowutils.UtilMixin, SeasonsMix
         self.genre = self.show_.genres() and self.show_.genres()[0].tag or ''
 
     @busy.dialog()
-    def updateItems(self, item=None):
+    def updateItems(self, item=None, reload_parent=True):
         if item:
             item.setProperty('unwatched', not item.dataSource.isWatched and '1' or '')
             item.setProperty('watched', item.dataSource.isFullyWatched and '1' or '')
             self.setProgress(item)
             item.setProperty('progress', util.getProgressImage(item.dataSource))
-            (self.season or self.show_).reload()
+            if reload_parent:
+                (self.season or self.show_).reload()
 
             self.setUserItemInfo(item)
         else:
@@ -448,14 +448,34 @@ class EmptyDataSource(DummyDataSource):
 DUMMY_DATA_SOURCE = DummyDataSource()
 
 
+UNKNOWN = object()
+
+
+def newRowState(label='', label2='', thumbnailImage='', iconImage='', path=''):
+    """
+    What we last sent to a Kodi list item, so updates only need to send what changed
+    """
+    return {"__ID__": None, "label": label, "label2": label2, "art": (thumbnailImage, iconImage), "path": path,
+            "properties": {}}
+
+
+def unknownRowState():
+    """
+    State of a list item we know nothing about; the next update sends everything
+    """
+    return {"__ID__": UNKNOWN, "label": UNKNOWN, "label2": UNKNOWN, "art": UNKNOWN, "path": UNKNOWN,
+            "properties": None}
+
+
 class ManagedListItem(object):
     __slots__ = ("_listItem", "dataSource", "properties", "label", "label2", "iconImage", "thumbnailImage", "path",
-                 "_ID", "_manager", "_valid")
+                 "_ID", "_manager", "_valid", "_rendered")
 
     def __init__(self, label='', label2='', iconImage='', thumbnailImage='', path='', data_source=None,
                  properties=None):
         self._listItem = xbmcgui.ListItem(label, label2, path=path)
         self._listItem.setArt({"thumb": thumbnailImage, "icon": iconImage})
+        self._rendered = newRowState(label, label2, thumbnailImage, iconImage, path)
         self.dataSource = data_source
         self.properties = {}
         self.label = label
@@ -490,25 +510,71 @@ class ManagedListItem(object):
     def invalidate(self):
         self._valid = False
         self._listItem = DUMMY_LIST_ITEM
+        self._rendered = None
         self.dataSource = DUMMY_DATA_SOURCE
 
     def _takeListItem(self, manager, lid):
         self._manager = manager
         self._ID = lid
         self._listItem.setProperty('__ID__', lid)
+        if self._rendered is not None:
+            self._rendered["__ID__"] = lid
         li = self._listItem
         self._listItem = None
         self._manager._properties.update(self.properties)
         return li
 
+    def _bindRow(self, manager, li, row):
+        self._manager = manager
+        self._listItem = li
+        self._rendered = row
+
     def _updateListItem(self):
-        self.listItem.setProperty('__ID__', self._ID)
-        self.listItem.setLabel(self.label)
-        self.listItem.setLabel2(self.label2)
-        self.listItem.setArt({"thumb": self.thumbnailImage, "icon": self.iconImage})
-        self.listItem.setPath(self.path)
-        for k in self._manager._properties.keys():
-            self.listItem.setProperty(k, self.properties.get(k) or '')
+        """
+        Send our state to the list item, skipping everything it already shows according to our row state
+        """
+        li = self.listItem
+        row = self._rendered
+        if row is None:
+            row = unknownRowState()
+
+        if row["__ID__"] != self._ID:
+            li.setProperty('__ID__', self._ID)
+            row["__ID__"] = self._ID
+        if row["label"] != self.label:
+            li.setLabel(self.label)
+            row["label"] = self.label
+        if row["label2"] != self.label2:
+            li.setLabel2(self.label2)
+            row["label2"] = self.label2
+        art = (self.thumbnailImage, self.iconImage)
+        if row["art"] != art:
+            li.setArt({"thumb": self.thumbnailImage, "icon": self.iconImage})
+            row["art"] = art
+        if row["path"] != self.path:
+            li.setPath(self.path)
+            row["path"] = self.path
+
+        rendered = row["properties"]
+        if rendered is None:
+            # we don't know which properties the previous occupant of this row left behind, reset all we've seen
+            rendered = row["properties"] = {}
+            for k in set(self._manager and self._manager._properties or ()) | set(self.properties):
+                v = self.properties.get(k) or ''
+                li.setProperty(k, v)
+                rendered[k] = v
+            return
+
+        for k, v in self.properties.items():
+            v = v or ''
+            if rendered.get(k, '') != v:
+                li.setProperty(k, v)
+                rendered[k] = v
+
+        # clear what the previous occupant of this row left behind
+        for k in [k for k, v in rendered.items() if v and not self.properties.get(k)]:
+            li.setProperty(k, '')
+            rendered[k] = ''
 
     def clear(self):
         self.label = ''
@@ -556,10 +622,14 @@ class ManagedListItem(object):
         return self.listItem.select(selected)
 
     def setArt(self, values):
+        if self._rendered is not None and ("thumb" in values or "icon" in values):
+            self._rendered["art"] = UNKNOWN
         return self.listItem.setArt(values)
 
     def setIconImage(self, icon):
         self.iconImage = icon
+        if self._rendered is not None and self._rendered["art"] is not UNKNOWN:
+            self._rendered["art"] = (self._rendered["art"][0], icon)
         return self.listItem.setArt({"icon": self.iconImage})
 
     def setInfo(self, itype, infoLabels):
@@ -567,10 +637,18 @@ class ManagedListItem(object):
 
     def setLabel(self, label):
         self.label = label
+        if self._rendered is not None:
+            if self._rendered["label"] == label:
+                return
+            self._rendered["label"] = label
         return self.listItem.setLabel(label)
 
     def setLabel2(self, label):
         self.label2 = label
+        if self._rendered is not None:
+            if self._rendered["label2"] == label:
+                return
+            self._rendered["label2"] = label
         return self.listItem.setLabel2(label)
 
     def setMimeType(self, mimetype):
@@ -578,12 +656,21 @@ class ManagedListItem(object):
 
     def setPath(self, path):
         self.path = path
+        if self._rendered is not None:
+            if self._rendered["path"] == path:
+                return
+            self._rendered["path"] = path
         return self.listItem.setPath(path)
 
     def setProperty(self, key, value):
         if self._manager:
             self._manager._properties[key] = 1
         self.properties[key] = value
+        if self._rendered is not None and self._rendered["properties"] is not None:
+            rendered = self._rendered["properties"]
+            if rendered.get(key, '') == (value or ''):
+                return self
+            rendered[key] = value or ''
         self.listItem.setProperty(key, value)
         return self
 
@@ -604,6 +691,8 @@ class ManagedListItem(object):
 
     def setThumbnailImage(self, thumb):
         self.thumbnailImage = thumb
+        if self._rendered is not None and self._rendered["art"] is not UNKNOWN:
+            self._rendered["art"] = (thumb, self._rendered["art"][1])
         return self.listItem.setArt({"thumb": self.thumbnailImage})
 
     def onDestroy(self):
@@ -612,7 +701,7 @@ class ManagedListItem(object):
 
 class ManagedControlList(object):
     __slots__ = ("controlID", "control", "items", "_sortKey", "_idCounter", "_maxViewIndex", "_properties",
-                 "dataSource")
+                 "dataSource", "_rows", "_index")
 
     def __init__(self, window, control_id, max_view_index, data_source=None):
         self.controlID = control_id
@@ -623,6 +712,10 @@ class ManagedControlList(object):
         self._maxViewIndex = max_view_index
         self._properties = {}
         self.dataSource = data_source
+        # state of each of the control's list items, see newRowState
+        self._rows = []
+        # (id(dataSource) -> position, id(managed item) -> position), built on demand
+        self._index = None
 
     def __getattr__(self, name):
         return getattr(self.control, name)
@@ -660,8 +753,7 @@ class ManagedControlList(object):
 
                 mli = self.items[idx]
                 self._properties.update(mli.properties)
-                mli._manager = self
-                mli._listItem = li
+                mli._bindRow(self, li, self._rowState(idx))
                 mli._updateListItem()
                 mli.setProperty('index', str(idx))
         except RuntimeError:
@@ -675,29 +767,62 @@ class ManagedControlList(object):
         self._idCounter += 1
         return str(self._idCounter)
 
+    def _rowState(self, idx):
+        if idx >= len(self._rows):
+            return unknownRowState()
+
+        row = self._rows[idx]
+        if row is None:
+            row = self._rows[idx] = unknownRowState()
+        return row
+
+    def _takeRow(self, mli):
+        # the managed item's own list item becomes the new row
+        li = mli._takeListItem(self, self._nextID())
+        if mli._rendered is None:
+            mli._rendered = unknownRowState()
+        self._rows.append(mli._rendered)
+        return li
+
+    def _itemsChanged(self):
+        self._index = None
+
+    def _getIndex(self):
+        if self._index is None:
+            dsIndex = {}
+            mliIndex = {}
+            for idx, mli in enumerate(self.items):
+                dsIndex.setdefault(id(mli.dataSource), idx)
+                mliIndex[id(mli)] = idx
+            self._index = (dsIndex, mliIndex)
+        return self._index
+
     def reInit(self, window, control_id):
         self.controlID = control_id
         self.control = window.getControl(control_id)
-        self.control.addItems([i._takeListItem(self, self._nextID()) for i in self.items])
+        self._rows = []
+        self.control.addItems([self._takeRow(i) for i in self.items])
 
     def setSort(self, sort):
         self._sortKey = sort
 
     def addItem(self, managed_item):
         self.items.append(managed_item)
-        self.control.addItem(managed_item._takeListItem(self, self._nextID()))
+        self._itemsChanged()
+        self.control.addItem(self._takeRow(managed_item))
 
     def addItems(self, managed_items):
         self.items += managed_items
-        self.control.addItems([i._takeListItem(self, self._nextID()) for i in managed_items])
+        self._itemsChanged()
+        self.control.addItems([self._takeRow(i) for i in managed_items])
 
     def replaceItem(self, pos, mli):
         self[pos].onDestroy()
         self[pos].invalidate()
         self.items[pos] = mli
+        self._itemsChanged()
         li = self.control.getListItem(pos)
-        mli._manager = self
-        mli._listItem = li
+        mli._bindRow(self, li, self._rowState(pos))
         mli._updateListItem()
 
     def replaceItems(self, managed_items):
@@ -711,7 +836,10 @@ class ManagedControlList(object):
             i.onDestroy()
             i.invalidate()
 
+        # rows are kept and only get sent what differs between their old and their new item, so rows showing the same
+        # data source as before cost next to nothing
         self.items = managed_items
+        self._itemsChanged()
         size = self.size()
         if size != oldSize:
             pos = self.getSelectedPosition()
@@ -719,11 +847,13 @@ class ManagedControlList(object):
             if size > oldSize:
                 for i in range(0, size - oldSize):
                     self.control.addItem(xbmcgui.ListItem())
+                    self._rows.append(newRowState())
             elif size < oldSize:
                 diff = oldSize - size
                 idx = oldSize - 1
                 while diff:
                     self.control.removeItem(idx)
+                    del self._rows[idx:]
                     idx -= 1
                     diff -= 1
 
@@ -737,10 +867,15 @@ class ManagedControlList(object):
     def getListItem(self, pos):
         li = self.control.getListItem(pos)
         mli = self.items[pos]
-        mli._listItem = li
+        mli._bindRow(self, li, self._rowState(pos))
         return mli
 
     def getListItemByDataSource(self, data_source):
+        idx = self._getIndex()[0].get(id(data_source))
+        if idx is not None and idx < self.size() and self.items[idx].dataSource is data_source:
+            return self.items[idx]
+
+        # equal, but not the same object
         for mli in self:
             if data_source == mli.dataSource:
                 return mli
@@ -782,10 +917,12 @@ class ManagedControlList(object):
 
     def removeItem(self, index):
         old = self.items.pop(index)
+        self._itemsChanged()
         old.onDestroy()
         old.invalidate()
 
         self.control.removeItem(index)
+        del self._rows[index:index + 1]
         top = self.control.size() - 1
         if top < 0:
             return
@@ -803,7 +940,8 @@ class ManagedControlList(object):
             self.addItem(managed_item)
         else:
             self.items.insert(index, managed_item)
-            self.control.addItem(managed_item._takeListItem(self, self._nextID()))
+            self._itemsChanged()
+            self.control.addItem(self._takeRow(managed_item))
             self._updateItems(index, self.size())
 
         if self.positionIsValid(pos):
@@ -820,6 +958,7 @@ class ManagedControlList(object):
             rend = source_idx + 1
         mli = self.items.pop(source_idx)
         self.items.insert(dest_idx, mli)
+        self._itemsChanged()
 
         self._updateItems(rstart, rend)
 
@@ -833,11 +972,13 @@ class ManagedControlList(object):
         li2 = item2._listItem
         item1._listItem = li2
         item2._listItem = li1
+        item1._rendered, item2._rendered = item2._rendered, item1._rendered
 
         item1._updateListItem()
         item2._updateListItem()
         self.items[pos1] = item2
         self.items[pos2] = item1
+        self._itemsChanged()
 
         return True
 
@@ -876,6 +1017,8 @@ class ManagedControlList(object):
             i.onDestroy()
             i.invalidate()
         self.items = []
+        self._rows = []
+        self._itemsChanged()
         self.control.reset()
 
     def size(self):
@@ -899,21 +1042,26 @@ class ManagedControlList(object):
         sort = sort or self._sortKey
 
         self.items.sort(key=sort, reverse=reverse)
+        self._itemsChanged()
 
         self._updateItems(0, self.size())
 
     def reverse(self):
         self.items.reverse()
+        self._itemsChanged()
         self._updateItems(0, self.size())
 
     def getManagedItemPosition(self, mli):
+        idx = self._getIndex()[1].get(id(mli))
+        if idx is not None and idx < self.size() and self.items[idx] is mli:
+            return idx
         return self.items.index(mli)
 
     def isLastItem(self, mli=None):
         return self.getManagedItemPosition(mli or self.getSelectedItem()) + 1 == len(self)
 
     def getListItemFromManagedItem(self, mli):
-        pos = self.items.index(mli)
+        pos = self.getManagedItemPosition(mli)
         return self.control.getListItem(pos)
 
     def topHasFocus(self):
@@ -925,11 +1073,14 @@ class ManagedControlList(object):
     def invalidate(self):
         for item in self.items:
             item._listItem = DUMMY_LIST_ITEM
+            item._rendered = None
+        self._rows = []
 
     def newControl(self, window=None, control_id=None):
         self.controlID = control_id or self.controlID
         self.control = window.getControl(self.controlID)
         self.control.addItems([xbmcgui.ListItem() for i in range(self.size())])
+        self._rows = [newRowState() for i in range(self.size())]
         self._updateItems()
 
 
@@ -0,0 +1,26 @@
+{% extends "base.xml.tpl" %}
+{% block backgroundcolor %}{% endblock %}
+{% block controls %}
+<control type="group">
+    <posx>1360</posx>
+    <posy>20</posy>
+    <control type="image">
+        <posx>0</posx>
+        <posy>0</posy>
+        <width>540</width>
+        <height>400</height>
+        <texture>script.plex/white-square.png</texture>
+        <colordiffuse>B0000000</colordiffuse>
+    </control>
+    <control type="textbox">
+        <posx>15</posx>
+        <posy>10</posy>
+        <width>510</width>
+        <height>380</height>
+        <font>font10</font>
+        <textcolor>FFFFFFFF</textcolor>
+        <shadowcolor>black</shadowcolor>
+        <label>$INFO[Window.Property(trace)]</label>
+    </control>
+</control>
+{% endblock controls %}
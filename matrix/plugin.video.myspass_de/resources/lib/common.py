@@ -12,16 +12,16 @@ import xbmcvfs
 import time
 from datetime import datetime, timedelta
 import io
-import gzip
 import difflib
+import json
+from hashlib import sha1
+import requests
 PY2 = sys.version_info[0] == 2
 if PY2:
 	from urllib import urlencode, quote, quote_plus, unquote_plus  # Python 2.X
-	from urllib2 import build_opener  # Python 2.X
 	TRANS_PATH, LOG_MESSAGE, INPUT_APP = xbmc.translatePath, xbmc.LOGNOTICE, 'inputstreamaddon' # Stand: 05.12.20 / Python 2.X
 else:
 	from urllib.parse import urlencode, quote, quote_plus, unquote_plus  # Python 3.X
-	from urllib.request import build_opener  # Python 3.X
 	TRANS_PATH, LOG_MESSAGE, INPUT_APP = xbmcvfs.translatePath, xbmc.LOGINFO, 'inputstream' # Stand: 05.12.20  / Python 3.X
 
 
@@ -37,6 +37,7 @@ addonPath                             = TRANS_PATH(addon.getAddonInfo('path')).e
 dataPath                                = TRANS_PATH(addon.getAddonInfo('profile')).encode('utf-8').decode('utf-8')
 channelFavsFile                    = os.path.join(dataPath, 'MYSPASS_favourChart.txt')
 WORKFILE                             = os.path.join(dataPath, 'episode_data.txt')
+cacheFolder                          = os.path.join(dataPath, 'cache', '')
 defaultFanart                        = (os.path.join(addonPath, 'fanart.jpg') if PY2 else os.path.join(addonPath, 'resources', 'media', 'fanart.jpg'))
 icon                                         = (os.path.join(addonPath, 'icon.png') if PY2 else os.path.join(addonPath, 'resources', 'media', 'icon.png'))
 artpic                                      = os.path.join(addonPath, 'resources', 'media', '').encode('utf-8').decode('utf-8')
@@ -45,11 +46,19 @@ useThumbAsFanart              = addon.getSetting('useThumbAsFanart') == 'true'
 split_parts = addon.getSetting('splitParts') == 'true'
 enableADJUSTMENT            = addon.getSetting('show_settings') == 'true'
 DEB_LEVEL                            = (LOG_MESSAGE if addon.getSetting('enableDebug') == 'true' else xbmc.LOGDEBUG)
+cacheFresh                            = int(addon.getSetting('cacheFresh') or 10)*60
+CACHE_MAX_AGE                   = 7*24*3600 # unused Cache-Files are removed after one week
 BASE_LONG                           = 'https://www.myspass.de/'
 BASE_URL                              = 'https://www.myspass.de'
 
 xbmcplugin.setContent(ADDON_HANDLE, 'tvshows')
 
+# one pooled Session for all requests of this invocation (listEpisodes fetches the metadata of every episode)
+session = requests.Session()
+session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=4))
+session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=4))
+cacheStats = {'fresh': 0, 'revalidated': 0, 'fetched': 0}
+
 def py2_enc(s, nom='utf-8', ign='ignore'):
 	if PY2:
 		if not isinstance(s, basestring):
@@ -113,23 +122,84 @@ def get_userAgent():
 		return base.format('(X11; CrOS armv7l 7647.78.0)') # ARM based Linux
 	return base.format('(X11; Linux x86_64)') # x86 Linux
 
-def getUrl(url, header=None, data=None, agent=get_userAgent()):
-	opener = build_opener()
-	opener.addheaders = [('User-Agent', agent), ('Accept-Encoding', 'gzip, identity')]
+def read_Cache(FILE):
+	try:
+		with io.open(FILE, 'r', encoding='utf-8') as output:
+			return json.load(output)
+	except (IOError, OSError, ValueError):
+		return None
+
+def write_Cache(FILE, data):
 	try:
-		if header: opener.addheaders = header
-		response = opener.open(url, data, timeout=30)
-		if response.info().get('Content-Encoding') == 'gzip':
-			content = py3_dec(gzip.GzipFile(fileobj=io.BytesIO(response.read())).read())
-		else:
-			content = py3_dec(response.read())
+		if not os.path.isdir(cacheFolder):
+			os.makedirs(cacheFolder)
+		with io.open(FILE+'.tmp', 'w', encoding='utf-8') as input:
+			input.write(py2_uni(json.dumps(data)))
+		try: os.replace(FILE+'.tmp', FILE)
+		except AttributeError: # Python 2.X
+			if os.path.exists(FILE): os.remove(FILE)
+			os.rename(FILE+'.tmp', FILE)
+	except (IOError, OSError) as e:
+		failing("(common.write_Cache) ERROR : ########## {0} === {1} ##########".format(FILE, str(e)))
+
+def clean_Cache():
+	if not os.path.isdir(cacheFolder): return
+	now = time.time()
+	for FILE in os.listdir(cacheFolder):
+		try:
+			if now-os.path.getmtime(os.path.join(cacheFolder, FILE)) > CACHE_MAX_AGE:
+				os.remove(os.path.join(cacheFolder, FILE))
+		except (IOError, OSError): pass
+
+def getUrl(url, header=None, data=None, agent=get_userAgent(), cache=True):
+	# Pages are kept in the Profile-Folder and used as they are for 'cacheFresh' seconds, afterwards they are revalidated with ETag/Last-Modified
+	headers = dict(header) if header else {'User-Agent': agent, 'Accept-Encoding': 'gzip, identity'}
+	cache = cache and not header and data is None
+	FILE = os.path.join(cacheFolder, sha1(url.encode('utf-8')).hexdigest()+'.json')
+	entry = read_Cache(FILE) if cache else None
+	if entry and entry.get('url') == url:
+		if time.time()-os.path.getmtime(FILE) < cacheFresh:
+			cacheStats['fresh'] += 1
+			return py2_enc(entry['content'])
+		if entry.get('etag'): headers['If-None-Match'] = entry['etag']
+		if entry.get('modified'): headers['If-Modified-Since'] = entry['modified']
+	else: entry = None
+	try:
+		response = session.request('POST' if data is not None else 'GET', url, headers=headers, data=data, timeout=30)
+		if entry and response.status_code == 304:
+			cacheStats['revalidated'] += 1
+			os.utime(FILE, None)
+			return py2_enc(entry['content'])
+		response.raise_for_status()
+		content = py3_dec(response.content)
 	except Exception as e:
 		failure = str(e)
 		failing("(common.getUrl) ERROR - ERROR - ERROR : ########## {0} === {1} ##########".format(url, failure))
 		dialog.notification(translation(30521).format('URL'), "ERROR = [COLOR red]{0}[/COLOR]".format(failure), icon, 15000)
 		return sys.exit(0)
+	cacheStats['fetched'] += 1
+	if cache:
+		write_Cache(FILE, {'url': url, 'etag': response.headers.get('ETag'), 'modified': response.headers.get('Last-Modified'), 'content': py2_uni(content)})
 	return py2_enc(content)
 
+def memoize(name, content, parse):
+	# the parsed Structures are stored next to a Checksum of the Page they were parsed from, so an unchanged Page is never parsed again
+	FILE = os.path.join(cacheFolder, 'parsed_'+sha1(name.encode('utf-8') if not PY2 else py2_enc(name)).hexdigest()+'.json')
+	checksum = sha1(content.encode('utf-8') if not PY2 else content).hexdigest()
+	entry = read_Cache(FILE)
+	if entry and entry.get('name') == name and entry.get('checksum') == checksum:
+		debug_MS("(common.memoize) ### REUSED : {0} ###".format(name))
+		os.utime(FILE, None)
+		return entry['data']
+	start = time.time()
+	result = parse(content)
+	debug_MS("(common.memoize) ### PARSED : {0} in {1:.0f}ms ###".format(name, (time.time()-start)*1000))
+	write_Cache(FILE, {'name': name, 'checksum': checksum, 'data': result})
+	return result
+
+def log_Cache():
+	debug_MS("(common.log_Cache) ### PAGES : {0} fresh || {1} revalidated || {2} fetched ###".format(cacheStats['fresh'], cacheStats['revalidated'], cacheStats['fetched']))
+
 def cleaning(text):
 	text = py2_enc(text)
 	for n in (('&lt;', '<'), ('&gt;', '>'), ('&amp;', '&'), ('&apos;', "'"), ("&#x27;", "'"), ('&#34;', '"'), ('&#39;', '\''), ('&#039;', '\''),
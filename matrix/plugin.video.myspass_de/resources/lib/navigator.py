@@ -21,6 +21,7 @@ if not xbmcvfs.exists(dataPath):
 	xbmcvfs.mkdirs(dataPath)
 
 def mainMenu():
+	clean_Cache()
 	addDir(translation(30601), artpic+'favourites.png', {'mode': 'listShowsFavs'})
 	addDir(translation(30602), icon, {'mode': 'listEpisodes', 'url': BASE_LONG})
 	addDir(translation(30603), icon, {'mode': 'listSelections', 'url': 'CHANNELS'})
@@ -45,6 +46,22 @@ def listShows(TYPE):
 	debug_MS("(navigator.listShows) -------------------------------------------------- START = listShows --------------------------------------------------")
 	debug_MS("(navigator.listShows) ### URL or LETTER : {0} ###".format(TYPE))
 	content = getUrl(BASE_URL+'/sendungen-a-bis-z/')
+	for title, link, photo in memoize('listShows:'+TYPE, content, lambda content: parseShows(TYPE, content)):
+		debug_MS("(navigator.listShows) ##### TITLE = {0} || LINK = {1} || IMAGE = {2} #####".format(str(title), link, photo))
+		addType = 1
+		if os.path.exists(channelFavsFile):
+			with open(channelFavsFile, 'r') as output:
+				lines = output.readlines()
+				for line in lines:
+					if line.startswith('###START'):
+						part = line.split('###')
+						if link == part[3]: addType = 2
+		addDir(title, photo, {'mode': 'listSeasons', 'url': link, 'extras': photo, 'origSERIE': title}, addType=addType)
+	log_Cache()
+	xbmcplugin.endOfDirectory(ADDON_HANDLE)
+
+def parseShows(TYPE, content):
+	SHOWS = []
 	if TYPE == 'QM':
 		result = re.compile(r'<h3 class="category__headline">(.*?)</div>          </div>\s*</div>', re.DOTALL).findall(content)[-1]
 	elif len(TYPE) < 4:
@@ -60,17 +77,8 @@ def listShows(TYPE):
 		link = BASE_URL+link if link[:4] != 'http' else link
 		photo = re.compile(r'(?:img["\'] src=|data-src=)["\']([^"]+?)["\']', re.DOTALL).findall(entry)[0].replace('-300x169.', '.')
 		photo = BASE_URL+quote(photo) if photo[:4] != 'http' else quote(photo)
-		debug_MS("(navigator.listShows) ##### TITLE = {0} || LINK = {1} || IMAGE = {2} #####".format(str(title), link, photo))
-		addType = 1
-		if os.path.exists(channelFavsFile):
-			with open(channelFavsFile, 'r') as output:
-				lines = output.readlines()
-				for line in lines:
-					if line.startswith('###START'):
-						part = line.split('###')
-						if link == part[3]: addType = 2
-		addDir(title, photo, {'mode': 'listSeasons', 'url': link, 'extras': photo, 'origSERIE': title}, addType=addType)
-	xbmcplugin.endOfDirectory(ADDON_HANDLE)
+		SHOWS.append((title, link, photo))
+	return SHOWS
 
 def listSelections(TYPE):
 	xbmcplugin.addSortMethod(ADDON_HANDLE, xbmcplugin.SORT_METHOD_LABEL)
@@ -129,9 +137,44 @@ def listEpisodes(url, SERIE):
 	debug_MS("(navigator.listEpisodes) -------------------------------------------------- START = listEpisodes --------------------------------------------------")
 	debug_MS("(navigator.listEpisodes) ### URL : {0} ### SERIE : {1} ###".format(url, SERIE))
 	uno_LIST = []
+	content = getUrl(url).replace('\\', '')
+	EPISODES = memoize('listEpisodes:{0}:{1}:{2}'.format(url, SERIE, str(split_parts)), content, lambda content: parseEpisodes(url, SERIE, content))
+	for episode in EPISODES:
+		episIDD, vidURL, SERIE, name, image, plot, duration, SEAS, EPIS = (episode[key] for key in ('id', 'url', 'show', 'name', 'image', 'plot', 'duration', 'season', 'episode'))
+		EP_entry = episIDD+'###'+str(vidURL)+'###'+str(SERIE)+'###'+str(name)+'###'+str(image)+'###'+str(plot.replace('\n', '#n#').strip())+'###'+str(duration)+'###'+str(SEAS)+'###'+str(EPIS)+'###'
+		if EP_entry not in uno_LIST:
+			uno_LIST.append(EP_entry)
+		listitem = xbmcgui.ListItem(name, path=HOST_AND_PATH+'?IDENTiTY='+episIDD+'&mode=playCODE')
+		info = {}
+		info['Season'] = SEAS
+		info['Episode'] = EPIS
+		info['Tvshowtitle'] = SERIE
+		info['Title'] = name
+		info['Tagline'] = None
+		info['Plot'] = plot
+		info['Duration'] = duration
+		info['Year'] = None
+		info['Genre'] = 'Unterhaltung'
+		info['Studio'] = 'myspass.de'
+		info['Mpaa'] = None
+		info['Mediatype'] = 'episode'
+		listitem.setInfo(type='Video', infoLabels=info)
+		listitem.setArt({'icon': icon, 'thumb': image, 'poster': image, 'fanart': defaultFanart})
+		if useThumbAsFanart and image != icon and not artpic in image:
+			listitem.setArt({'fanart': image})
+		listitem.addStreamInfo('Video', {'Duration':duration})
+		listitem.setProperty('IsPlayable', 'true')
+		listitem.addContextMenuItems([(translation(30654), 'RunPlugin('+HOST_AND_PATH+'?mode=AddToQueue)')])
+		xbmcplugin.addDirectoryItem(handle=ADDON_HANDLE, url=HOST_AND_PATH+'?IDENTiTY='+episIDD+'&mode=playCODE', listitem=listitem)
+	with io.open(WORKFILE, 'w', encoding='utf-8', errors='ignore') as input:
+		input.write(py2_uni('\n'.join(uno_LIST)))
+	log_Cache()
+	xbmcplugin.endOfDirectory(ADDON_HANDLE)
+
+def parseEpisodes(url, SERIE, content):
+	EPISODES = []
 	position = 0
 	startURL = url
-	content = getUrl(url).replace('\\', '')
 	if startURL == BASE_LONG:
 		result = re.findall(r'<div id="content" class="container">(.*?)</article>  </section>', content, re.S)[0]
 		spl = result.split('<div class="homeTeaser-buttons" style=')
@@ -213,34 +256,8 @@ def listEpisodes(url, SERIE):
 		if 'channels/' in startURL:
 			name = translation(30627).format(str(position).zfill(2), newTITLE)
 		plot = Note_1+Note_2+DESC
-		EP_entry = episIDD+'###'+str(vidURL)+'###'+str(SERIE)+'###'+str(name)+'###'+str(image)+'###'+str(plot.replace('\n', '#n#').strip())+'###'+str(duration)+'###'+str(SEAS)+'###'+str(EPIS)+'###'
-		if EP_entry not in uno_LIST:
-			uno_LIST.append(EP_entry)
-		listitem = xbmcgui.ListItem(name, path=HOST_AND_PATH+'?IDENTiTY='+episIDD+'&mode=playCODE')
-		info = {}
-		info['Season'] = SEAS
-		info['Episode'] = EPIS
-		info['Tvshowtitle'] = SERIE
-		info['Title'] = name
-		info['Tagline'] = None
-		info['Plot'] = plot
-		info['Duration'] = duration
-		info['Year'] = None
-		info['Genre'] = 'Unterhaltung'
-		info['Studio'] = 'myspass.de'
-		info['Mpaa'] = None
-		info['Mediatype'] = 'episode'
-		listitem.setInfo(type='Video', infoLabels=info)
-		listitem.setArt({'icon': icon, 'thumb': image, 'poster': image, 'fanart': defaultFanart})
-		if useThumbAsFanart and image != icon and not artpic in image:
-			listitem.setArt({'fanart': image})
-		listitem.addStreamInfo('Video', {'Duration':duration})
-		listitem.setProperty('IsPlayable', 'true')
-		listitem.addContextMenuItems([(translation(30654), 'RunPlugin('+HOST_AND_PATH+'?mode=AddToQueue)')])
-		xbmcplugin.addDirectoryItem(handle=ADDON_HANDLE, url=HOST_AND_PATH+'?IDENTiTY='+episIDD+'&mode=playCODE', listitem=listitem)
-	with io.open(WORKFILE, 'w', encoding='utf-8', errors='ignore') as input:
-		input.write(py2_uni('\n'.join(uno_LIST)))
-	xbmcplugin.endOfDirectory(ADDON_HANDLE)
+		EPISODES.append({'id': episIDD, 'url': vidURL, 'show': SERIE, 'name': name, 'image': image, 'plot': plot, 'duration': duration, 'season': SEAS, 'episode': EPIS})
+	return EPISODES
 
 def playCODE(IDD, direct=False, _primeCacheDirect=False):
 	debug_MS("(navigator.playCODE) -------------------------------------------------- START = playCODE --------------------------------------------------")
@@ -18,6 +18,7 @@ from hashlib import sha1
 import calendar
 from datetime import datetime, timedelta
 import time
+import threading
 
 try:
     import urllib.parse as urllib
@@ -39,6 +40,18 @@ hasMySpass = None
 
 # settings
 split_parts = addon.getSetting('splitParts') == 'true'
+try:
+    cache_ttl = int(addon.getSetting('cacheTTL') or 60) * 60
+except ValueError:
+    cache_ttl = 3600
+
+# one pooled session for all requests of this invocation
+session = requests.Session()
+session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=8))
+session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=8))
+cacheDir = os.path.join(xbmc.translatePath(addon.getAddonInfo('profile')), 'cache')
+# responses of this invocation, so concurrently prefetched ones are used even with the disk cache disabled
+memoryCache = {}
 
 channels = [
                {
@@ -133,6 +146,76 @@ rootDirs = [
            ]
 
 
+def getJSON(url, cache=True):
+    """
+    Returns the parsed JSON response of url. With cache, responses are kept in the addon profile for cache_ttl seconds;
+    token and stream endpoints must not be cached.
+    """
+    if not cache:
+        return session.get(url).json()
+
+    key = sha1(url.encode('utf-8')).hexdigest()
+    text = memoryCache.get(key)
+    fn = os.path.join(cacheDir, '{0}.json'.format(key))
+    if text is None and cache_ttl > 0:
+        try:
+            if time.time() - os.path.getmtime(fn) < cache_ttl:
+                with open(fn, 'rb') as f:
+                    text = f.read().decode('utf-8')
+        except (IOError, OSError):
+            pass
+
+    if text is None:
+        response = session.get(url)
+        if not response.ok:
+            return response.json()
+
+        text = response.text
+        if cache_ttl > 0:
+            try:
+                if not os.path.isdir(cacheDir):
+                    os.makedirs(cacheDir)
+                with open(fn + '.tmp', 'wb') as f:
+                    f.write(text.encode('utf-8'))
+                os.replace(fn + '.tmp', fn)
+            except (IOError, OSError) as e:
+                xbmc.log('Couldn\'t write cache file {0}: {1}'.format(fn, e), xbmc.LOGWARNING)
+
+    memoryCache[key] = text
+    return json.loads(text)
+
+
+def cleanCache():
+    if not os.path.isdir(cacheDir):
+        return
+
+    now = time.time()
+    for fn in os.listdir(cacheDir):
+        path = os.path.join(cacheDir, fn)
+        try:
+            if now - os.path.getmtime(path) >= cache_ttl:
+                os.remove(path)
+        except (IOError, OSError):
+            pass
+
+
+def runConcurrently(*calls):
+    """
+    Runs independent lookups in parallel; their results end up in memoryCache
+    """
+    def run(call):
+        try:
+            call()
+        except Exception as e:
+            xbmc.log('Prefetching failed: {0}'.format(e), xbmc.LOGWARNING)
+
+    threads = [threading.Thread(target=run, args=(call,)) for call in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
 def checkMSAddon():
     global hasMySpass, hasMSRepo
     if os.path.exists(os.path.join(xbmc.translatePath('special://home/addons'), "dontpanickodi")):
@@ -164,6 +247,11 @@ def listShows(entry):
 
 
 def listShowcontent(entry):
+    if entry.get('type') == 'season':
+        # getListItems needs the preview as well
+        runConcurrently(lambda: getContentFull(entry.get('domain'), entry.get('path')),
+                        lambda: getContentPreview(entry.get('domain'), entry.get('path')))
+
     content = getContentFull(entry.get('domain'), entry.get('path'))
     #xbmc.log('content {0}'.format(content))
     if content and len(content) > 0:
@@ -247,13 +335,13 @@ def getContentFull(domain, path):
     parameters = {'query': ' query FullContentQuery($domain: String!, $url: String!, $date: DateTime, $contentType: String, $debug: Boolean!, $authentication: AuthenticationInput) { site(domain: $domain, date: $date, authentication: $authentication) { domain path(url: $url) { content(type: FULL, contentType: $contentType) { ...fContent } somtag(contentType: $contentType) { ...fSomtag } tracking(contentType: $contentType) { ...fTracking } } } } fragment fContent on Content { areas { ...fContentArea } } fragment fContentArea on ContentArea { id containers { ...fContentContainer } filters { ...fFilterOptions } debug @include(if: $debug) { ...fContentDebugInfo } } fragment fContentContainer on ContentContainer { id style elements { ...fContentElement } } fragment fContentElement on ContentElement { id authentication title description component config style highlight navigation { ...fNavigationItem } regwall filters { ...fFilterOptions } update styleModifiers groups { id title total cursor itemSource { type id } items { ...fContentElementItem } debug @include(if: $debug) { ...fContentDebugInfo } } groupLayout debug @include(if: $debug) { ...fContentDebugInfo } } fragment fNavigationItem on NavigationItem { selected href channel { ...fChannelInfo } contentType title items { selected href channel { ...fChannelInfo } contentType title } } fragment fChannelInfo on ChannelInfo { title shortName cssId cmsId } fragment fFilterOptions on FilterOptions { type remote categories { name title options { title id channelId } } } fragment fContentElementItem on ContentElementItem { id url info branding { ...fBrand } body config headline contentType channel { ...fChannelInfo } site picture { url } videoType orientation date duration flags genres valid { from to } epg { episode { ...fEpisode } season { ...fSeason } duration nextEpgInfo { ...fEpgInfo } } debug @include(if: $debug) { ...fContentDebugInfo } } fragment fBrand on Brand { id, name } fragment fEpisode on Episode { number } fragment fSeason on Season { number } fragment fEpgInfo on EpgInfo { time endTime primetime } fragment fContentDebugInfo on ContentDebugInfo { source transformations { description } } fragment fSomtag on Somtag { configs } fragment fTracking on Tracking { context }'}
     parameters.update({'variables': '{{"authentication":null,"contentType":"frontpage","debug":false,"domain":"{0}","isMobile":false,"url":"{1}"}}'.format(domain, path)})
     url = '{0}?{1}'.format(base, urllib.urlencode(parameters).replace('+', '%20'))
-    result = requests.get(url).json()
+    result = getJSON(url)
     if result and path.endswith('/video') and result.get('data', None) and result.get('data').get('site', None) and result.get('data').get('site').get('path', None) and not result.get('data').get('site').get('path').get('somtag'):
         result = getContentFull(domain, '{0}s'.format(path))
     return result
 
 
-def getContentPreview(domain, path):
+def getContentPreview(domain, path, cache=True):
     base = 'https://magellan-api.p7s1.io/content-preview/{0}{1}/graphql'.format(domain, path)
     if path == '/livestream':
         parameters = {'query': 'query PreviewContentQuery($domain: String!, $url: String!, $date: DateTime, $contentType: String, $debug: Boolean!, $authentication: AuthenticationInput) { site(domain: $domain, date: $date, authentication: $authentication) { domain path(url: $url) { route { ...fRoute } page { ...fPage ...fLivestream24Page } content(type: PREVIEW, contentType: $contentType) { ...fContent } mainNav: navigation(type: MAIN) { items { ...fNavigationItem } } metaNav: navigation(type: META) { items { ...fNavigationItem } } channelNav: navigation(type: CHANNEL) { items { ...fNavigationItem } } showsNav: navigation(type: SHOWS) { items { ...fNavigationItem } } footerNav: navigation(type: FOOTER) { items { ...fNavigationItem } } networkNav: navigation(type: NETWORK) { items { ...fNavigationItem } } } } } fragment fRoute on Route { url exists authentication comment contentType name cmsId startDate status endDate } fragment fPage on Page { cmsId contentType pagination { ...fPagination } title shortTitle subheadline proMamsId additionalProMamsIds route source regWall { ...fRegWall } links { ...fLink } metadata { ...fMetadata } breadcrumbs { id href title text } channel { ...fChannel } seo { ...fSeo } modified published flags mainClassNames } fragment fPagination on Pagination { kind limit parent contentType } fragment fRegWall on RegWall { isActive start end } fragment fLink on Link { id classes language href relation title text outbound } fragment fMetadata on Metadata { property name content } fragment fChannel on Channel { name title shortName licenceTerms cssId cmsId proMamsId additionalProMamsIds route image hasLogo liftHeadings, logo sponsors { ...fSponsor } } fragment fSponsor on Sponsor { name url image } fragment fSeo on Seo { title keywords description canonical robots } fragment fLivestream24Page on Livestream24Page { ... on Livestream24Page { livestreamId contentResources epg { name items { ...fEpgItem tvShowTeaser { ...fTeaserItem } } } } } fragment fEpgItem on EpgItem { id title description startTime endTime episode { number } season { number } tvShow { title } images { url title copyright } links { href contentType title } } fragment fTeaserItem on TeaserItem { id url info headline contentType channel { ...fChannelInfo } branding { ...fBrand } site picture { url } videoType orientation date flags valid { from to } epg { episode { ...fEpisode } season { ...fSeason } duration nextEpgInfo { ...fEpgInfo } } } fragment fChannelInfo on ChannelInfo { title shortName cssId cmsId } fragment fBrand on Brand { id, name } fragment fEpisode on Episode { number } fragment fSeason on Season { number } fragment fEpgInfo on EpgInfo { time endTime primetime } fragment fContent on Content { areas { ...fContentArea } } fragment fContentArea on ContentArea { id containers { ...fContentContainer } filters { ...fFilterOptions } debug @include(if: $debug) { ...fContentDebugInfo } } fragment fContentContainer on ContentContainer { id style elements { ...fContentElement } } fragment fContentElement on ContentElement { id authentication title description component config style highlight navigation { ...fNavigationItem } regwall filters { ...fFilterOptions } update styleModifiers groups { id title total cursor itemSource { type id } items { ...fContentElementItem } debug @include(if: $debug) { ...fContentDebugInfo } } groupLayout debug @include(if: $debug) { ...fContentDebugInfo } } fragment fNavigationItem on NavigationItem { selected href channel { ...fChannelInfo } contentType title items { selected href channel { ...fChannelInfo } contentType title } } fragment fFilterOptions on FilterOptions { type remote categories { name title options { title id channelId } } } fragment fContentElementItem on ContentElementItem { id url info branding { ...fBrand } body config headline contentType channel { ...fChannelInfo } site picture { url } videoType orientation date duration flags genres valid { from to } epg { episode { ...fEpisode } season { ...fSeason } duration nextEpgInfo { ...fEpgInfo } } debug @include(if: $debug) { ...fContentDebugInfo } } fragment fContentDebugInfo on ContentDebugInfo { source transformations { description } } '}
@@ -262,9 +350,9 @@ def getContentPreview(domain, path):
         parameters = {'query': ' query PreviewContentQuery($domain: String!, $url: String!, $date: DateTime, $contentType: String, $debug: Boolean!, $authentication: AuthenticationInput) { site(domain: $domain, date: $date, authentication: $authentication) { domain path(url: $url) { route { ...fRoute } page { ...fPage ...fVideoPage } content(type: PREVIEW, contentType: $contentType) { ...fContent } mainNav: navigation(type: MAIN) { items { ...fNavigationItem } } metaNav: navigation(type: META) { items { ...fNavigationItem } } channelNav: navigation(type: CHANNEL) { items { ...fNavigationItem } } showsNav: navigation(type: SHOWS) { items { ...fNavigationItem } } footerNav: navigation(type: FOOTER) { items { ...fNavigationItem } } networkNav: navigation(type: NETWORK) { items { ...fNavigationItem } } } } } fragment fRoute on Route { url exists authentication comment contentType name cmsId startDate status endDate } fragment fPage on Page { cmsId contentType pagination { ...fPagination } title shortTitle subheadline proMamsId additionalProMamsIds route source regWall { ...fRegWall } links { ...fLink } metadata { ...fMetadata } breadcrumbs { id href title text } channel { ...fChannel } seo { ...fSeo } modified published flags mainClassNames } fragment fPagination on Pagination { kind limit parent contentType } fragment fRegWall on RegWall { isActive start end } fragment fLink on Link { id classes language href relation title text outbound } fragment fMetadata on Metadata { property name content } fragment fChannel on Channel { name title shortName licenceTerms cssId cmsId proMamsId additionalProMamsIds route image hasLogo liftHeadings, logo sponsors { ...fSponsor } } fragment fSponsor on Sponsor { name url image } fragment fSeo on Seo { title keywords description canonical robots } fragment fVideoPage on VideoPage { ... on VideoPage { copyright description longDescription duration season episode airdate videoType contentResource image webUrl livestreamStartDate livestreamEndDate recommendation { results { headline subheadline duration url image videoType contentType recoVariation recoSource channel { ...fChannelInfo } } } } } fragment fChannelInfo on ChannelInfo { title shortName cssId cmsId } fragment fContent on Content { areas { ...fContentArea } } fragment fContentArea on ContentArea { id containers { ...fContentContainer } filters { ...fFilterOptions } debug @include(if: $debug) { ...fContentDebugInfo } } fragment fContentContainer on ContentContainer { id style elements { ...fContentElement } } fragment fContentElement on ContentElement { id authentication title description component config style highlight navigation { ...fNavigationItem } regwall filters { ...fFilterOptions } update styleModifiers groups { id title total cursor itemSource { type id } items { ...fContentElementItem } debug @include(if: $debug) { ...fContentDebugInfo } } groupLayout debug @include(if: $debug) { ...fContentDebugInfo } } fragment fNavigationItem on NavigationItem { selected href channel { ...fChannelInfo } contentType title items { selected href channel { ...fChannelInfo } contentType title } } fragment fFilterOptions on FilterOptions { type remote categories { name title options { title id channelId } } } fragment fContentElementItem on ContentElementItem { id url info branding { ...fBrand } body config headline contentType channel { ...fChannelInfo } site picture { url } videoType orientation date duration flags genres valid { from to } epg { episode { ...fEpisode } season { ...fSeason } duration nextEpgInfo { ...fEpgInfo } } debug @include(if: $debug) { ...fContentDebugInfo } } fragment fBrand on Brand { id, name } fragment fEpisode on Episode { number } fragment fSeason on Season { number } fragment fEpgInfo on EpgInfo { time endTime primetime } fragment fContentDebugInfo on ContentDebugInfo { source transformations { description } } '}
         parameters.update({'variables': '{{"authentication":null,"contentType":"livestream24","debug":false,"domain":"{0}","isMobile":false,"url":"{1}"}}'.format(domain, path)})
     url = '{0}{1}?{2}'.format(base, path, urllib.urlencode(parameters).replace('+', '%20'))
-    result = requests.get(url).json()
+    result = getJSON(url, cache=cache)
     if result and path.endswith('/video') and result.get('data', None) and result.get('data').get('site', None) and result.get('data').get('site').get('path', None) and result.get('data').get('site').get('path').get('route').get('status').lower() == 'not_found':
-        result = getContentPreview(domain, '{0}s'.format(path))
+        result = getContentPreview(domain, '{0}s'.format(path), cache=cache)
     return result
 
 
@@ -357,18 +445,29 @@ def getListItems(data, type, domain=None, path=None, cmsId=None, content=None):
 def getShownav(data, content, domain, cmsId):
     if data.get('site', None) and data.get('site').get('path', None) and data.get('site').get('path').get('channelNav', None) and data.get('site').get('path').get('channelNav').get('items', None):
         channelitems = data.get('site').get('path').get('channelNav').get('items')
+        navitems = []
         for channelitem in channelitems:
             if channelitem.get('title').lower() == 'video' or channelitem.get('title').lower() == 'videos':
                 for channelsubitem in channelitem.get('items'):
                     if channelsubitem.get('title').lower().find('staffel') > -1 or channelsubitem.get('title').lower().find('season') > -1:
-                        content.update({'type': 'season', 'cmsId': channelitem.get('channel').get('cmsId')})
-                        citems = content.get('items')
-                        citems.append(getContentInfos(channelsubitem, 'season'))
-                        content.update({'items': citems})
+                        navitems.append(('season', channelitem, channelsubitem))
                     elif channelsubitem.get('title').lower().find('episode') > -1 or channelsubitem.get('title').lower().find('folge') > -1:
-                        subcontent = getContentFull(domain, channelsubitem.get('href'))
-                        content = getListItems(subcontent.get('data'), 'episode', domain, channelsubitem.get('href'), cmsId, content)
-                        content.update({'type': 'episode'})
+                        navitems.append(('episode', channelitem, channelsubitem))
+
+        # fetch all episode lists at once
+        runConcurrently(*[lambda href=channelsubitem.get('href'): getContentFull(domain, href)
+                          for navtype, channelitem, channelsubitem in navitems if navtype == 'episode'])
+
+        for navtype, channelitem, channelsubitem in navitems:
+            if navtype == 'season':
+                content.update({'type': 'season', 'cmsId': channelitem.get('channel').get('cmsId')})
+                citems = content.get('items')
+                citems.append(getContentInfos(channelsubitem, 'season'))
+                content.update({'items': citems})
+            else:
+                subcontent = getContentFull(domain, channelsubitem.get('href'))
+                content = getListItems(subcontent.get('data'), 'episode', domain, channelsubitem.get('href'), cmsId, content)
+                content.update({'type': 'episode'})
 
     return content
 
@@ -538,7 +637,7 @@ def playVideo(entry):
             'client_location': entry.get('path'),
             'client_name': client_name
         }))
-    json_data = requests.get(json_url).json()
+    json_data = getJSON(json_url, cache=False)
 
     if isInputstream:
         for stream in json_data['sources']:
@@ -563,7 +662,7 @@ def playVideo(entry):
         'client_name':  client_name,
         'client_id': client_id_1
     }))
-    json_data = requests.get(json_url).json()
+    json_data = getJSON(json_url, cache=False)
     server_id = json_data['server_id']
 
     # client_name = 'kolibri-1.2.5'
@@ -577,7 +676,7 @@ def playVideo(entry):
         'source_ids': str(source_id),
     }))
 
-    json_data = requests.get(url_api_url).json()
+    json_data = getJSON(url_api_url, cache=False)
     max_id = 0
     for stream in json_data["sources"]:
         ul = stream["url"]
@@ -622,7 +721,7 @@ def playLive(entry):
         'secure_delivery': 'true'
     }))
 
-    data = requests.get(url).json()
+    data = getJSON(url, cache=False)
 
     server_token = data.get('server_token')
     salt = '01!8d8F_)r9]4s[qeuXfP%'
@@ -638,7 +737,7 @@ def playLive(entry):
         'secure_delivery': 'true'
     }))
 
-    data = requests.get(url).json()['urls']['dash']['widevine']
+    data = getJSON(url, cache=False)['urls']['dash']['widevine']
 
     li = xbmcgui.ListItem(path='{0}|{1}'.format(data['url'], userAgent))
     li.setProperty('inputstream.adaptive.license_type', 'com.widevine.alpha')
@@ -671,7 +770,8 @@ def rootDir():
 
 
 def listLiveChannels():
-    content = getContentPreview(channels[0].get('domain'), '/livestream')
+    # the EPG changes constantly
+    content = getContentPreview(channels[0].get('domain'), '/livestream', cache=False)
     epg_data = None
     if content.get('data') and content.get('data').get('site') and content.get('data').get('site').get('path') and content.get('data').get('site').get('path').get('page') and content.get('data').get('site').get('path').get('page').get('epg'):
         epg_data = content.get('data').get('site').get('path').get('page').get('epg')
@@ -747,4 +847,5 @@ if 'action' in params:
     elif action == 'refresh':
         xbmc.executebuiltin("Container.Refresh")
 else:
+    cleanCache()
     rootDir()
@@ -4,9 +4,10 @@ import logging
 import tempfile
 import sys
 
-from lib.logging import log
+from lib.logging import log, shutdown as shutdownLogging
 # noinspection PyUnresolvedReferences
 from lib.kodi_util import translatePath, xbmc, setGlobalProperty, getGlobalProperty
+from kodi_six import xbmcaddon
 from tendo_singleton import SingleInstance, SingleInstanceException
 
 
@@ -48,7 +49,17 @@ try:
 
             with SingleInstance("pm4k"):
                 started = True
-                from lib import main
+                profiler = None
+                if xbmcaddon.Addon().getSetting('debug_import_profile') == 'true':
+                    from lib.import_profiler import ImportProfiler
+                    profiler = ImportProfiler().start()
+
+                try:
+                    from lib import main
+                finally:
+                    if profiler:
+                        profiler.stop().report('lib.main')
+
                 waited = 0
                 if boot_delay:
                     set_waiting_for_start = True
@@ -79,3 +90,5 @@ finally:
         setGlobalProperty('started', '')
     if set_waiting_for_start:
         setGlobalProperty('waiting_for_start', '')
+    # paths exiting before lib.main would otherwise leave the log writer running (and its records unwritten)
+    shutdownLogging()
@@ -0,0 +1,212 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+import six
+
+from . import util
+
+# indexes kept at once
+MAX_INDEXES = 8
+# an index not updated for this long isn't trusted anymore
+INDEX_TTL = 600
+# a complete index is checked against the server's jump list again after this long
+RECHECK_INTERVAL = 120
+NON_ALPHA = '#'
+
+
+def firstCharacter(title):
+    """
+    Returns the jump list character of a titleSort the way PMS groups them: accents are dropped from latin letters,
+    other letters are kept as they are and everything else ends up in "#". Articles don't need handling here, as PMS
+    already strips them from titleSort.
+    """
+    title = six.text_type(title).lstrip()
+    if not title:
+        return NON_ALPHA
+
+    char = title[0]
+    base = unicodedata.normalize('NFKD', char)[0].upper()
+    if 'A' <= base <= 'Z':
+        return base
+    if char.isalpha():
+        return char.upper()
+    return NON_ALPHA
+
+
+class JumpIndex(object):
+    """
+    The first characters of a section listing, filled in as its chunks arrive. Kept in ascending order, so a
+    descending listing fills the same index.
+    """
+    def __init__(self, total):
+        self.total = total
+        self.chars = [None] * total
+        self.known = 0
+        self.updated = time.time()
+        # when the index last matched the server's jump list
+        self.checked = 0
+
+    @property
+    def complete(self):
+        return self.known == self.total
+
+    def add(self, start, items, descending=False):
+        if not len(items):
+            # the all(0, 0) probe for the total size doesn't confirm anything, so it mustn't keep the index alive
+            return
+
+        for offset, item in enumerate(items):
+            pos = start + offset
+            if not item or pos >= self.total:
+                continue
+
+            if descending:
+                pos = self.total - 1 - pos
+
+            if self.chars[pos] is None:
+                self.known += 1
+            self.chars[pos] = firstCharacter(item.titleSort or item.title)
+        self.updated = time.time()
+
+    def groups(self, descending=False):
+        """
+        Returns [(character, count), ...] in listing order or None when the characters aren't contiguous, which means
+        our grouping doesn't match the server's sorting
+        """
+        groups = []
+        seen = set()
+        for char in self.chars:
+            if groups and groups[-1][0] == char:
+                groups[-1][1] += 1
+                continue
+            if char in seen:
+                return None
+            seen.add(char)
+            groups.append([char, 1])
+
+        groups = [tuple(g) for g in groups]
+        if descending:
+            groups.reverse()
+        return groups
+
+
+class JumpIndexes(object):
+    """
+    Jump lists of recently listed sections, built locally from titleSort so a complete listing doesn't need another
+    /firstCharacter request.
+
+    Whenever the server's jump list had to be fetched, it's compared with the index once that's complete; on a
+    mismatch the section falls back to the server for good. A complete index is only served for RECHECK_INTERVAL
+    after it last matched; then the server's jump list is fetched again and an index not matching it anymore is
+    dropped as outdated. Indexes of listings that might have changed are dropped using invalidate().
+    """
+    def __init__(self):
+        self._indexes = OrderedDict()
+        self._expected = OrderedDict()
+        self._mismatched = set()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        index = self._indexes.get(key)
+        if index and time.time() - index.updated > INDEX_TTL:
+            del self._indexes[key]
+            return None
+        return index
+
+    def _compare(self, key, index, expected, recheck=False):
+        total = sum(count for char, count in expected)
+        if total == index.total and index.groups() == expected:
+            index.checked = time.time()
+            return
+
+        if recheck:
+            # the listing changed since the index was built, the following chunks build a new one
+            util.DEBUG_LOG('JumpIndex: Local jump list of {0} is outdated, dropping it', key)
+            self._indexes.pop(key, None)
+        elif total == index.total:
+            util.LOG('JumpIndex: Local jump list of {0} differs from the server, not using it anymore', key)
+            self._mismatched.add(key[:2])
+            self._indexes.pop(key, None)
+        # otherwise the listing changed in between and the index stays unchecked
+
+    def add(self, key, start, items, descending=False):
+        total = items.totalSize.asInt()
+        with self._lock:
+            if key[:2] in self._mismatched:
+                return
+
+            index = self._get(key)
+            if not index or index.total != total:
+                # the listing changed, start over
+                index = JumpIndex(total)
+            self._indexes.pop(key, None)
+            self._indexes[key] = index
+            while len(self._indexes) > MAX_INDEXES:
+                self._indexes.popitem(last=False)
+
+            index.add(start, items, descending)
+            if index.complete and key in self._expected:
+                self._compare(key, index, self._expected.pop(key))
+
+    def jumpList(self, key, descending=False):
+        """
+        Returns [(character, count), ...] when the listing is fully known, None otherwise
+        """
+        with self._lock:
+            index = self._get(key)
+            if not index or not index.complete or key[:2] in self._mismatched:
+                return None
+
+            if time.time() - index.checked > RECHECK_INTERVAL:
+                # have the server's jump list fetched, to check the index against it
+                return None
+
+            groups = index.groups(descending)
+
+        if groups is None:
+            util.DEBUG_LOG('JumpIndex: Characters of {0} not contiguous, using the server', key)
+        return groups
+
+    def expect(self, key, groups, descending=False):
+        """
+        Remembers the server's jump list, to check the index against it once it's complete; a complete index is
+        checked right away
+        """
+        groups = list(groups)
+        if descending:
+            groups.reverse()
+
+        with self._lock:
+            index = self._get(key)
+            if index and index.complete:
+                self._expected.pop(key, None)
+                self._compare(key, index, groups, recheck=True)
+                return
+
+            self._expected.pop(key, None)
+            self._expected[key] = groups
+            while len(self._expected) > MAX_INDEXES:
+                self._expected.popitem(last=False)
+
+    def invalidate(self, uuid=None, section=None):
+        """
+        Drops the indexes of a server's library section, of all sections of a server or, without arguments, all
+        indexes; for whenever listings might have changed
+        """
+        def matches(key):
+            return (uuid is None or key[0] == uuid) and (section is None or key[1] == section)
+
+        with self._lock:
+            for store in (self._indexes, self._expected):
+                for key in [key for key in store if matches(key)]:
+                    del store[key]
+
+        util.DEBUG_LOG('JumpIndex: Invalidated server: {0}, section: {1}', uuid or 'all', section or 'all')
+
+
+INDEXES = JumpIndexes()
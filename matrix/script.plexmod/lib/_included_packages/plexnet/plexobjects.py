@@ -3,6 +3,7 @@ from datetime import datetime
 
 from . import exceptions
 from . import util
+from . import watchstate
 import json
 import six
 import time
@@ -233,13 +234,15 @@ class PlexObject(Checks):
         import requests
         self.server.query('%s/refresh' % self.key, method=requests.put)
 
-    def reload(self, _soft=False, **kwargs):
-        """ Reload the data for this object from PlexServer XML. """
+    def reload(self, _soft=False, _data=None, **kwargs):
+        """ Reload the data for this object from PlexServer XML, or from _data if it's been fetched already. """
         if _soft and self._reloaded:
             return self
 
         try:
-            if self.get('ratingKey'):
+            if _data is not None:
+                data = _data
+            elif self.get('ratingKey'):
                 data = self.server.query('/library/metadata/{0}'.format(self.ratingKey), params=kwargs)
             else:
                 data = self.server.query(self.key, params=kwargs)
@@ -259,6 +262,7 @@ class PlexObject(Checks):
             util.DEBUG_LOG('No data on reload: {0}', self)
             return self
 
+        watchstate.QUEUE.reapply(self)
         return self
 
     def softReload(self, **kwargs):
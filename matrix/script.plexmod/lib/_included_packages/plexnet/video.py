@@ -10,6 +10,7 @@ from . import compat
 from . import plexlibrary
 from . import util
 from . import mediachoice
+from . import watchstate
 from .mixins import AudioCodecMixin
 
 from lib.data_cache import dcm
@@ -258,6 +259,26 @@ class Video(media.MediaItem, AudioCodecMixin):
         self.server.query(path)
         self.reload(**kwargs)
 
+    def setWatched(self, watched, parents=None):
+        """
+        Marks this item watched or unwatched locally and queues the change for the server; see
+        watchstate.WatchStateQueue
+        """
+        watchstate.QUEUE.mark(self, watched, parents=parents)
+
+    def applyWatched(self, watched):
+        if self.get('leafCount'):
+            self.set('viewedLeafCount', watched and self.get('leafCount').asInt() or 0)
+            return
+
+        if self.get('viewOffset'):
+            del self.viewOffset
+
+        if watched:
+            self.set('viewCount', max(self.get('viewCount').asInt(), 1))
+        elif self.get('viewCount'):
+            del self.viewCount
+
     # def play(self, client):
     #     client.playMedia(self)
 
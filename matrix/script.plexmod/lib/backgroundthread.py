@@ -1,9 +1,11 @@
 from __future__ import absolute_import
 import six.moves.queue
 import heapq
+import time
 from kodi_six import xbmc
 from . import util
 from plexnet import threadutils
+from plexnet import tracing
 from six.moves import range
 
 
@@ -66,6 +68,10 @@ class Task:
 
 
 class MutablePriorityQueue(six.moves.queue.PriorityQueue):
+    def _put(self, item):
+        item._queuedAt = time.time()
+        six.moves.queue.PriorityQueue._put(self, item)
+
     def _get(self, heappop=heapq.heappop):
         self.queue.sort()
         return heappop(self.queue)
@@ -95,7 +101,10 @@ class BackgroundWorker:
         if task._canceled:
             return
         try:
-            task._run()
+            with tracing.TRACER.span(task.__class__.__name__, "task") as span:
+                if span:
+                    span.phase("wait", time.time() - task._queuedAt)
+                task._run()
         except:
             util.ERROR()
 
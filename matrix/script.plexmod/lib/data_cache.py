@@ -10,7 +10,7 @@ from kodi_six import xbmcvfs
 
 from plexnet import plexapp
 
-from . util import translatePath, ADDON, ERROR, DEBUG_LOG, LOG
+from . util import translatePath, ADDON, ERROR, DEBUG_LOG, LOG, Deferred
 
 
 class DataCacheManager(object):
@@ -57,6 +57,10 @@ class DataCacheManager(object):
                 self.DATA_CACHES["general"]["updated"] = time.time()
                 self.storeDataCache()
 
+        # we might've been created after the server was selected
+        if plexapp.SERVERMANAGER:
+            self.setServerUUID()
+
     def deinit(self):
         plexapp.util.APP.off('change:selectedServer', self.setServerUUID)
 
@@ -118,4 +122,5 @@ class DataCacheManager(object):
                 ERROR("Couldn't write data_cache.json")
 
 
-dcm = DataCacheManager()
+# loaded on first use, so reading data_cache.json doesn't delay the startup
+dcm = Deferred(DataCacheManager)
@@ -0,0 +1,127 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import os
+import threading
+
+from kodi_six import xbmc
+from plexnet import http
+
+from . import util
+
+CACHE_DIR = os.path.join(util.PROFILE, 'subtitles')
+# subtitle files kept, the least recently used ones are removed first
+MAX_FILES = 100
+DOWNLOAD_TIMEOUT = 10
+# how long setting a subtitle waits for its download before handing Kodi the server URL instead
+WAIT_TIMEOUT = 5
+
+
+class SubtitleCache(object):
+    """
+    Keeps external subtitle streams in the addon profile, so Kodi doesn't have to download them from the server
+    during player setup, on every resume or replay, and whenever the subtitle stream is switched.
+
+    Files are keyed by stream ID and the item's updatedAt, so refreshed metadata leads to a new download.
+    """
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._language = None
+
+    @property
+    def preferredLanguage(self):
+        if self._language is None:
+            self._language = xbmc.getLanguage(xbmc.ISO_639_2) or ''
+        return self._language
+
+    def _path(self, stream, video):
+        ext = stream.codec == 'smi' and 'srt' or stream.codec or 'srt'
+        return os.path.join(CACHE_DIR, '{0}-{1}.{2}'.format(stream.id, video.updatedAt or 0, ext))
+
+    def prefetch(self, video):
+        """
+        Downloads the selected external subtitle stream and those in the preferred language in the background
+        """
+        try:
+            for stream in video.subtitleStreams:
+                if stream.key and (stream.isSelected() or stream.languageCode == self.preferredLanguage):
+                    self._fetch(stream, video)
+        except:
+            util.ERROR()
+
+    def _fetch(self, stream, video):
+        path = self._path(stream, video)
+        with self._lock:
+            if path in self._pending:
+                return self._pending[path]
+
+            done = threading.Event()
+            if os.path.exists(path):
+                done.set()
+                return done
+
+            self._pending[path] = done
+
+        thread = threading.Thread(target=self._download, args=(stream.getSubtitleServerPath(), path, done),
+                                  name='SUBTITLE-CACHE')
+        thread.daemon = True
+        thread.start()
+        return done
+
+    def _download(self, url, path, done):
+        try:
+            if not os.path.isdir(CACHE_DIR):
+                os.makedirs(CACHE_DIR)
+
+            res = http.HttpRequest(url).session.get(url, timeout=DOWNLOAD_TIMEOUT)
+            if res.status_code != 200:
+                util.DEBUG_LOG('SubtitleCache: Bad status {0} for: {1}', res.status_code, path)
+                return
+
+            with open(path + '.tmp', 'wb') as f:
+                f.write(res.content)
+            os.rename(path + '.tmp', path)
+            util.DEBUG_LOG('SubtitleCache: Stored: {0}', path)
+
+            self._evict()
+        except:
+            util.ERROR('SubtitleCache: Download failed: {0}'.format(path))
+        finally:
+            with self._lock:
+                self._pending.pop(path, None)
+            done.set()
+
+    def _evict(self):
+        files = [os.path.join(CACHE_DIR, fn) for fn in os.listdir(CACHE_DIR) if not fn.endswith('.tmp')]
+        if len(files) <= MAX_FILES:
+            return
+
+        files.sort(key=os.path.getmtime)
+        for path in files[:-MAX_FILES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def getPath(self, stream, video):
+        """
+        Returns the local path of an external subtitle stream, downloading it if needed; falls back to the server URL
+        """
+        if not stream.key:
+            return None
+
+        path = self._path(stream, video)
+        if self._fetch(stream, video).wait(WAIT_TIMEOUT) and os.path.exists(path):
+            try:
+                # keep it around
+                os.utime(path, None)
+            except OSError:
+                pass
+            return path
+
+        util.DEBUG_LOG('SubtitleCache: Not available in time, using the server: {0}', stream)
+        return stream.getSubtitleServerPath()
+
+
+CACHE = SubtitleCache()
@@ -2,6 +2,7 @@
 from __future__ import absolute_import
 
 import gc
+import importlib
 import os
 import sys
 import re
@@ -36,7 +37,7 @@ from kodi_six import xbmcvfs
 from . import colors
 # noinspection PyUnresolvedReferences
 from .exceptions import NoDataException
-from .logging import log, log_error
+from .logging import log, log_error, shutdown as shutdownLogging
 # noinspection PyUnresolvedReferences
 from .i18n import T
 from . import aspectratio
@@ -213,6 +214,7 @@ class AddonSettings(object):
         ("cache_home_users", True),
         ("intro_marker_max_offset", 600),
         ("hubs_rr_max", 250),
+        ("hubs_push_updates", False),
         ("max_retries1", 3),
         ("use_cert_bundle", "acme"),
         ("cache_templates", True),
@@ -221,6 +223,17 @@ class AddonSettings(object):
         ("honor_plextv_dnsrebind", True),
         ("honor_plextv_pam", True),
         ("coreelec_resume_seek_wait", 350),
+        ("preload_items", True),
+        ("preload_dwell_time", 1.0),
+        ("preload_neighbours", 0),
+        ("preload_max_size", 1024),
+        ("preload_ttl", 120),
+        ("resolve_next_item", True),
+        ("resolve_next_item_lead", 60),
+        ("resolve_next_item_ttl", 600),
+        ("debug_tracing", False),
+        ("debug_trace_overlay", False),
+        ("debug_import_profile", False),
     )
 
     def __init__(self):
@@ -236,6 +249,35 @@ addonSettings = AddonSettings()
 DEBUG = addonSettings.debug
 
 
+class DebugLevel(object):
+    """
+    Caches whether debug logging is enabled. Our own debug setting notifies us when it changes; Kodi's
+    debug.showloginfo doesn't, so that one is re-checked every REFRESH_INTERVAL seconds.
+    """
+    REFRESH_INTERVAL = 10
+
+    def __init__(self):
+        self._kodiDebug = None
+        self._checked = 0
+
+    @property
+    def enabled(self):
+        if addonSettings.debug:
+            return True
+
+        now = time.time()
+        if self._kodiDebug is None or now - self._checked > self.REFRESH_INTERVAL:
+            self._kodiDebug = xbmc.getCondVisibility('System.GetBool(debug.showloginfo)')
+            self._checked = now
+        return self._kodiDebug
+
+    def refresh(self, *args, **kwargs):
+        self._kodiDebug = None
+
+
+DEBUG_LEVEL = DebugLevel()
+
+
 def LOG(msg, *args, **kwargs):
     return log(msg, *args, **kwargs)
 
@@ -244,7 +286,7 @@ def DEBUG_LOG(msg, *args, **kwargs):
     if _SHUTDOWN:
         return
 
-    if not addonSettings.debug and not xbmc.getCondVisibility('System.GetBool(debug.showloginfo)'):
+    if not DEBUG_LEVEL.enabled:
         return
 
     return log(msg, *args, **kwargs)
@@ -353,8 +395,7 @@ class UtilityMonitor(xbmc.Monitor, signalsmixin.SignalsMixin):
         #self.stopPlayback()
 
     def onSettingsChanged(self):
-        """ unused stub, but works if needed """
-        pass
+        DEBUG_LEVEL.refresh()
 
 
 MONITOR = UtilityMonitor()
@@ -370,6 +411,7 @@ def getAdvancedSettings():
     # yes, global, hang me!
     global addonSettings
     addonSettings = AddonSettings()
+    DEBUG_LEVEL.refresh()
 
 
 def reInitAddon():
@@ -653,7 +695,56 @@ slideshowInterval = getKodiSlideshowInterval()
 CRON = None
 
 
+class Deferred(object):
+    """
+    Stands in for an object that's expensive to create, such as a singleton doing I/O in its constructor or a heavy
+    module, and creates it on first attribute access
+    """
+    def __init__(self, factory):
+        self.__dict__['_factory'] = factory
+        self.__dict__['_obj'] = None
+        self.__dict__['_lock'] = threading.RLock()
+
+    @property
+    def loaded(self):
+        return self._obj is not None
+
+    def get(self):
+        obj = self._obj
+        if obj is None:
+            with self._lock:
+                if self._obj is None:
+                    self.__dict__['_obj'] = self._factory()
+                obj = self._obj
+        return obj
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self.get(), name, value)
+
+
+class DeferredModule(Deferred):
+    """
+    Imports the module on first attribute access
+    """
+    def __init__(self, name):
+        Deferred.__init__(self, lambda: importlib.import_module(name))
+        self.__dict__['_name'] = name
+
+    @property
+    def loaded(self):
+        # the module might've been imported directly elsewhere
+        return self._name in sys.modules
+
+
 class CronReceiver():
+    # seconds between ticks; None ticks at the Cron's interval
+    cronInterval = None
+    # don't tick while the screensaver or DPMS is active or the system sleeps
+    cronLowPriority = False
+
     def tick(self):
         pass
 
@@ -664,20 +755,52 @@ class CronReceiver():
         pass
 
 
+class CronSchedule(object):
+    __slots__ = ("deadline", "ticks", "cost", "maxCost")
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+        self.ticks = 0
+        self.cost = 0.0
+        self.maxCost = 0.0
+
+    def record(self, cost):
+        self.ticks += 1
+        self.cost += cost
+        self.maxCost = max(self.maxCost, cost)
+
+
 class Cron(threading.Thread):
+    """
+    Ticks each receiver at its own cadence. The thread sleeps until the earliest deadline, a forceTick or a change in
+    receivers or idle state, instead of polling.
+    """
+    # upper bound for a single sleep, so we notice an abort request and half hour changes
+    MAX_SLEEP = 1.0
+    SLOW_TICK = 0.1
+    IDLE_EVENTS = (("screensaver.activated", "screensaver.deactivated", "screensaver"),
+                   ("dpms.activated", "dpms.deactivated", "dpms"),
+                   ("system.sleep", "system.wakeup", "sleep"))
+
     def __init__(self, interval):
         threading.Thread.__init__(self, name='CRON')
         self.stopped = threading.Event()
         self.force = threading.Event()
+        self.wake = threading.Event()
         self.interval = interval
         self._lastHalfHour = self._getHalfHour()
         self._receivers = []
+        self._schedules = {}
+        self._idle = set()
+        self._lock = threading.Lock()
+        self._idleCallbacks = []
 
         global CRON
 
         CRON = self
 
     def __enter__(self):
+        self._hookIdleEvents()
         self.start()
         DEBUG_LOG('Cron started with interval: {}'.format(self.interval))
         return self
@@ -685,43 +808,116 @@ class Cron(threading.Thread):
     def __exit__(self, exc_type, exc_value, traceback):
         self.stop()
         self.join()
+        self._unhookIdleEvents()
+
+    def _hookIdleEvents(self):
+        for on, off, reason in self.IDLE_EVENTS:
+            self._idleCallbacks.append((on, self._idleCallback(reason, True)))
+            self._idleCallbacks.append((off, self._idleCallback(reason, False)))
+
+        for signal, cb in self._idleCallbacks:
+            MONITOR.on(signal, cb)
+
+    def _unhookIdleEvents(self):
+        for signal, cb in self._idleCallbacks:
+            MONITOR.off(signal, cb)
+        self._idleCallbacks = []
+
+    def _idleCallback(self, reason, idle):
+        def cb(*args, **kwargs):
+            self._setIdle(reason, idle)
+        return cb
+
+    def _setIdle(self, reason, idle):
+        if idle:
+            self._idle.add(reason)
+        else:
+            self._idle.discard(reason)
+            # catch up on what we skipped
+            self.wake.set()
+        DEBUG_LOG('Cron: Idle: {}', lambda: ", ".join(sorted(self._idle)) or "no")
+
+    @property
+    def idle(self):
+        return bool(self._idle)
 
     def _wait(self):
-        ct = 0
-        while ct < self.interval:
-            xbmc.sleep(100)
-            ct += 0.1
-            if self.force.isSet():
+        while not self.stopped.isSet() and not MONITOR.abortRequested():
+            now = time.time()
+            with self._lock:
+                deadlines = [self._schedules[r].deadline for r in self._receivers if self._isActive(r)]
+
+            timeout = min(min(deadlines) - now if deadlines else self.MAX_SLEEP, self.MAX_SLEEP)
+            if timeout > 0 and not self.force.isSet():
+                self.wake.wait(timeout)
+                self.wake.clear()
+
+            if self.stopped.isSet() or MONITOR.abortRequested():
+                break
+
+            forced = self.force.isSet()
+            if forced:
                 self.force.clear()
-                return True
-            if MONITOR.abortRequested() or self.stopped.isSet():
-                return False
-        return True
+            return forced
+        return None
 
     def forceTick(self):
         self.force.set()
+        self.wake.set()
 
     def stop(self):
         self.stopped.set()
+        self.wake.set()
 
     def run(self):
-        while self._wait():
-            self._tick()
+        while True:
+            forced = self._wait()
+            if forced is None:
+                break
+            self._tick(forced)
+
+        for r, schedule in list(self._schedules.items()):
+            self._logStats(r, schedule)
         DEBUG_LOG('Cron stopped')
 
     def _getHalfHour(self):
         tid = timeInDayLocalSeconds() / 60
         return tid - (tid % 30)
 
-    def _tick(self):
-        receivers = list(self._receivers)
+    def _isActive(self, receiver):
+        return not (receiver.cronLowPriority and self._idle)
+
+    def _interval(self, receiver):
+        return receiver.cronInterval or self.interval
+
+    def _tick(self, forced=False):
+        with self._lock:
+            receivers = list(self._receivers)
         receivers = self._halfHour(receivers)
+
+        now = time.time()
         for r in receivers:
+            schedule = self._schedules.get(r)
+            if not schedule or not self._isActive(r) or (not forced and schedule.deadline > now):
+                continue
+
+            start = time.time()
             try:
                 r.tick()
             except:
                 ERROR()
 
+            cost = time.time() - start
+            schedule.record(cost)
+            if cost > self.SLOW_TICK:
+                DEBUG_LOG('Cron: Slow tick of {0}: {1:.3f}s', r, cost)
+
+            # don't try to catch up on missed ticks
+            now = time.time()
+            schedule.deadline += self._interval(r)
+            if schedule.deadline <= now:
+                schedule.deadline = now + self._interval(r)
+
     def _halfHour(self, receivers):
         hh = self._getHalfHour()
         if hh == self._lastHalfHour:
@@ -753,15 +949,36 @@ class Cron(threading.Thread):
                 ERROR()
         return ret
 
+    def _logStats(self, receiver, schedule):
+        if schedule.ticks:
+            DEBUG_LOG('Cron: {0}: {1} ticks, avg {2:.4f}s, max {3:.4f}s', receiver, schedule.ticks,
+                      schedule.cost / schedule.ticks, schedule.maxCost)
+
+    def stats(self):
+        """
+        Returns {receiver: (ticks, total cost, max cost)} of the current receivers
+        """
+        with self._lock:
+            return dict((r, (s.ticks, s.cost, s.maxCost)) for r, s in self._schedules.items())
+
     def registerReceiver(self, receiver):
-        if receiver not in self._receivers:
+        with self._lock:
+            if receiver in self._receivers:
+                return
             DEBUG_LOG('Cron: Receiver added: {0}'.format(receiver))
             self._receivers.append(receiver)
+            self._schedules[receiver] = CronSchedule(time.time() + self._interval(receiver))
+        self.wake.set()
 
     def cancelReceiver(self, receiver):
-        if receiver in self._receivers:
+        with self._lock:
+            if receiver not in self._receivers:
+                return
             DEBUG_LOG('Cron: Receiver canceled: {0}'.format(receiver))
             self._receivers.pop(self._receivers.index(receiver))
+            schedule = self._schedules.pop(receiver, None)
+        if schedule:
+            self._logStats(receiver, schedule)
 
 
 def getTimeFormat():
@@ -1090,3 +1307,4 @@ def shutdown():
     del MONITOR
     del T
     del ADDON
+    shutdownLogging()
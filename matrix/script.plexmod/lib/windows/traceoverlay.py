@@ -0,0 +1,65 @@
+from __future__ import absolute_import
+
+from plexnet import tracing
+
+from lib import util
+from . import kodigui
+
+# number of most recent spans listed below the summary
+RECENT_SPANS = 12
+
+PHASES = ("wait", "dns", "connect", "tls", "ttfb", "transfer")
+
+
+def ms(seconds):
+    return '{0:.0f}'.format(seconds * 1000)
+
+
+class TraceOverlay(kodigui.BaseDialog, util.CronReceiver):
+    """
+    Non-modal dialog showing a live summary of the spans recorded by plexnet.tracing
+    """
+    xmlFile = 'script-plex-trace_overlay.xml'
+    path = util.ADDON.getAddonInfo('path')
+    theme = 'Main'
+    res = '1080i'
+    width = 1920
+    height = 1080
+
+    cronInterval = 1
+    cronLowPriority = True
+
+    def onFirstInit(self):
+        self.tick()
+        util.CRON.registerReceiver(self)
+
+    def onCloseSignal(self, *args, **kwargs):
+        # stay open when the other dialogs are closed
+        pass
+
+    def doClose(self):
+        util.CRON.cancelReceiver(self)
+        kodigui.BaseDialog.doClose(self)
+
+    def tick(self):
+        lines = []
+        for cat, (count, avg, peak) in sorted(tracing.TRACER.summary().items()):
+            lines.append('[B]{0}[/B]: {1}x, avg {2}ms, max {3}ms'.format(cat, count, ms(avg), ms(peak)))
+
+        if lines:
+            lines.append('')
+
+        for span in reversed(tracing.TRACER.spans()[-RECENT_SPANS:]):
+            detail = span.args.get('path') or span.args.get('url') or ''
+            phases = ' '.join('{0} {1}'.format(p, ms(span.phases[p])) for p in PHASES if p in span.phases)
+            lines.append('{0}ms {1} {2}{3}'.format(ms(span.duration), span.name, detail,
+                                                   phases and ' [{0}]'.format(phases) or ''))
+
+        self.setProperty('trace', '[CR]'.join(lines))
+
+
+def start():
+    if not tracing.TRACER.enabled or not util.addonSettings.debugTraceOverlay:
+        return None
+
+    return TraceOverlay.create()
@@ -237,23 +237,37 @@ def search_subs(params):
         else:
             if isinstance(results, list):
                 logger.info('Multiple episodes found:\n{0}'.format(results))
+                # load the candidates while the user is choosing
+                pending, executor = parser.prefetch_episodes(
+                    [item.link for item in results], languages
+                )
                 i = dialog.select(
                     get_ui_string(32008), [item.title for item in results]
                 )
-                if i >= 0:
-                    try:
-                        results = parser.get_episode(results[i].link, languages)
-                    except Add7ConnectionError:
-                        logger.error('Unable to connect to addic7ed.com')
-                        dialog.notification(get_ui_string(32002),
-                                            get_ui_string(32005), 'error')
-                        return
-                    except SubsSearchError:
-                        logger.info('No subs found.')
+                try:
+                    if i >= 0:
+                        try:
+                            if pending[i] is not None:
+                                results = pending[i].result()
+                            else:
+                                results = parser.get_episode(results[i].link,
+                                                             languages)
+                        except Add7ConnectionError:
+                            logger.error('Unable to connect to addic7ed.com')
+                            dialog.notification(get_ui_string(32002),
+                                                get_ui_string(32005), 'error')
+                            return
+                        except SubsSearchError:
+                            logger.info('No subs found.')
+                            return
+                    else:
+                        logger.info('Episode selection cancelled.')
                         return
-                else:
-                    logger.info('Episode selection cancelled.')
-                    return
+                finally:
+                    for future in pending:
+                        if future is not None:
+                            future.cancel()
+                    executor.shutdown(wait=False)
             logger.info('Found subs for "{0}"'.format(query))
             display_subs(results.subtitles, results.episode_url,
                          filename)
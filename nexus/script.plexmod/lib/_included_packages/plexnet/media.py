@@ -3,6 +3,7 @@ from . import plexobjects
 from . import plexstream
 from . import util
 from . import exceptions
+from . import jumpindex
 
 METADATA_RELATED_TRAILER = 1
 METADATA_RELATED_DELETED_SCENE = 2
@@ -64,6 +65,8 @@ class MediaItem(plexobjects.PlexObject):
         req = plexrequest.PlexRequest(self.server, '/library/metadata/{0}'.format(self.ratingKey), method='DELETE')
         req.getToStringWithTimeout(10)
         self.deleted = req.wasOK()
+        if self.deleted:
+            jumpindex.INDEXES.invalidate(self.server.uuid, self.getLibrarySectionId() or None)
         return self.deleted
 
     def exists(self, force_full_check=False):
@@ -0,0 +1,152 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import json
+import threading
+
+import urllib3.exceptions
+
+from . import http
+from . import util
+
+# PMS serves the same notifications as on /:/websockets/notifications as server-sent events, which we can read using
+# a plain streamed request
+NOTIFICATIONS_PATH = '/:/eventsource/notifications?filters=timeline,activity,playing'
+
+CONNECT_TIMEOUT = 10
+# PMS pings every few seconds; no data for this long means the connection is gone
+READ_TIMEOUT = 60
+RETRY_MIN = 5
+RETRY_MAX = 300
+
+CONNECTION_ERRORS = (http.requests.exceptions.RequestException, urllib3.exceptions.HTTPError, IOError, ValueError)
+
+LIBRARY_IDENTIFIER = 'com.plexapp.plugins.library'
+# TimelineEntry states
+TIMELINE_STATE_PROCESSED = 5
+TIMELINE_STATE_DELETED = 9
+# Activity types that change a library section's contents
+LIBRARY_ACTIVITIES = ('library.update.section', 'library.refresh.items')
+
+
+def parseEvent(event, data):
+    """
+    Returns (section keys, onDeck changed) for a notification
+    """
+    sections = set()
+    onDeck = False
+
+    data = data.get('NotificationContainer', data)
+    if event == 'timeline':
+        for entry in data.get('TimelineEntry', ()):
+            if entry.get('identifier') != LIBRARY_IDENTIFIER:
+                continue
+            if entry.get('state') in (TIMELINE_STATE_PROCESSED, TIMELINE_STATE_DELETED) and \
+                    int(entry.get('sectionID', -1)) > 0:
+                sections.add(str(entry['sectionID']))
+
+    elif event == 'activity':
+        for notification in data.get('ActivityNotification', ()):
+            activity = notification.get('Activity', {})
+            if notification.get('event') != 'ended' or activity.get('type') not in LIBRARY_ACTIVITIES:
+                continue
+            section = activity.get('Context', {}).get('librarySectionID')
+            if section:
+                sections.add(str(section))
+
+    elif event == 'playing':
+        onDeck = any(n.get('state') == 'stopped' for n in data.get('PlaySessionStateNotification', ()))
+
+    return sections, onDeck
+
+
+class NotificationListener(object):
+    """
+    Listens to a server's notifications and triggers notifications:changed with the library sections whose contents
+    changed and whether on deck items might have changed.
+
+    Triggers notifications:connected when the stream is up and notifications:disconnected when it went down; it's
+    reconnected with a backoff until stopped.
+    """
+    def __init__(self, server):
+        self.server = server
+        self.connected = False
+        self._stop = threading.Event()
+        self._response = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='NOTIFICATIONS({0})'.format(self.server.name))
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        response = self._response
+        if response is not None:
+            try:
+                response.close()
+            except:
+                pass
+
+    def _run(self):
+        retry = RETRY_MIN
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except CONNECTION_ERRORS as e:
+                if self._stop.is_set():
+                    break
+                util.DEBUG_LOG('Notifications: Connection to {0} lost ({1}), retrying in {2}s',
+                               self.server.name, e.__class__.__name__, retry)
+            except:
+                util.ERROR()
+            finally:
+                self._response = None
+                if self.connected:
+                    # we've been connected, start over with the shortest delay
+                    self.connected = False
+                    retry = RETRY_MIN
+                    util.APP.trigger('notifications:disconnected', server=self.server)
+
+            self._stop.wait(retry)
+            retry = min(retry * 2, RETRY_MAX)
+
+    def _listen(self):
+        url = self.server.buildUrl(NOTIFICATIONS_PATH, includeToken=True)
+        if not url:
+            raise IOError('No server connection')
+
+        request = http.HttpRequest(url)
+        self._response = response = request.session.get(url, stream=True, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        if response.status_code != 200:
+            raise IOError('Bad status: {0}'.format(response.status_code))
+
+        util.LOG('Notifications: Connected to {0}', self.server.name)
+        self.connected = True
+        util.APP.trigger('notifications:connected', server=self.server)
+
+        event = None
+        data = []
+        for line in iter(response.raw.readline, b''):
+            if self._stop.is_set():
+                return
+
+            line = line.decode('utf-8').rstrip('\r\n')
+            if not line:
+                if event and data:
+                    self.onEvent(event, json.loads('\n'.join(data)))
+                event = None
+                data = []
+            elif line.startswith('event:'):
+                event = line[6:].strip()
+            elif line.startswith('data:'):
+                data.append(line[5:].strip())
+
+    def onEvent(self, event, data):
+        sections, onDeck = parseEvent(event, data)
+        if sections or onDeck:
+            util.DEBUG_LOG('Notifications: {0}: sections changed: {1}, on deck changed: {2}',
+                           event, sorted(sections), onDeck)
+            util.APP.trigger('notifications:changed', server=self.server, sections=sections, onDeck=onDeck)
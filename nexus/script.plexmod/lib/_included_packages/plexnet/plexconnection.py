@@ -271,6 +271,8 @@ class PlexConnection(object):
             self.state = self.STATE_UNAUTHORIZED
         else:
             self.state = self.STATE_UNREACHABLE
+            # the host might have moved
+            http.invalidateHost(self.address)
 
         self.getScore(True)
 
@@ -0,0 +1,127 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import threading
+from collections import OrderedDict
+
+from . import util
+
+# scrobble requests sent at once
+MAX_CONCURRENCY = 2
+
+
+class WatchStateQueue(object):
+    """
+    Applies watched/unwatched changes to the local objects right away and sends them to the server in the background.
+
+    Repeated changes to the same item that haven't been sent yet are merged into the last one. Parent objects passed
+    along get their viewedLeafCount adjusted locally as well and are reloaded once, when the queue has drained.
+    """
+    def __init__(self):
+        self._pending = OrderedDict()
+        self._inFlight = {}
+        self._parents = OrderedDict()
+        self._failed = []
+        self._workers = 0
+        self._lock = threading.Lock()
+        self._drained = threading.Event()
+        self._drained.set()
+
+    def mark(self, video, watched, parents=None):
+        key = video.ratingKey
+        wasWatched = video.isFullyWatched
+        video.applyWatched(watched)
+
+        with self._lock:
+            self._pending[key] = (video, watched)
+            self._drained.clear()
+
+            for parent in parents or ():
+                if not parent:
+                    continue
+
+                if wasWatched != watched and parent.get('leafCount'):
+                    count = parent.get('viewedLeafCount').asInt() + (watched and 1 or -1)
+                    parent.set('viewedLeafCount', max(0, min(count, parent.get('leafCount').asInt())))
+                self._parents[parent.ratingKey] = parent
+
+            if self._workers < MAX_CONCURRENCY:
+                self._workers += 1
+                threading.Thread(target=self._work, name='WATCHSTATE-QUEUE').start()
+
+        util.DEBUG_LOG('WatchStateQueue: Queued {0} as {1}', key, watched and 'watched' or 'unwatched')
+
+    def _next(self):
+        # items of which a request is in flight have to wait for it, so requests for one item never overtake each other
+        for key in self._pending:
+            if key not in self._inFlight:
+                video, watched = self._pending.pop(key)
+                self._inFlight[key] = watched
+                return key, video, watched
+        return None, None, None
+
+    def _work(self):
+        while True:
+            with self._lock:
+                key, video, watched = self._next()
+                if key is None:
+                    self._workers -= 1
+                    if self._workers or self._pending:
+                        return
+
+                    parents = list(self._parents.values()) + self._failed
+                    self._parents.clear()
+                    self._failed = []
+                    break
+
+            try:
+                path = '/:/{0}?key={1}&identifier=com.plexapp.plugins.library'.format(
+                    watched and 'scrobble' or 'unscrobble', key)
+                video.server.query(path)
+            except:
+                util.ERROR('WatchStateQueue: Failed to update {0}'.format(key))
+                with self._lock:
+                    # get the actual state back
+                    self._failed.append(video)
+            finally:
+                with self._lock:
+                    del self._inFlight[key]
+
+        for obj in parents:
+            try:
+                obj.reload()
+            except:
+                util.ERROR()
+
+        with self._lock:
+            if not self._pending and not self._inFlight:
+                self._drained.set()
+
+        util.APP.trigger('change:watchState', objects=parents)
+
+    def reapply(self, obj):
+        """
+        Re-applies the queued state to a freshly reloaded object, which might not reflect it yet
+        """
+        key = obj.get('ratingKey')
+        if not key:
+            return
+
+        with self._lock:
+            if key in self._pending:
+                watched = self._pending[key][1]
+            elif key in self._inFlight:
+                watched = self._inFlight[key]
+            else:
+                return
+
+        obj.applyWatched(watched)
+
+    def isPending(self):
+        return not self._drained.is_set()
+
+    def wait(self, timeout=None):
+        return self._drained.wait(timeout)
+
+
+QUEUE = WatchStateQueue()
@@ -3,6 +3,19 @@ from kodi_six import xbmc
 import json
 
 
+def buildCommand(family, method, params, cid=1):
+    command = {
+        'jsonrpc': '2.0',
+        'id': cid,
+        'method': '{0}.{1}'.format(family, method)
+    }
+
+    if params:
+        command['params'] = params
+
+    return command
+
+
 class JSONRPCMethod:
 
     class Exception(Exception):
@@ -13,14 +26,7 @@ class JSONRPCMethod:
 
     def __getattr__(self, method):
         def handler(**kwargs):
-            command = {
-                'jsonrpc': '2.0',
-                'id': 1,
-                'method': '{0}.{1}'.format(self.family, method)
-            }
-
-            if kwargs:
-                command['params'] = kwargs
+            command = buildCommand(self.family, method, kwargs)
 
             # xbmc.log(json.dumps(command))
             ret = json.loads(xbmc.executeJSONRPC(json.dumps(command)))
@@ -40,6 +46,93 @@ class JSONRPCMethod:
         return self
 
 
+class JSONRPCResult:
+    """
+    Result of a batched call; available once the batch has been sent
+    """
+    def __init__(self, command):
+        self.command = command
+        self.done = False
+        self._result = None
+        self._error = None
+
+    def set(self, ret):
+        self.done = True
+        if ret is None:
+            self._error = {'code': -1, 'message': 'No response for {0}'.format(self.command['method'])}
+        elif 'error' in ret:
+            self._error = ret['error']
+        else:
+            self._result = ret.get('result')
+
+    def result(self):
+        if not self.done:
+            raise JSONRPCMethod.Exception('Batch not sent yet: {0}'.format(self.command['method']))
+
+        if self._error is not None:
+            raise JSONRPCMethod.Exception(self._error)
+
+        return self._result
+
+
+class JSONRPCBatch:
+    """
+    Collects calls and sends them as a single JSON-RPC request when leaving the context:
+
+        with rpc.batch() as batch:
+            a = batch.Settings.GetSettingValue(setting='filecache.memorysize')
+            b = batch.Settings.GetSettingValue(setting='filecache.readfactor')
+        a.result()['value']
+
+    Each call returns a JSONRPCResult; result() raises JSONRPCMethod.Exception for a call that errored.
+    """
+    def __init__(self):
+        self.results = []
+
+    def __getattr__(self, family):
+        return JSONRPCBatchFamily(self, family)
+
+    def add(self, family, method, params):
+        result = JSONRPCResult(buildCommand(family, method, params, cid=len(self.results) + 1))
+        self.results.append(result)
+        return result
+
+    def send(self):
+        results, self.results = self.results, []
+        if not results:
+            return []
+
+        ret = json.loads(xbmc.executeJSONRPC(json.dumps([r.command for r in results])))
+        # a request consisting of a single invalid call is answered with a single error object
+        if isinstance(ret, dict):
+            ret = [ret]
+
+        byID = dict((r.get('id'), r) for r in ret or ())
+        for result in results:
+            result.set(byID.get(result.command['id']))
+
+        return results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.send()
+
+
+class JSONRPCBatchFamily:
+    def __init__(self, batch, family):
+        self.batch = batch
+        self.family = family
+
+    def __getattr__(self, method):
+        def handler(**kwargs):
+            return self.batch.add(self.family, method, kwargs)
+
+        return handler
+
+
 class KodiJSONRPC:
     def __init__(self):
         self.methodHandler = JSONRPCMethod()
@@ -47,6 +140,9 @@ class KodiJSONRPC:
     def __getattr__(self, family):
         return self.methodHandler(family)
 
+    def batch(self):
+        return JSONRPCBatch()
+
 
 rpc = KodiJSONRPC()
 
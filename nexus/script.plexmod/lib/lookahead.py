@@ -0,0 +1,135 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import threading
+import time
+
+from plexnet import plexplayer
+
+from . import backgroundthread
+from . import util
+
+
+# what the post play screen and playVideoPlaylist would otherwise reload the next item with
+RELOAD_KW = dict(includeChapters=1, includeExtras=1, includeExtrasCount=10)
+
+
+class ResolveTask(backgroundthread.Task):
+    def setup(self, item, decide, callback):
+        self.item = item
+        self.decide = decide
+        self.callback = callback
+        return self
+
+    def run(self):
+        if self.isCanceled():
+            return
+
+        item = self.item
+        try:
+            # PlayableVideo.reload always asks for markers
+            item.reload(**RELOAD_KW)
+            if self.isCanceled():
+                return
+
+            playerObject = plexplayer.PlexPlayer(item, 0, forceUpdate=True)
+            playerObject.build()
+
+            # the decision endpoint shares its session with the currently playing item; only ask for it when we're
+            # not transcoding right now, otherwise that transcode would be replaced
+            if self.decide:
+                playerObject = playerObject.getServerDecision()
+        except plexplayer.DecisionFailure as e:
+            util.DEBUG_LOG("Resolver: Decision failed for {0}: {1}", item, e.reason)
+            return
+        except:
+            util.ERROR("Resolver: Couldn't resolve {0}".format(item))
+            return
+
+        if self.isCanceled():
+            return
+
+        self.callback(item, playerObject, self.decide)
+
+
+class NextItemResolver(object):
+    """
+    Resolves the next play queue item while the current one is still playing: reloads its metadata and markers, runs
+    the media decision and (if possible) the server's transcode decision, and keeps the built player object around for
+    a limited time, so the transition to the next item doesn't have to wait for any of it.
+    """
+    def __init__(self):
+        self._entry = None
+        self._task = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return util.addonSettings.resolveNextItem
+
+    def resolve(self, item, decide=True):
+        if not self.enabled or not item:
+            return
+
+        with self._lock:
+            if (self._task and self._task.item is item) or (self._entry and self._entry[0] is item):
+                return
+
+            self._cancelTask()
+            self._entry = None
+            self._task = ResolveTask().setup(item, decide, self._resolved)
+
+        util.DEBUG_LOG("Resolver: Resolving next item {0} (server decision: {1})", item, decide)
+        backgroundthread.BGThreader.addTask(self._task)
+
+    def _resolved(self, item, playerObject, decided):
+        with self._lock:
+            if not self._task or self._task.item is not item:
+                return
+            self._task = None
+            self._entry = (item, playerObject, decided, time.time())
+
+        util.DEBUG_LOG("Resolver: Resolved {0}: {1}", item, lambda: playerObject.metadata)
+
+    def _cancelTask(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def _getValid(self, item):
+        if not self._entry or self._entry[0] is not item:
+            return None
+
+        if time.time() - self._entry[3] > util.addonSettings.resolveNextItemTtl:
+            util.DEBUG_LOG("Resolver: Resolved entry for {0} expired", item)
+            self._entry = None
+            return None
+        return self._entry
+
+    def isResolved(self, item):
+        with self._lock:
+            return bool(self._getValid(item))
+
+    def take(self, item):
+        """
+        Returns (playerObject, decided) for item if it has been resolved and the result is still valid, otherwise None.
+        A resolved player object can only be used once.
+        """
+        with self._lock:
+            entry = self._getValid(item)
+            if not entry:
+                # whatever we were doing is obsolete now
+                self._cancelTask()
+                return None
+
+            self._entry = None
+            util.DEBUG_LOG("Resolver: Using resolved player object for {0}", item)
+            return entry[1], entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._cancelTask()
+            self._entry = None
+
+
+RESOLVER = NextItemResolver()
@@ -16,15 +16,22 @@ sys.modules['_asyncio'] = None
 
 from . import plex
 
-from plexnet import plexapp
+from plexnet import plexapp, tracing, watchstate
 from .templating import render_templates
-from .windows import background, userselect, home, windowutils, kodigui
-from . import player
+from .windows import background, userselect, windowutils, kodigui
 from . import backgroundthread
 from . import util
 from .data_cache import dcm
 
+# not needed before a user has been selected, so the background and user selection windows can open earlier
+home = util.DeferredModule('lib.windows.home')
+player = util.DeferredModule('lib.player')
+preload = util.DeferredModule('lib.preload')
+traceoverlay = util.DeferredModule('lib.windows.traceoverlay')
+
 BACKGROUND = None
+# how long shutting down waits for queued watch state changes to reach the server
+WATCHSTATE_TIMEOUT = 5
 quitKodi = False
 restart = False
 
@@ -116,6 +123,7 @@ def _main():
                    util.NEEDS_SCALING)
     background.setSplash()
     util.setGlobalProperty('is_active', '1')
+    overlay = tracing.TRACER.enabled and traceoverlay.start()
 
     try:
         while not util.MONITOR.abortRequested():
@@ -208,16 +216,29 @@ def _main():
         util.ERROR()
     finally:
         util.DEBUG_LOG('Main: SHUTTING DOWN...')
-        dcm.storeDataCache()
-        dcm.deinit()
+        if overlay:
+            overlay.doClose()
+        if dcm.loaded:
+            dcm.storeDataCache()
+            dcm.deinit()
         plexapp.util.INTERFACE.playbackManager.deinit()
         background.setShutdown()
-        player.shutdown()
+        if player.loaded:
+            player.shutdown()
+        # before preShutdown, which cancels requests
+        if watchstate.QUEUE.isPending():
+            util.DEBUG_LOG('Main: Waiting for watch state changes to be sent...')
+            if not watchstate.QUEUE.wait(WATCHSTATE_TIMEOUT):
+                util.LOG('Main: Watch state changes not sent after {0}s, giving up', WATCHSTATE_TIMEOUT)
         plexapp.util.APP.preShutdown()
         util.CRON.stop()
+        if preload.loaded:
+            preload.PRELOADER.shutdown()
         backgroundthread.BGThreader.shutdown()
         plexapp.util.APP.shutdown()
         waitForThreads()
+        if tracing.TRACER.enabled:
+            tracing.TRACER.export(util.PROFILE)
         background.setBusy(False)
         background.setSplash(False)
         background.killMonitor()
@@ -0,0 +1,247 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import threading
+import time
+from collections import OrderedDict
+from xml.etree import ElementTree
+
+from plexnet import plexapp, plexrequest, mediadecisionengine
+
+from . import backgroundthread
+from . import player
+from . import util
+
+
+# the reload arguments the target windows use; a preloaded object only satisfies a window if it was fetched with at
+# least these
+RELOAD_KW = {
+    'movie': dict(checkFiles=1, includeExtras=1, includeExtrasCount=10, includeChapters=1, includeReviews=1),
+    'episode': dict(checkFiles=1, includeExtras=1, includeExtrasCount=10, includeChapters=1),
+    'season': dict(checkFiles=1, includeExtras=1, includeExtrasCount=10, includeChapters=1),
+}
+
+PLAYABLE_TYPES = ('movie', 'episode')
+PRELOAD_TIMEOUT = 10
+
+
+class PreloadTask(backgroundthread.Task):
+    def setup(self, item, callback):
+        self.item = item
+        self.callback = callback
+        self.kw = dict(RELOAD_KW[item.TYPE])
+        if item.TYPE in PLAYABLE_TYPES:
+            # PlayableVideo.reload always asks for markers
+            self.kw["includeMarkers"] = 1
+        return self
+
+    def run(self):
+        if self.isCanceled():
+            return
+
+        path = '/library/metadata/{0}{1}'.format(self.item.ratingKey, plexapp.util.joinArgs(self.kw))
+        try:
+            # fetched as text, so the entry's size is known
+            request = plexrequest.PlexRequest(self.item.server, path)
+            raw = request.getToStringWithTimeout(PRELOAD_TIMEOUT)
+            if self.isCanceled() or not raw or not request.wasOK():
+                return
+
+            data = ElementTree.fromstring(raw)
+        except:
+            util.ERROR("Preloader: Couldn't preload {0}".format(self.item))
+            return
+
+        if self.isCanceled() or not len(data):
+            return
+
+        self.callback(self, data, len(raw))
+
+
+class ItemPreloader(object):
+    """
+    Speculatively fetches the metadata of the item the user dwells on in a hub or library view, so the following
+    PrePlay/Episodes window doesn't have to wait for its initial reload.
+
+    The cache is bounded by the size of the responses (preloadMaxSize, in KB), the least recently preloaded entries
+    are evicted first. Whenever watch states might have changed, everything fetched so far is dropped.
+    """
+    def __init__(self):
+        self._cache = OrderedDict()
+        self._size = 0
+        self._tasks = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._threader = None
+        self.hits = 0
+        self.misses = 0
+
+        plexapp.util.APP.on('change:watchState', self.clear)
+        util.MONITOR.on('changed.watchstatus', self.clear)
+        player.PLAYER.on('session.ended', self.clear)
+
+    @property
+    def enabled(self):
+        return util.addonSettings.preloadItems
+
+    def _key(self, item):
+        return item.server.uuid, item.ratingKey
+
+    def _wanted(self, item):
+        return item and getattr(item, "TYPE", None) in RELOAD_KW and item.get('ratingKey') and item.server
+
+    def focus(self, control):
+        """
+        Called whenever the selected item of a ManagedControlList changes. Starts the dwell timer for the selected
+        item (and its neighbours).
+        """
+        self._cancelTimer()
+
+        if not self.enabled:
+            return
+
+        pos = control.getSelectedPos()
+        if pos is None:
+            self.cancelPending()
+            return
+
+        items = []
+        for offset in [0] + [o for n in range(1, util.addonSettings.preloadNeighbours + 1) for o in (n, -n)]:
+            if not control.positionIsValid(pos + offset):
+                continue
+            ds = control.items[pos + offset].dataSource
+            if self._wanted(ds):
+                items.append(ds)
+
+        # drop queued fetches for items that moved out of reach
+        self.cancelPending(keep=[self._key(item) for item in items])
+
+        if not items:
+            return
+
+        self._timer = threading.Timer(util.addonSettings.preloadDwellTime, self._dwelled, args=(items,))
+        self._timer.name = 'PRELOAD-TIMER'
+        self._timer.start()
+
+    def _dwelled(self, items):
+        if util.MONITOR.abortRequested():
+            return
+
+        with self._lock:
+            tasks = []
+            for item in items:
+                key = self._key(item)
+                if key in self._tasks or self._getValid(key):
+                    continue
+
+                task = PreloadTask().setup(item, self._preloaded)
+                self._tasks[key] = task
+                tasks.append(task)
+
+        if not tasks:
+            return
+
+        # use our own single worker so speculative requests never compete with the UI's BGThreader tasks
+        if not self._threader or self._threader.aborted():
+            self._threader = backgroundthread.BackgroundThreader(name='preload', worker_count=1)
+        self._threader.addTasks(tasks)
+
+    def _preloaded(self, task, data, size):
+        with self._lock:
+            key = self._key(task.item)
+            if self._tasks.get(key) is not task:
+                # canceled in the meantime
+                return
+
+            del self._tasks[key]
+            self._remove(key)
+            self._cache[key] = (data, task.kw, time.time(), size)
+            self._size += size
+
+            budget = util.addonSettings.preloadMaxSize * 1024
+            while self._size > budget:
+                evicted = next(iter(self._cache))
+                self._remove(evicted)
+                util.DEBUG_LOG("Preloader: Evicted {0}", evicted)
+
+        util.DEBUG_LOG("Preloader: Preloaded {0} ({1} bytes, {2} bytes held)", task.item, size, self._size)
+
+    def _remove(self, key):
+        entry = self._cache.pop(key, None)
+        if entry:
+            self._size -= entry[3]
+        return entry
+
+    def _getValid(self, key):
+        entry = self._cache.get(key)
+        if not entry:
+            return None
+
+        if time.time() - entry[2] > util.addonSettings.preloadTtl:
+            self._remove(key)
+            return None
+        return entry
+
+    def _cancelTimer(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def cancelPending(self, keep=None):
+        self._cancelTimer()
+
+        with self._lock:
+            for key, task in list(self._tasks.items()):
+                if keep and key in keep:
+                    continue
+                task.cancel()
+                del self._tasks[key]
+
+    def take(self, item, **reload_kw):
+        """
+        Returns the preloaded metadata of item if it was fetched with (at least) reload_kw and is still fresh,
+        otherwise None. An entry can only be taken once, as the caller's object then diverges from the server state.
+        """
+        if not self.enabled or not self._wanted(item):
+            return None
+
+        self.cancelPending()
+
+        with self._lock:
+            key = self._key(item)
+            entry = self._getValid(key)
+            if entry and all(entry[1].get(k) == v for k, v in reload_kw.items()):
+                self._remove(key)
+                self.hits += 1
+                util.DEBUG_LOG("Preloader: Hit for {0} (hits: {1}, misses: {2})", item, self.hits, self.misses)
+                return entry[0]
+
+            self.misses += 1
+            util.DEBUG_LOG("Preloader: Miss for {0} (hits: {1}, misses: {2})", item, self.hits, self.misses)
+            return None
+
+    def reload(self, item, **reload_kw):
+        """
+        Reloads item, from the preloaded metadata if there is any; a playable item reloaded that way gets its media
+        choice made by the MediaDecisionEngine right away
+        """
+        data = self.take(item, **reload_kw)
+        item.reload(_data=data, **reload_kw)
+        if data is not None and item.TYPE in PLAYABLE_TYPES:
+            mediadecisionengine.MediaDecisionEngine().chooseMedia(item, forceUpdate=True)
+        return item
+
+    def clear(self, **kwargs):
+        self.cancelPending()
+        with self._lock:
+            self._cache.clear()
+            self._size = 0
+
+    def shutdown(self):
+        self.clear()
+        if self._threader:
+            self._threader.shutdown()
+        util.DEBUG_LOG("Preloader: Shut down (hits: {0}, misses: {1})", self.hits, self.misses)
+
+
+PRELOADER = ItemPreloader()
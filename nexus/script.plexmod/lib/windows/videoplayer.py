@@ -9,6 +9,7 @@ from kodi_six import xbmcgui
 
 from lib import colors
 from lib import kodijsonrpc
+from lib import lookahead
 from lib import player
 from lib import util
 from lib.util import T
@@ -419,7 +420,7 @@ class VideoPlayerWindow(kodigui.ControlledWindow, windowutils.UtilMixin, Spoiler
         )
 
         util.DEBUG_LOG('PostPlay: Showing video info')
-        if self.next:
+        if self.next and not lookahead.RESOLVER.isResolved(self.next):
             self.next.reload(includeExtras=1, includeExtrasCount=10)
 
         self.relatedPaginator = RelatedPaginator(self.relatedListControl,
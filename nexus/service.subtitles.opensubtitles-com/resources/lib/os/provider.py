@@ -1,4 +1,7 @@
 
+import json
+
+from time import sleep, time
 from typing import Union
 
 from requests import Session, ConnectionError, HTTPError, ReadTimeout, Timeout, RequestException
@@ -21,6 +24,12 @@ API_DOWNLOAD = "download"
 CONTENT_TYPE = "application/json"
 REQUEST_TIMEOUT = 30
 
+SEARCH_CACHE_TTL = 60 * 60 * 24
+DOWNLOAD_CACHE_TTL = 60 * 60 * 24 * 7
+
+# wait for rate limits that reset within this many seconds instead of failing
+MAX_RATE_LIMIT_WAIT = 2
+
 class_lookup = {"OpenSubtitlesSubtitlesRequest": OpenSubtitlesSubtitlesRequest,
                 "OpenSubtitlesDownloadRequest": OpenSubtitlesDownloadRequest}
 
@@ -32,6 +41,17 @@ def logging(msg):
     return log(__name__, msg)
 
 
+_session = None
+
+
+def get_session():
+    """One session per interpreter, so login, search and download share their keep-alive connections."""
+    global _session
+    if _session is None:
+        _session = Session()
+    return _session
+
+
 def query_to_params(query, _type):
     logging("type: ")
     logging(type(query))
@@ -57,7 +77,7 @@ def query_to_params(query, _type):
 
 class OpenSubtitlesProvider:
 
-    def __init__(self, api_key, username, password):
+    def __init__(self, api_key, username, password, search_ttl=SEARCH_CACHE_TTL, download_ttl=DOWNLOAD_CACHE_TTL):
 
        # if not all((username, password)):
        #     raise ConfigurationError("Username and password must be specified")
@@ -71,11 +91,44 @@ class OpenSubtitlesProvider:
 
         self.request_headers = {"Api-Key": self.api_key, "User-Agent": "Opensubtitles.com Kodi plugin v1.0.3    " ,"Content-Type": CONTENT_TYPE, "Accept": CONTENT_TYPE}
 
-        self.session = Session()
+        self.session = get_session()
         self.session.headers = self.request_headers
 
         # Use any other cache outside of module/Kodi
         self.cache = Cache(key_prefix="os_com")
+        self.cache.prune()
+        self.search_ttl = search_ttl
+        self.download_ttl = download_ttl
+
+    def _request(self, method, url, **kwargs):
+        """Makes an API request, honouring the rate limit the API reported for previous requests."""
+        limited_until = self.cache.get(key="rate_limited_until")
+        if limited_until:
+            wait = limited_until - time()
+            if wait > MAX_RATE_LIMIT_WAIT:
+                logging(f"Rate limited for another {wait:.0f}s")
+                raise TooManyRequests()
+            if wait > 0:
+                logging(f"Rate limited, waiting {wait:.1f}s")
+                sleep(wait)
+
+        r = self.session.request(method, url, **kwargs)
+        self._update_rate_limit(r)
+        return r
+
+    def _update_rate_limit(self, r):
+        try:
+            if r.status_code == 429:
+                reset = float(r.headers.get("retry-after") or r.headers.get("ratelimit-reset") or 1)
+            elif r.headers.get("ratelimit-remaining") == "0":
+                reset = float(r.headers.get("ratelimit-reset") or 1)
+            else:
+                return
+        except ValueError:
+            reset = 1
+
+        logging(f"Rate limit reached, next request possible in {reset}s")
+        self.cache.set(key="rate_limited_until", value=time() + reset, expires=reset)
 
     # make login request. Sets auth token
     def login(self):
@@ -85,7 +138,7 @@ class OpenSubtitlesProvider:
         login_body = {"username": self.username, "password": self.password}
 
         try:
-            r = self.session.post(login_url, json=login_body, allow_redirects=False, timeout=REQUEST_TIMEOUT)
+            r = self._request("post", login_url, json=login_body, allow_redirects=False, timeout=REQUEST_TIMEOUT)
             logging(r.url)
             r.raise_for_status()
         except (ConnectionError, Timeout, ReadTimeout) as e:
@@ -121,10 +174,17 @@ class OpenSubtitlesProvider:
         if not len(params):
             raise ValueError("Invalid subtitle search data provided. Empty Object built")
 
+        # moviehash, imdb/tmdb ids, season/episode and languages are all part of the params
+        cache_key = "search:" + json.dumps(params, sort_keys=True)
+        cached = self.cache.get(key=cache_key) if self.search_ttl > 0 else None
+        if cached is not None:
+            logging(f"Query returned {len(cached)} cached subtitles")
+            return cached or None
+
         try:
             # build query request
             subtitles_url = API_URL + API_SUBTITLES
-            r = self.session.get(subtitles_url, params=params, timeout=30)
+            r = self._request("get", subtitles_url, params=params, timeout=30)
             logging(r.url)
             logging(r.request.headers)
             r.raise_for_status()
@@ -148,12 +208,42 @@ class OpenSubtitlesProvider:
         else:
             logging(f"Query returned {len(result['data'])} subtitles")
 
+        if self.search_ttl > 0:
+            self.cache.set(key=cache_key, value=result["data"], expires=self.search_ttl)
+
         if len(result["data"]):
             return result["data"]
 
         return None
 
     def download_subtitle(self, query: Union[dict, OpenSubtitlesDownloadRequest]):
+        params = query_to_params(query, "OpenSubtitlesDownloadRequest")
+
+        # a subtitle we downloaded before doesn't count against the download limit
+        cache_key = f"download:{params['file_id']}:{params.get('sub_format', 'srt')}"
+        content = self.cache.get_file(key=cache_key) if self.download_ttl > 0 else None
+        if content:
+            logging(f"Using cached subtitle {params['file_id']!r}")
+            return {"file_id": params["file_id"], "content": content}
+
+        had_token = self.user_token is not None
+        try:
+            subtitle = self._download_subtitle(params)
+        except AuthenticationError:
+            if not had_token:
+                raise
+
+            # the persisted token might have expired, try once more with a fresh one
+            logging("Cached token rejected, logging in again.")
+            self.cache.delete(key="user_token")
+            subtitle = self._download_subtitle(params)
+
+        if subtitle["content"] and self.download_ttl > 0:
+            self.cache.set_file(key=cache_key, content=subtitle["content"], expires=self.download_ttl)
+
+        return subtitle
+
+    def _download_subtitle(self, params):
         if self.user_token is None:
             logging("No cached token, we'll try to login again.")
             try:
@@ -172,8 +262,6 @@ class OpenSubtitlesProvider:
         
         logging(f"user token is {self.user_token}")
 
-        params = query_to_params(query, "OpenSubtitlesDownloadRequest")
-
         logging(f"Downloading subtitle {params['file_id']!r} ")
 
         # build download request
@@ -185,7 +273,8 @@ class OpenSubtitlesProvider:
         download_params = {"file_id": params["file_id"], "sub_format": "srt"}
 
         try:
-            r = self.session.post(download_url, headers=download_headers, json=download_params, timeout=REQUEST_TIMEOUT)
+            r = self._request("post", download_url, headers=download_headers, json=download_params,
+                              timeout=REQUEST_TIMEOUT)
             logging(r.url)
             r.raise_for_status()
         except (ConnectionError, Timeout, ReadTimeout) as e:
@@ -215,13 +215,19 @@ def Search(item):
             title = _xmbc_localized_string_utf8(32004)
         else:
             title = _xmbc_localized_string_utf8(32005)
+        # load the candidates' subtitle lists while the user is choosing
+        service.PrefetchSubtitles([DOMAIN_NAME + m[1] for m in matches])
         idx = xbmcgui.Dialog().select(title, [m[0] for m in matches])
 
     if idx < 0:
+        service.CancelPrefetch()
         return
 
     url = matches[idx][1]
-    allsubs = service.EnumSubtitles(DOMAIN_NAME + url)
+    try:
+        allsubs = service.EnumSubtitles(DOMAIN_NAME + url)
+    finally:
+        service.CancelPrefetch()
 
     if allsubs is None:
         return
@@ -4,12 +4,14 @@ PlexLibrary
 """
 from __future__ import absolute_import
 import re
+from xml.etree import ElementTree
 from . import plexobjects
 from . import playlist
 from . import media
 from . import exceptions
 from . import util
 from . import signalsmixin
+from . import jumpindex
 from lib.path_mapping import pmm, norm_sep
 from lib.exceptions import NoDataException
 from six.moves import map
@@ -176,7 +178,22 @@ class LibrarySection(plexobjects.PlexObject):
         else:
             path = '/library/sections/{0}/all'.format(self.key)
         
-        return self.items(path, start, size, filter_, sort, unwatched, type_, False)
+        items = self.items(path, start, size, filter_, sort, unwatched, type_, False)
+
+        key = self.jumpIndexKey(filter_, sort, unwatched, type_)
+        if key:
+            jumpindex.INDEXES.add(key, start or 0, items, descending=sort[1] == 'desc')
+
+        return items
+
+    def jumpIndexKey(self, filter_, sort, unwatched, type_):
+        """
+        Identifies a listing in jumpindex.INDEXES; only titleSort listings have a jump list
+        """
+        if not sort or sort[0] != 'titleSort':
+            return None
+
+        return self.server.uuid, self.key, filter_, unwatched, type_
     
     def folder(self, start=None, size=None, subDir=False):
         if self.key.startswith('/'):
@@ -241,12 +258,26 @@ class LibrarySection(plexobjects.PlexObject):
         if args:
             path += util.joinArgs(args)
 
+        key = self.jumpIndexKey(filter_, sort, unwatched, type_)
+        descending = key and sort[1] == 'desc'
+        if key:
+            groups = jumpindex.INDEXES.jumpList(key, descending)
+            if groups is not None:
+                util.DEBUG_LOG('Using local jump list for: {0}', repr(path))
+                return [plexobjects.buildItem(self.server, ElementTree.Element('Directory', key=char, title=char,
+                                                                              size=str(count)), path, bytag=True)
+                        for char, count in groups]
+
         try:
-            return plexobjects.listItems(self.server, path, bytag=True)
+            items = plexobjects.listItems(self.server, path, bytag=True)
         except exceptions.BadRequest:
             util.ERROR('jumpList() request error for path: {0}'.format(repr(path)))
             return None
 
+        if key:
+            jumpindex.INDEXES.expect(key, [(ji.key, ji.size.asInt()) for ji in items], descending)
+        return items
+
     @property
     def onDeck(self):
         return plexobjects.listItems(self.server, '/library/sections/%s/onDeck' % self.key)
@@ -1,5 +1,4 @@
 from __future__ import absolute_import
-from kodi_six import xbmcvfs
 from . import plexobjects
 from . import plexstream
 from . import plexrequest
@@ -176,7 +175,7 @@ class PlexPart(plexobjects.PlexObject):
             # replace match and normalize path separator to separator style of map_path
             url = self.file.replace(pms_path, map_path, 1).replace(sep == "/" and "\\" or "/", sep)
 
-            if (verify and xbmcvfs.exists(url)) or not verify:
+            if (verify and pmm.exists(url)) or not verify:
                 util.DEBUG_LOG("File {} found in path map, mapping to {}", self.file, pms_path)
                 return url
             util.LOG("Mapped file {} doesn't exist", url)
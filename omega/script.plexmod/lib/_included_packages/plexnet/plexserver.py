@@ -17,6 +17,7 @@ from . import plexobjects
 from . import plexresource
 from . import plexlibrary
 from . import asyncadapter
+from . import tracing
 from six.moves import range
 # from plexapi.client import Client
 # from plexapi.playqueue import PlayQueue
@@ -230,6 +231,7 @@ class PlexServer(plexresource.PlexResource, signalsmixin.SignalsMixin):
             util.WARN_LOG("Server connection is None, returning an empty url")
             return ""
 
+    @tracing.traced("plexserver")
     def query(self, path, method=None, **kwargs):
         method = method or self.session.get
 
@@ -246,6 +248,7 @@ class PlexServer(plexresource.PlexResource, signalsmixin.SignalsMixin):
             kwargs.clear()
 
         url = self.buildUrl(path, includeToken=True)
+        tracing.TRACER.current().set(path=path)
 
         # If URL is empty, try refresh resources and return empty set for now
         if not url:
@@ -260,7 +263,8 @@ class PlexServer(plexresource.PlexResource, signalsmixin.SignalsMixin):
             url = http.addUrlParam(url, "X-Plex-Container-Start=%s" % offset)
             url = http.addUrlParam(url, "X-Plex-Container-Size=%s" % limit)
 
-        util.LOG('{0} {1}', method.__name__.upper(), re.sub('X-Plex-Token=[^&]+', 'X-Plex-Token=****', url))
+        util.LOG('{0} {1}', method.__name__.upper(), url)
+        start = time.time()
         try:
             response = method(url, **kwargs)
             if response.status_code not in (200, 201):
@@ -277,7 +281,15 @@ class PlexServer(plexresource.PlexResource, signalsmixin.SignalsMixin):
         except asyncadapter.CanceledException:
             return None
 
-        return ElementTree.fromstring(data) if data else None
+        if not data:
+            return None
+
+        fetched = time.time()
+        with tracing.TRACER.span("parse", "xml", bytes=len(data)):
+            root = ElementTree.fromstring(data)
+        util.DEBUG_LOG('Query {0}: fetched {1} bytes in {2:.0f}ms, parsed in {3:.0f}ms',
+                       path, len(data), (fetched - start) * 1000, (time.time() - fetched) * 1000)
+        return root
 
     def getImageTranscodeURL(self, path, width, height, **extraOpts):
         if not path:
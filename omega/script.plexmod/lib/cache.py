@@ -8,7 +8,7 @@ from kodi_six import xbmcvfs
 from plexnet import plexapp
 
 from lib.kodijsonrpc import rpc
-from lib.util import ADDON, translatePath, KODI_BUILD_NUMBER, DEBUG_LOG, LOG, FROM_KODI_REPOSITORY
+from lib.util import ADDON, translatePath, KODI_BUILD_NUMBER, DEBUG_LOG, LOG, FROM_KODI_REPOSITORY, Deferred
 from lib.advancedsettings import adv
 
 
@@ -40,8 +40,11 @@ class KodiCacheManager(object):
 
     def __init__(self):
         if KODI_BUILD_NUMBER >= 2090821:
-            self.memorySize = rpc.Settings.GetSettingValue(setting='filecache.memorysize')['value']
-            self.readFactor = rpc.Settings.GetSettingValue(setting='filecache.readfactor')['value'] / 100.0
+            with rpc.batch() as batch:
+                memorySize = batch.Settings.GetSettingValue(setting='filecache.memorysize')
+                readFactor = batch.Settings.GetSettingValue(setting='filecache.readfactor')
+            self.memorySize = memorySize.result()['value']
+            self.readFactor = readFactor.result()['value'] / 100.0
             if self.readFactor % 1 == 0:
                 self.readFactor = int(self.readFactor)
             DEBUG_LOG("Not using advancedsettings.xml for cache/buffer management, we're at least Kodi 21 non-alpha")
@@ -56,8 +59,8 @@ class KodiCacheManager(object):
             self.load()
             self.template = self.getTemplate()
 
-        plexapp.util.APP.on('change:slow_connection',
-                            lambda value=None, **kwargs: self.write(readFactor=value and self.defRFSM or self.defRF))
+        # what Kodi uses until it's restarted
+        self.initialMemorySize = self.memorySize
 
     def getTemplate(self):
         if xbmcvfs.exists(self.custom_tpl_path):
@@ -110,8 +113,9 @@ class KodiCacheManager(object):
         if self.useModernAPI:
             # kodi cache settings have moved to Services>Caching
             try:
-                rpc.Settings.SetSettingValue(setting='filecache.memorysize', value=self.memorySize)
-                rpc.Settings.SetSettingValue(setting='filecache.readfactor', value=int(self.readFactor * 100))
+                with rpc.batch() as batch:
+                    batch.Settings.SetSettingValue(setting='filecache.memorysize', value=self.memorySize)
+                    batch.Settings.SetSettingValue(setting='filecache.readfactor', value=int(self.readFactor * 100))
             except:
                 pass
             return
@@ -172,5 +176,12 @@ class KodiCacheManager(object):
         return recMem
 
 
-kcm = KodiCacheManager()
-CACHE_SIZE = kcm.memorySize
+# reading the cache settings costs JSON-RPC calls or advancedsettings.xml I/O, don't do it at import time
+kcm = Deferred(KodiCacheManager)
+
+
+def onSlowConnection(value=None, **kwargs):
+    kcm.write(readFactor=value and kcm.defRFSM or kcm.defRF)
+
+
+plexapp.util.APP.on('change:slow_connection', onSlowConnection)
@@ -1,34 +1,125 @@
 # coding=utf-8
+import re
 import sys
+import threading
 import traceback
 import types
 
+from six.moves import queue
 from kodi_six import xbmc
 
+TOKEN_RE = re.compile(r'X-Plex-Token=[^&\s]+')
 
-def log(msg, *args, **kwargs):
-    if args:
-        # resolve dynamic args
-        msg = msg.format(*[arg() if isinstance(arg, types.FunctionType) else arg for arg in args])
 
-    level = kwargs.pop("level", xbmc.LOGINFO)
+def _resolve(arg):
+    # resolve dynamic args right away, as they might depend on the calling thread's state (e.g. traceback.format_exc)
+    return arg() if isinstance(arg, types.FunctionType) else arg
+
+
+def _redact(msg):
+    if 'X-Plex-Token=' in msg:
+        return TOKEN_RE.sub('X-Plex-Token=****', msg)
+    return msg
+
+
+def _format(msg, args, kwargs):
+    if args:
+        msg = msg.format(*args)
 
     if kwargs:
-        # resolve dynamic kwargs
-        msg = msg.format(**dict((k, v()) if isinstance(v, types.FunctionType) else v for k, v in kwargs.items()))
-    xbmc.log('script.plex: {0}'.format(msg), level)
+        msg = msg.format(**kwargs)
+    return _redact('script.plex: {0}'.format(msg))
+
+
+class LogWriter(threading.Thread):
+    """
+    Formats queued log records and hands them to Kodi on a single thread, so logging threads (UI, BGThreader workers)
+    don't have to wait for it
+    """
+    def __init__(self):
+        threading.Thread.__init__(self, name='LOG-WRITER')
+        self.daemon = True
+        self.queue = queue.Queue()
+
+    def put(self, record):
+        self.queue.put(record)
+
+    def run(self):
+        while True:
+            record = self.queue.get()
+            if record is None:
+                return
+
+            self.write(*record)
+
+    @staticmethod
+    def write(msg, args, kwargs, level):
+        try:
+            if args is None:
+                # pre-formatted
+                xbmc.log(_redact(msg), level)
+                return
+
+            xbmc.log(_format(msg, args, kwargs), level)
+        except:
+            xbmc.log(_redact('script.plex: Failed to format log message: {0} {1} {2}'.format(repr(msg), repr(args),
+                                                                                             repr(kwargs))),
+                     xbmc.LOGERROR)
+
+    def stop(self, timeout=2):
+        self.queue.put(None)
+        self.join(timeout)
+
+
+_WRITER = None
+_WRITER_LOCK = threading.Lock()
+_STOPPED = False
+
+
+def _emit(msg, args, kwargs, level):
+    global _WRITER
+    if _STOPPED:
+        LogWriter.write(msg, args, kwargs, level)
+        return
+
+    if not _WRITER:
+        with _WRITER_LOCK:
+            if not _WRITER:
+                writer = LogWriter()
+                writer.start()
+                _WRITER = writer
+
+    _WRITER.put((msg, args, kwargs, level))
+
+
+def log(msg, *args, **kwargs):
+    level = kwargs.pop("level", xbmc.LOGINFO)
+    _emit(msg, args and [_resolve(arg) for arg in args] or (),
+          dict((k, _resolve(v)) for k, v in kwargs.items()), level)
 
 
 def log_error(txt='', hide_tb=False):
     short = str(sys.exc_info()[1])
     if hide_tb:
-        xbmc.log('script.plex: ERROR: {0} - {1}'.format(txt, short), xbmc.LOGERROR)
+        _emit('script.plex: ERROR: {0} - {1}'.format(txt, short), None, None, xbmc.LOGERROR)
         return short
 
     tb = traceback.format_exc()
-    xbmc.log("_________________________________________________________________________________", xbmc.LOGERROR)
-    xbmc.log('script.plex: ERROR: ' + txt, xbmc.LOGERROR)
+    _emit("_________________________________________________________________________________", None, None,
+          xbmc.LOGERROR)
+    _emit('script.plex: ERROR: ' + txt, None, None, xbmc.LOGERROR)
     for l in tb.splitlines():
-        xbmc.log('    ' + l, xbmc.LOGERROR)
-    xbmc.log("_________________________________________________________________________________", xbmc.LOGERROR)
-    xbmc.log("`", xbmc.LOGERROR)
+        _emit('    ' + l, None, None, xbmc.LOGERROR)
+    _emit("_________________________________________________________________________________", None, None,
+          xbmc.LOGERROR)
+    _emit("`", None, None, xbmc.LOGERROR)
+
+
+def shutdown():
+    """
+    Flush the queued records and write synchronously from now on
+    """
+    global _STOPPED
+    _STOPPED = True
+    if _WRITER:
+        _WRITER.stop()
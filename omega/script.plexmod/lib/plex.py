@@ -11,7 +11,7 @@ import six
 
 from kodi_six import xbmc, xbmcaddon
 
-from plexnet import plexapp, myplex, util as plexnet_util, asyncadapter, http as pnhttp
+from plexnet import plexapp, myplex, util as plexnet_util, asyncadapter, http as pnhttp, tracing, jumpindex
 
 from .playback_utils import PlaybackManager
 from . windows.settings import PlayedThresholdSetting
@@ -288,6 +288,16 @@ def onManualIPChange(**kwargs):
     plexapp.refreshResources(True)
 
 
+def onWatchStateChange(**kwargs):
+    # unwatched listings (and their jump lists) have changed
+    jumpindex.INDEXES.invalidate()
+
+
+def onLibraryChange(server=None, sections=None, **kwargs):
+    for section in sections or ():
+        jumpindex.INDEXES.invalidate(server.uuid, section)
+
+
 plexapp.util.setInterface(PlexInterface())
 plexapp.util.INTERFACE.playbackManager = PlaybackManager()
 plexapp.util.APP.on('change:smart_discover_local', onSmartDiscoverLocalChange)
@@ -297,6 +307,9 @@ plexapp.util.APP.on('change:manual_ip_0', onManualIPChange)
 plexapp.util.APP.on('change:manual_ip_1', onManualIPChange)
 plexapp.util.APP.on('change:manual_port_0', onManualIPChange)
 plexapp.util.APP.on('change:manual_port_1', onManualIPChange)
+plexapp.util.APP.on('change:watchState', onWatchStateChange)
+plexapp.util.APP.on('notifications:changed', onLibraryChange)
+util.MONITOR.on('changed.watchstatus', onWatchStateChange)
 
 plexapp.util.CHECK_LOCAL = util.getSetting('smart_discover_local', True)
 plexapp.util.LOCAL_OVER_SECURE = util.getSetting('prefer_local', False)
@@ -326,6 +339,7 @@ if util.addonSettings.useCertBundle != "system":
     util.LOG("Using certificate bundle: {}".format(util.addonSettings.useCertBundle))
     plexnet_util.USE_CERT_BUNDLE = util.addonSettings.useCertBundle
 plexnet_util.translatePath = util.translatePath
+tracing.TRACER.enabled = util.addonSettings.debug and util.addonSettings.debugTracing
 
 
 class CallbackEvent(plexapp.util.CompatEvent):
@@ -8,11 +8,12 @@ import math
 import plexnet
 from kodi_six import xbmc
 from kodi_six import xbmcgui
-from plexnet import plexapp, plexresource
+from plexnet import plexapp, plexresource, notifications
 from six.moves import range
 
 from lib import backgroundthread
 from lib import player
+from lib import preload
 from lib import util
 from lib.path_mapping import pmm
 from lib.plex_hosts import pdm
@@ -28,6 +29,7 @@ from . import windowutils
 from .mixins import SpoilersMixin
 
 HUBS_REFRESH_INTERVAL = 300  # 5 Minutes
+HUBS_REFRESH_INTERVAL_PUSH = 1800  # 30 Minutes, when the server notifies us of changes
 HUB_PAGE_SIZE = 10
 
 MOVE_SET = frozenset(
@@ -51,6 +53,7 @@ class HubsList(list):
     def init(self):
         self.lastUpdated = time.time()
         self.invalid = False
+        self.dirty = False
         return self
 
 
@@ -280,6 +283,10 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
     width = 1920
     height = 1080
 
+    # tick only checks whether the hubs are dirty or older than the refresh interval
+    cronInterval = 10
+    cronLowPriority = True
+
     OPTIONS_GROUP_ID = 200
 
     SECTION_LIST_ID = 101
@@ -421,6 +428,8 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
         self.movingSection = False
         self._initialMovingSectionPos = None
         self.go_root = False
+        self.notifications = None
+        self._createdAt = time.time()
         windowutils.HOME = self
 
         self.lock = threading.Lock()
@@ -695,6 +704,8 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
 
         player.PLAYER.on('session.ended', self.updateOnDeckHubs)
         util.MONITOR.on('changed.watchstatus', self.updateOnDeckHubs)
+        plexapp.util.APP.on('change:watchState', self.updateOnDeckHubs)
+        plexapp.util.APP.on('notifications:changed', self.onNotificationsChanged)
         util.MONITOR.on('screensaver.activated', self.disableUpdates)
         util.MONITOR.on('screensaver.deactivated', self.refreshLastSection)
         util.MONITOR.on('dpms.deactivated', self.refreshLastSection)
@@ -722,6 +733,8 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
 
         player.PLAYER.off('session.ended', self.updateOnDeckHubs)
         util.MONITOR.off('changed.watchstatus', self.updateOnDeckHubs)
+        plexapp.util.APP.off('change:watchState', self.updateOnDeckHubs)
+        plexapp.util.APP.off('notifications:changed', self.onNotificationsChanged)
         util.MONITOR.off('screensaver.activated', self.disableUpdates)
         util.MONITOR.off('screensaver.deactivated', self.refreshLastSection)
         util.MONITOR.off('dpms.deactivated', self.refreshLastSection)
@@ -736,9 +749,50 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
         if hubs is None:
             return
 
-        if (self.is_active and time.time() - hubs.lastUpdated > HUBS_REFRESH_INTERVAL and
-                not xbmc.Player().isPlayingVideo()):
+        if not self.is_active or xbmc.Player().isPlayingVideo():
+            return
+
+        if hubs.dirty or time.time() - hubs.lastUpdated > self.hubsRefreshInterval:
             self.showHubs(self.lastSection, update=True)
+        elif self._odHubsDirty:
+            self._updateOnDeckHubs()
+
+    @property
+    def hubsRefreshInterval(self):
+        # while the server notifies us of changes, polling is only a fallback
+        if self.notifications and self.notifications.connected:
+            return HUBS_REFRESH_INTERVAL_PUSH
+        return HUBS_REFRESH_INTERVAL
+
+    def startNotifications(self):
+        server = plexapp.SERVERMANAGER.selectedServer
+        if not util.addonSettings.hubsPushUpdates:
+            self.stopNotifications()
+            return
+
+        if self.notifications and self.notifications.server == server:
+            return
+
+        self.stopNotifications()
+        self.notifications = notifications.NotificationListener(server).start()
+
+    def stopNotifications(self):
+        if self.notifications:
+            self.notifications.stop()
+            self.notifications = None
+
+    def onNotificationsChanged(self, server=None, sections=None, onDeck=False, **kwargs):
+        if not self.notifications or server != self.notifications.server:
+            return
+
+        # the home hubs contain items of all sections
+        for key in [None] + list(sections or ()):
+            hubs = self.sectionHubs.get(key)
+            if hubs is not None:
+                hubs.dirty = True
+
+        if onDeck:
+            self.updateOnDeckHubs()
 
     def doClose(self):
         plexapp.util.APP.trigger('close.windows')
@@ -752,6 +806,7 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
             pass
 
         self.unhookSignals()
+        self.stopNotifications()
         self.storeLastBG()
 
     def storeLastBG(self):
@@ -956,6 +1011,7 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
 
         if 399 < controlID < 500:
             self.setProperty('hub.focus', str(self.hubFocusIndexes[controlID - 400]))
+            preload.PRELOADER.focus(self.hubControls[controlID - 400])
 
         if controlID == self.SECTION_LIST_ID and not self.changingServer:
             self.checkSectionItem()
@@ -1036,6 +1092,7 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
     def setDebugFlag(self, *args, **kwargs):
         util.DEBUG = util.getSetting("debug", False)
         util.addonSettings.debug = util.DEBUG
+        util.DEBUG_LEVEL.refresh()
 
     def fullyRefreshHome(self, *args, **kwargs):
         section = kwargs.pop("section", None)
@@ -1102,9 +1159,11 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
             self.loadLibrarySettings()
             self.loadHubSettings()
             if not plexapp.SERVERMANAGER.selectedServer:
+                self.stopNotifications()
                 self.setFocusId(self.USER_BUTTON_ID)
                 return False
 
+            self.startNotifications()
             self.fullyRefreshHome(section=section)
             if section is not None:
                 for mli in self.sectionList:
@@ -1486,6 +1545,9 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
         if util.addonSettings.dynamicBackgrounds and is_valid_mli:
             self.updateBackgroundFrom(mli.dataSource)
 
+        if is_valid_mli:
+            preload.PRELOADER.focus(control)
+
         if not mli or not mli.getProperty('is.end') or mli.getProperty('is.updating') == '1':
             # round robining
             if mli and util.getSetting("hubs_round_robin", False):
@@ -1762,7 +1824,7 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
 
         if not force:
             if hubs is not None:
-                section_stale = time.time() - hubs.lastUpdated > HUBS_REFRESH_INTERVAL
+                section_stale = hubs.dirty or time.time() - hubs.lastUpdated > self.hubsRefreshInterval
 
             # hubs.invalid is True when the last hub update errored. if the hub is stale, refresh it, though
             if hubs is not None and hubs.invalid and not section_stale:
@@ -1824,6 +1886,9 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
 
             if not hasContent:
                 self.setBoolProperty('no.content', True)
+            elif self._createdAt:
+                util.DEBUG_LOG('Time to first hubs: {0:.0f}ms', (time.time() - self._createdAt) * 1000)
+                self._createdAt = None
 
             lastSkip = 0
             if skip:
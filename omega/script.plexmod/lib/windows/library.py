@@ -17,6 +17,7 @@ from six.moves import range
 
 from lib import backgroundthread
 from lib import player
+from lib import preload
 from lib import util
 from lib.util import T
 from . import busy
@@ -433,6 +434,9 @@ class LibraryWindow(mixins.PlaybackBtnMixin, kodigui.MultiWindow, windowutils.Ut
                 controlID = self.getFocusId()
                 if controlID == self.POSTERS_PANEL_ID or controlID == self.SCROLLBAR_ID:
                     self.updateKey()
+
+                if controlID == self.POSTERS_PANEL_ID:
+                    preload.PRELOADER.focus(self.showPanelControl)
             elif action == xbmcgui.ACTION_MOUSE_DRAG:
                 self.onMouseDrag(action)
             elif action == xbmcgui.ACTION_CONTEXT_MENU:
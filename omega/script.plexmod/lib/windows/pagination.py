@@ -1,11 +1,35 @@
 from __future__ import absolute_import
 
+import threading
+import time
+
 from kodi_six import xbmcgui
 
+from lib import backgroundthread
 from lib import util
 from . import kodigui
 
 
+class PrefetchTask(backgroundthread.Task):
+    def setup(self, paginator, offset, amount):
+        self.paginator = paginator
+        self.key = (offset, amount)
+        self.data = None
+        self.started = False
+        self.done = threading.Event()
+        return self
+
+    def run(self):
+        self.started = True
+        try:
+            if not self.isCanceled():
+                self.data = self.paginator.getData(*self.key)
+        except:
+            util.ERROR()
+        finally:
+            self.done.set()
+
+
 class MCLPaginator(object):
     """
     A paginator for ManagedControlList instances
@@ -21,15 +45,20 @@ class MCLPaginator(object):
     parentWindow = None
     thumbFallback = None
 
+    # start fetching the adjacent page when the selection is this close to a boundary item; 0 disables prefetching
+    prefetchDistance = 3
+
     _direction = None
     _currentAmount = None
     _lastAmount = None
     _boundaryHit = False
+    _prefetch = None
 
-    def __init__(self, control, parent_window, page_size=None, orphans=None, leaf_count=None):
+    def __init__(self, control, parent_window, page_size=None, orphans=None, leaf_count=None, prefetch_distance=None):
         self.control = control
         self.pageSize = page_size if page_size is not None else self.pageSize
         self.orphans = orphans if orphans is not None else self.orphans
+        self.prefetchDistance = prefetch_distance if prefetch_distance is not None else self.prefetchDistance
         self.leafCount = leaf_count
         self.parentWindow = parent_window
 
@@ -41,6 +70,7 @@ class MCLPaginator(object):
         self._lastAmount = None
         self._boundaryHit = False
         self._direction = None
+        self.cancelPrefetch()
 
     def getData(self, offset, amount):
         raise NotImplementedError
@@ -72,16 +102,74 @@ class MCLPaginator(object):
             self.offset = int(mli.getProperty("orig.index"))
             self._direction = direction
             self._boundaryHit = True
+        elif mli:
+            self.checkPrefetch()
 
         return self._boundaryHit
 
-    @property
-    def nextPage(self):
+    def checkPrefetch(self):
+        """
+        Starts fetching the page behind the boundary item the selection is close to, replacing a prefetch of the
+        other direction. Only pages in the direction of travel are prefetched; after a page turn the selection sits next
+        to the boundary it came from, which would otherwise fetch the page just left on every turn
+        """
+        if not self.prefetchDistance or not self._currentAmount:
+            return
+
+        pos = self.control.getSelectedPos()
+        if pos is None:
+            return
+
+        if self._direction != "left" and self.offset + self._currentAmount < self.leafCount and \
+                len(self.control) - 1 - pos <= self.prefetchDistance:
+            offset, amount = self.getPage("right", self.offset + self._currentAmount)
+        elif self._direction != "right" and self.offset > 0 and pos <= self.prefetchDistance:
+            offset, amount = self.getPage("left", self.offset)
+        else:
+            return
+
+        # tasks are falsy once finished, a finished prefetch is what we want to keep
+        if self._prefetch is not None:
+            if self._prefetch.key == (offset, amount) and not self._prefetch.isCanceled():
+                return
+            self._prefetch.cancel()
+
+        self._prefetch = PrefetchTask().setup(self, offset, amount)
+        backgroundthread.BGThreader.addTasksToFront([self._prefetch])
+
+    def cancelPrefetch(self):
+        if self._prefetch is not None:
+            self._prefetch.cancel()
+            self._prefetch = None
+
+    def takePrefetched(self, offset, amount):
+        """
+        Returns the prefetched page if it's the one requested, waiting for it if it's being fetched right now
+        """
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is None:
+            return None
+
+        if prefetch.key != (offset, amount):
+            prefetch.cancel()
+            return None
+
+        while not prefetch.done.wait(0.05):
+            # still queued or dropped
+            if not prefetch.started or prefetch.isCanceled():
+                prefetch.cancel()
+                return None
+
+        return prefetch.data
+
+    def getPage(self, direction, offset):
+        """
+        Returns offset and amount of the page next to :offset: in :direction:
+        """
         leafCount = self.leafCount
-        offset = self.offset
         amount = self.pageSize
 
-        if self._direction == "left":
+        if direction == "left":
             if offset <= self.initialPageSize:
                 # return to initial page
                 offset = 0
@@ -103,8 +191,20 @@ class MCLPaginator(object):
             if itemsLeft <= self.pageSize + self.orphans:
                 amount = self.pageSize + self.orphans
 
+        return offset, amount
+
+    @property
+    def nextPage(self):
+        offset, amount = self.getPage(self._direction, self.offset)
+
         self.offset = offset
-        data = self.getData(offset, amount)
+        start = time.time()
+        data = self.takePrefetched(offset, amount)
+        prefetched = data is not None
+        if not prefetched:
+            data = self.getData(offset, amount)
+        util.DEBUG_LOG("{0}: Page {1}+{2} ready after {3:.0f}ms (prefetched: {4})", self.__class__.__name__, offset,
+                       amount, (time.time() - start) * 1000, prefetched)
         self._lastAmount = self._currentAmount
         self._currentAmount = len(data)
         return data
@@ -5,6 +5,7 @@ from kodi_six import xbmcgui
 from plexnet import plexplayer, media
 
 from lib import metadata
+from lib import preload
 from lib import util
 from lib.util import T
 from . import busy
@@ -91,7 +92,7 @@ class PrePlayWindow(kodigui.ControlledWindow, windowutils.UtilMixin, RatingsMixi
 
     def doAutoPlay(self):
         # First reload the video to get all the other info
-        self.video.reload(checkFiles=1, **VIDEO_RELOAD_KW)
+        self.reloadVideo()
         return self.playVideo(from_auto_play=True)
 
     @busy.dialog()
@@ -270,11 +271,11 @@ class PrePlayWindow(kodigui.ControlledWindow, windowutils.UtilMixin, RatingsMixi
         if choice['key'] == 'play_next':
             xbmc.executebuiltin('PlayerControl(Next)')
         elif choice['key'] == 'mark_watched':
-            self.video.markWatched(**VIDEO_RELOAD_KW)
+            self.video.setWatched(True)
             self.refreshInfo()
             util.MONITOR.watchStatusChanged()
         elif choice['key'] == 'mark_unwatched':
-            self.video.markUnwatched(**VIDEO_RELOAD_KW)
+            self.video.setWatched(False)
             self.refreshInfo()
             util.MONITOR.watchStatusChanged()
         elif choice['key'] == 'to_season':
@@ -500,6 +501,10 @@ class PrePlayWindow(kodigui.ControlledWindow, windowutils.UtilMixin, RatingsMixi
 
         self.processCommand(opener.open(item))
 
+    def reloadVideo(self):
+        # use the preloaded metadata if we've dwelled on this item long enough before opening it
+        preload.PRELOADER.reload(self.video, checkFiles=1, **VIDEO_RELOAD_KW)
+
     def focusPlayButton(self):
         try:
             if not self.getFocusId() == self.PLAY_BUTTON_ID:
@@ -517,7 +522,7 @@ class PrePlayWindow(kodigui.ControlledWindow, windowutils.UtilMixin, RatingsMixi
         elif self.video.type == 'movie':
             self.setProperty('preview.no', '1')
 
-        self.video.reload(checkFiles=1, **VIDEO_RELOAD_KW)
+        self.reloadVideo()
         try:
             self.relatedPaginator = RelatedPaginator(self.relatedListControl, leaf_count=int(self.video.relatedCount),
                                                      parent_window=self)
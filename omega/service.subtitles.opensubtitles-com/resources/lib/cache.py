@@ -1,45 +1,129 @@
+import hashlib
 import json
+import os
 
 from time import time
 
-import xbmcgui
+import xbmcaddon
+import xbmcvfs
 
 from resources.lib.utilities import log
 
+__addon__ = xbmcaddon.Addon()
+
+CACHE_DIR = xbmcvfs.translatePath(os.path.join(__addon__.getAddonInfo("profile"), "cache", ""))
+
+# run the expiry sweep at most this often
+PRUNE_INTERVAL = 60 * 60 * 24
+
 
 class Cache(object):
-    """Caches Python values as JSON."""
+    """Caches Python values as JSON and raw file contents on disk, so they survive Kodi restarts."""
 
-    def __init__(self, key_prefix=""):
+    def __init__(self, key_prefix="", path=CACHE_DIR):
         self.key_prefix = key_prefix
-        self._win = xbmcgui.Window(10000)
+        self.path = path
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, exist_ok=True)
 
-    def set(self, key, value, expires=60 * 60 * 24 * 7):
-
-        log(__name__, f"caching {key}")
+    def _path(self, key, ext):
         if self.key_prefix:
             key = f"{self.key_prefix}:{key}"
 
+        return os.path.join(self.path, hashlib.sha1(key.encode("utf-8")).hexdigest() + ext)
+
+    @staticmethod
+    def _write(path, data):
+        # write to a temporary file first, so concurrent readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log(__name__, f"couldn't write cache entry {path}: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _remove(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def set(self, key, value, expires=60 * 60 * 24 * 7):
+
+        log(__name__, f"caching {key}")
         expires += time()
 
         cache_data_str = json.dumps(dict(value=value, expires=expires))
 
-        self._win.setProperty(key, cache_data_str)
+        self._write(self._path(key, ".json"), cache_data_str.encode("utf-8"))
 
     def get(self, key, default=None):
 
         log(__name__, f"got request for {key} from cache")
         result = default
 
-        if self.key_prefix:
-            key = f"{self.key_prefix}:{key}"
-
-        cache_data_str = self._win.getProperty(key)
+        path = self._path(key, ".json")
+        try:
+            with open(path, "rb") as f:
+                cache_data = json.loads(f.read().decode("utf-8"))
+        except (OSError, ValueError):
+            return result
 
-        if cache_data_str:
-            cache_data = json.loads(cache_data_str)
-            if cache_data["expires"] > time():
-                result = cache_data["value"]
-                log(__name__, f"got {key} from cache")
+        if cache_data["expires"] > time():
+            result = cache_data["value"]
+            log(__name__, f"got {key} from cache")
+        else:
+            self._remove(path)
 
         return result
+
+    def delete(self, key):
+        self._remove(self._path(key, ".json"), self._path(key, ".bin"))
+
+    def set_file(self, key, content, expires=60 * 60 * 24 * 7):
+        """Caches the bytes in content; the entry expires along with its JSON counterpart of the same key."""
+        log(__name__, f"caching file {key}")
+        self._write(self._path(key, ".bin"), content)
+        self.set(key, dict(file=True), expires=expires)
+
+    def get_file(self, key):
+        if not self.get(key):
+            return None
+
+        try:
+            with open(self._path(key, ".bin"), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def prune(self):
+        """Removes expired entries, at most once per PRUNE_INTERVAL."""
+        if self.get("last_prune"):
+            return
+
+        now = time()
+        removed = 0
+        for name in os.listdir(self.path):
+            if not name.endswith(".json"):
+                continue
+
+            path = os.path.join(self.path, name)
+            try:
+                with open(path, "rb") as f:
+                    expired = json.loads(f.read().decode("utf-8"))["expires"] <= now
+            except (OSError, ValueError, KeyError):
+                expired = True
+
+            if expired:
+                self._remove(path, path[:-5] + ".bin")
+                removed += 1
+
+        log(__name__, f"pruned {removed} expired cache entries")
+        self.set("last_prune", True, expires=PRUNE_INTERVAL)
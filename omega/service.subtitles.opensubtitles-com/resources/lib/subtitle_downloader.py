@@ -46,7 +46,10 @@ class SubtitleDownloader:
         self.file = {}
 
         try:
-            self.open_subtitles = OpenSubtitlesProvider(self.api_key, self.username, self.password)
+            self.open_subtitles = OpenSubtitlesProvider(
+                self.api_key, self.username, self.password,
+                search_ttl=__addon__.getSettingInt("search_cache_hours") * 60 * 60,
+                download_ttl=__addon__.getSettingInt("download_cache_days") * 60 * 60 * 24)
         except ConfigurationError as e:
             error(__name__, 32002, e)
 
@@ -10,15 +10,17 @@
 
 from __future__ import absolute_import, unicode_literals
 import re
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing
 from collections import namedtuple
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from kodi_six.xbmcvfs import File
 from .exceptions import SubsSearchError, DailyLimitError
 from .utils import LanguageData
-from .webclient import Session
+from .webclient import Session, MAX_CONNECTIONS
 
-__all__ = ['search_episode', 'get_episode', 'download_subs']
+__all__ = ['search_episode', 'get_episode', 'prefetch_episodes',
+           'download_subs']
 
 session = Session()
 SubsSearchResult = namedtuple('SubsSearchResult', ['subtitles', 'episode_url'])
@@ -29,6 +31,32 @@ version_re = re.compile(r'Version (.*?),')
 original_download_re = re.compile(r'^/original')
 updated_download_re = re.compile(r'^/updated')
 jointranslation_re = re.compile('^/jointranslation')
+# episode pages to load while the user is still choosing
+PREFETCH_LIMIT = 5
+# the only parts of the search and episode pages we look at
+result_tables = SoupStrainer('table', class_=['tabel', 'tabel95'])
+
+
+def parse_page(webpage, parse):
+    """
+    Run parse on a soup of the result tables of webpage, built with the much
+    faster html.parser. html5lib repairs broken markup html.parser doesn't,
+    so if the fast soup yields nothing (or breaks parse), the page is parsed
+    again with html5lib.
+
+    :param webpage: page HTML
+    :param parse: function that accepts a soup and returns the results
+    :return: parse results
+    :raises: SubsSearchError if neither soup yields results
+    """
+    try:
+        results = parse(BeautifulSoup(webpage, 'html.parser',
+                                      parse_only=result_tables))
+        if results:
+            return results
+    except (SubsSearchError, AttributeError, KeyError, TypeError):
+        pass
+    return parse(BeautifulSoup(webpage, 'html5lib'))
 
 
 def search_episode(query, languages=None):
@@ -53,28 +81,22 @@ def search_episode(query, languages=None):
         languages = [LanguageData('English', 'English')]
     webpage = session.load_page('/search.php',
                                 params={'search': query, 'Submit': 'Search'})
-    soup = BeautifulSoup(webpage, 'html5lib')
-    table = soup.find('table',
-                      {'class': 'tabel', 'align': 'center', 'width': '80%',
-                       'border': '0'}
-                      )
-    if table is not None:
-        results = list(parse_search_results(table))
-        if not results:
-            raise SubsSearchError
-        return results
-    else:
-        sub_cells = soup.find_all(
-            'table',
-            {'width': '100%', 'border': '0',
-             'align': 'center', 'class': 'tabel95'}
-        )
-        if sub_cells:
-            return SubsSearchResult(
-                parse_episode(sub_cells, languages), session.last_url
-            )
+    episode_url = session.last_url
+
+    def parse(soup):
+        table = soup.find('table',
+                          {'class': 'tabel', 'align': 'center', 'width': '80%',
+                           'border': '0'}
+                          )
+        if table is not None:
+            results = list(parse_search_results(table))
+            if not results:
+                raise SubsSearchError
+            return results
         else:
-            raise SubsSearchError
+            return parse_episode_page(soup, languages, episode_url)
+
+    return parse_page(webpage, parse)
 
 
 def parse_search_results(table):
@@ -87,14 +109,39 @@ def get_episode(link, languages=None):
     if languages is None:
         languages = [LanguageData('English', 'English')]
     webpage = session.load_page('/' + link)
-    soup = BeautifulSoup(webpage, 'html5lib')
+    episode_url = session.last_url
+    return parse_page(
+        webpage,
+        lambda soup: parse_episode_page(soup, languages, episode_url)
+    )
+
+
+def prefetch_episodes(links, languages=None):
+    """
+    Start loading the first PREFETCH_LIMIT episode pages in parallel
+
+    :param links: episode links as returned by :func:`search_episode`
+    :param languages: the list of languages to search
+    :return: the list of futures resolving to what :func:`get_episode`
+        returns (``None`` for links that are not prefetched), and the executor
+        to shut down when done
+    """
+    executor = ThreadPoolExecutor(max_workers=MAX_CONNECTIONS)
+    futures = [executor.submit(get_episode, link, languages)
+               for link in links[:PREFETCH_LIMIT]]
+    futures += [None] * (len(links) - len(futures))
+    return futures, executor
+
+
+def parse_episode_page(soup, languages, episode_url):
     sub_cells = soup.find_all(
         'table',
         {'width': '100%', 'border': '0', 'align': 'center', 'class': 'tabel95'}
     )
     if sub_cells:
+        # parse right away, so parse_page sees markup the soup can't handle
         return SubsSearchResult(
-            parse_episode(sub_cells, languages), session.last_url
+            list(parse_episode(sub_cells, languages)), episode_url
         )
     else:
         raise SubsSearchError
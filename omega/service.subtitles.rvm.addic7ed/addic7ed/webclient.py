@@ -1,6 +1,7 @@
 # coding: utf-8
 
 from __future__ import absolute_import, unicode_literals
+import threading
 import requests
 from .exceptions import Add7ConnectionError
 from .utils import logger
@@ -16,16 +17,28 @@ HEADERS = {
     'Accept-Charset': 'UTF-8',
     'Accept-Encoding': 'gzip,deflate'
 }
+# requests to the site at once, so it doesn't throttle us
+MAX_CONNECTIONS = 2
 
 
 class Session(object):
     """
     Webclient Session class
+
+    Each thread gets its own keep-alive session and last URL, and at most
+    MAX_CONNECTIONS requests are made at once.
     """
     def __init__(self):
-        self._session = requests.Session()
-        self._session.headers = HEADERS.copy()
-        self._last_url = ''
+        self._local = threading.local()
+        self._host_slots = threading.BoundedSemaphore(MAX_CONNECTIONS)
+
+    @property
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers = HEADERS.copy()
+        return session
 
     @property
     def last_url(self):
@@ -34,13 +47,14 @@ class Session(object):
 
         :return: URL of the last webpage
         """
-        return self._last_url
+        return getattr(self._local, 'last_url', '')
 
     def _open_url(self, url, params, referer):
         logger.debug('Opening URL: {0}'.format(url))
         self._session.headers['Referer'] = referer
         try:
-            response = self._session.get(url, params=params, verify=False)
+            with self._host_slots:
+                response = self._session.get(url, params=params, verify=False)
         except requests.RequestException:
             logger.error('Unable to connect to Addic7ed.com!')
             raise Add7ConnectionError
@@ -51,7 +65,7 @@ class Session(object):
                 response.status_code)
             )
             raise Add7ConnectionError
-        self._last_url = response.url
+        self._local.last_url = response.url
         return response
 
     def load_page(self, path, params=None):
@@ -64,7 +78,7 @@ class Session(object):
         :raises ConnectionError: if unable to connect to the server
         """
         response = self._open_url(SITE + path, params, referer=SITE + '/')
-        self._last_url = response.url
+        self._local.last_url = response.url
         return response.text
 
     def download_subs(self, path, referer):
@@ -1,6 +1,9 @@
 import cloudscraper2
 import html5lib
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
 from html5lib import treebuilders, treewalkers
 
 TYPE_MATCH_UNKNOWN = 0
@@ -9,6 +12,114 @@ TYPE_MATCH_CLOSE = 2
 TYPE_MATCH_POPULAR = 3
 TYPE_MATCH_TVSERIES = 4
 
+SPACE_CHARACTERS = "\t\n\x0c\r "
+VOID_ELEMENTS = frozenset(("area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param",
+                           "source", "track", "wbr"))
+CHUNK_SIZE = 16384
+
+# requests to the site at once, so it doesn't throttle us
+MAX_CONNECTIONS = 2
+# candidate pages to fetch while the user is still choosing
+PREFETCH_LIMIT = 5
+
+
+class TokenCollector(HTMLParser):
+    """
+    Turns markup into the same tokens html5lib's tree walkers produce, without building a tree.
+
+    Text is held back until the next tag (or close()), as feeding in chunks hands it over in pieces wherever a text
+    node crosses a chunk boundary, while the matchers expect it as one Characters token.
+    """
+    def __init__(self):
+        HTMLParser.__init__(self, convert_charrefs=True)
+        self.tokens = []
+        self._text = []
+
+    def _flush_text(self):
+        if not self._text:
+            return
+
+        data = "".join(self._text)
+        self._text = []
+        # split off leading and trailing whitespace the way html5lib's walkers do
+        middle = data.lstrip(SPACE_CHARACTERS)
+        left = data[:len(data) - len(middle)]
+        if left:
+            self.tokens.append({'type': 'SpaceCharacters', 'data': left})
+        data = middle
+        middle = data.rstrip(SPACE_CHARACTERS)
+        right = data[len(middle):]
+        if middle:
+            self.tokens.append({'type': 'Characters', 'data': middle})
+        if right:
+            self.tokens.append({'type': 'SpaceCharacters', 'data': right})
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        self.tokens.append({
+            'type': 'EmptyTag' if tag in VOID_ELEMENTS else 'StartTag',
+            'name': tag,
+            'data': dict(((None, k), v or "") for k, v in attrs)
+        })
+
+    def handle_startendtag(self, tag, attrs):
+        # like html5lib, ignore the self-closing flag
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag not in VOID_ELEMENTS:
+            self.tokens.append({'type': 'EndTag', 'name': tag})
+
+    def handle_comment(self, data):
+        # html5lib keeps the text on either side of a comment apart
+        self._flush_text()
+
+    def handle_data(self, data):
+        self._text.append(data)
+
+    def close(self):
+        HTMLParser.close(self)
+        self._flush_text()
+
+
+def fast_stream(text):
+    """
+    Streams the tokens of text chunk by chunk, so a matcher that is done early doesn't pay for the rest of the page.
+    Unlike html5lib it doesn't fix up the markup (implied tbody, unclosed rows), which is what the fallback is for.
+    """
+    collector = TokenCollector()
+    for pos in range(0, len(text), CHUNK_SIZE):
+        collector.feed(text[pos:pos + CHUNK_SIZE])
+        tokens, collector.tokens = collector.tokens, []
+        for token in tokens:
+            yield token
+    collector.close()
+    for token in collector.tokens:
+        yield token
+
+
+def html5lib_stream(text):
+    p = html5lib.HTMLParser(tree=treebuilders.getTreeBuilder("dom"))
+    dom_tree = p.parse(text)
+    walker = treewalkers.getTreeWalker("dom")
+    return walker(dom_tree)
+
+
+def parse_page(text, match, found=bool):
+    """
+    Runs match over the tokens of text, using html5lib only if the fast parser didn't find anything.
+    """
+    try:
+        result = match(fast_stream(text))
+        if found(result):
+            return result
+    except Exception:
+        pass
+
+    return match(html5lib_stream(text))
+
+
 class SubsceneSubtitleService:
     def __init__(self, domain_name_):
         if domain_name_ is not "":
@@ -16,7 +127,46 @@ class SubsceneSubtitleService:
         else:
             self.domain_name = "https://www.subscene.com"
 
-        self.cf_requests = cloudscraper2.create_scraper()
+        self._local = threading.local()
+        self._host_slots = threading.BoundedSemaphore(MAX_CONNECTIONS)
+        self._executor = None
+        self._prefetched = {}
+
+    @property
+    def cf_requests(self):
+        # one scraper (and keep-alive pool) per thread, as sessions can't be shared between threads
+        scraper = getattr(self._local, "scraper", None)
+        if scraper is None:
+            scraper = self._local.scraper = cloudscraper2.create_scraper()
+        return scraper
+
+    def _get(self, url):
+        with self._host_slots:
+            return self.cf_requests.get(url)
+
+    def _post(self, url, data):
+        with self._host_slots:
+            return self.cf_requests.post(url, data=data)
+
+    def PrefetchSubtitles(self, urls):
+        """
+        Starts enumerating the subtitles of the first PREFETCH_LIMIT candidate pages in parallel, EnumSubtitles picks
+        up the results.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=MAX_CONNECTIONS)
+
+        for url in urls[:PREFETCH_LIMIT]:
+            if url not in self._prefetched:
+                self._prefetched[url] = self._executor.submit(self._enum_subtitles, url)
+
+    def CancelPrefetch(self):
+        for future in self._prefetched.values():
+            future.cancel()
+        self._prefetched = {}
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     def search_title_match(self, stream):
         results = {
@@ -93,12 +243,16 @@ class SubsceneSubtitleService:
         return results
 
     def EnumSubtitles(self, url):
-        r = self.cf_requests.get(url)
-        p = html5lib.HTMLParser(tree=treebuilders.getTreeBuilder("dom"))
-        dom_tree = p.parse(r.text)
-        walker = treewalkers.getTreeWalker("dom")
-        stream = walker(dom_tree)
+        future = self._prefetched.pop(url, None)
+        if future is not None and not future.cancelled():
+            return future.result()
+        return self._enum_subtitles(url)
 
+    def _enum_subtitles(self, url):
+        r = self._get(url)
+        return parse_page(r.text, self.subtitles_match)
+
+    def subtitles_match(self, stream):
         result = []
         state = 0
         href = ""
@@ -185,17 +339,12 @@ class SubsceneSubtitleService:
 
     def SearchMovie(self, title, year):
         try:
-            r = self.cf_requests.post(self.domain_name + "/subtitles/searchbytitle", data={"query": title, "l": ""})
+            r = self._post(self.domain_name + "/subtitles/searchbytitle", data={"query": title, "l": ""})
             text = r.text
         except:
             text = ""
 
-        p = html5lib.HTMLParser(tree=treebuilders.getTreeBuilder("dom"))
-        dom_tree = p.parse(text)
-        walker = treewalkers.getTreeWalker("dom")
-        stream = walker(dom_tree)
-
-        return self.search_title_match(stream)
+        return parse_page(text, self.search_title_match, found=lambda results: any(results.values()))
 
 
         # TODO: We are currently ignoring tv-series, thats to be handled later.
@@ -203,12 +352,20 @@ class SubsceneSubtitleService:
 
 
     def DownloadSubtitle(self, link):
-        r = self.cf_requests.get(self.domain_name + link)
-        p = html5lib.HTMLParser(tree=treebuilders.getTreeBuilder("dom"))
-        dom_tree = p.parse(r.text)
-        walker = treewalkers.getTreeWalker("dom")
-        stream = walker(dom_tree)
-       
+        r = self._get(self.domain_name + link)
+        href = parse_page(r.text, self.download_link_match)
+
+        if href == "":
+            return None
+        
+        r = self._get(self.domain_name + href)
+        d = r.headers['content-disposition']
+        fname = re.findall("filename=(.+)", d)
+        if len(fname) > 0:
+            return (fname[0], r.content)
+        return None
+
+    def download_link_match(self, stream):
         href = ""
         state = 0
         for token in stream:
@@ -230,12 +387,4 @@ class SubsceneSubtitleService:
             elif state == 99:
                 break
 
-        if href == "":
-            return None
-        
-        r = self.cf_requests.get(self.domain_name + href)
-        d = r.headers['content-disposition']
-        fname = re.findall("filename=(.+)", d)
-        if len(fname) > 0:
-            return (fname[0], r.content)
-        return None
+        return href
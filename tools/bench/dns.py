@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark of the DNS cache of plexnet.http, run headless through the xbmc shims in shims/ with a counting
+resolver in place of the system's getaddrinfo that takes the configured time per lookup. Names under BENCH_DOMAIN
+resolve to the loopback address, so an in-process PMS stand-in (pms.py) can be reached through them.
+
+Checks:
+  - repeated lookups of a name ask the resolver once, until the entry expires or is invalidated
+  - concurrent lookups of a name ask the resolver once and all get its answer
+  - names that don't exist are cached for the negative TTL, temporary failures aren't cached
+  - plex.direct names are resolved from the name itself, without asking the resolver
+  - requests to the stand-in through a name ask the resolver once
+
+Then times --lookups lookups through socket.getaddrinfo with and without the cache.
+
+usage: dns.py [--lookups 100] [--delay 20] [--threads 8] [--addon omega/script.plexmod]
+"""
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+
+import pms
+import run as bench
+
+BENCH_DOMAIN = '.bench.test'
+MISSING = 'missing' + BENCH_DOMAIN
+FLAKY = 'flaky' + BENCH_DOMAIN
+
+
+class CountingResolver(object):
+    """
+    Replaces the resolver of plexnet.http.DNS_CACHE; counts the lookups per name, resolves BENCH_DOMAIN to the loopback
+    address, fails MISSING as not existing and FLAKY as temporarily unresolvable
+    """
+    def __init__(self, cache, delay):
+        self.cache = cache
+        self.orig = cache.resolve
+        self.delay = delay
+        self.lookups = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.cache.resolve = self
+        self.cache.clear()
+        return self
+
+    def __exit__(self, *exc):
+        self.cache.resolve = self.orig
+        self.cache.clear()
+
+    def reset(self):
+        self.lookups = {}
+        self.cache.clear()
+
+    def count(self, host=None):
+        return host is None and sum(self.lookups.values()) or self.lookups.get(host, 0)
+
+    def __call__(self, host, port, *args, **kwargs):
+        with self._lock:
+            self.lookups[host] = self.lookups.get(host, 0) + 1
+        time.sleep(self.delay)
+        if host == MISSING:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        if host == FLAKY:
+            raise socket.gaierror(socket.EAI_AGAIN, 'Temporary failure in name resolution')
+        if host.endswith(BENCH_DOMAIN):
+            host = '127.0.0.1'
+        return self.orig(host, port, *args, **kwargs)
+
+
+class Checks(object):
+    def __init__(self):
+        self.failed = 0
+
+    def __call__(self, ok, what):
+        self.failed += not ok
+        print('{0}: {1}'.format(ok and 'OK' or 'FAIL', what))
+
+
+def failures(host, times):
+    errors = []
+    for _ in range(times):
+        try:
+            socket.getaddrinfo(host, 32400)
+        except socket.gaierror as e:
+            errors.append(e.args[0])
+    return errors
+
+
+def concurrent(host, threads):
+    results = []
+    workers = [threading.Thread(target=lambda: results.append(socket.getaddrinfo(host, 32400)))
+               for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+
+def checkCache(check, resolver, http, threads):
+    host = 'pms' + BENCH_DOMAIN
+    first = socket.getaddrinfo(host, 32400)
+    again = [socket.getaddrinfo(host, 32400) for _ in range(9)]
+    check(resolver.count(host) == 1 and all(r == first for r in again),
+          'repeated lookups ask the resolver {0} time(s)'.format(resolver.count(host)))
+
+    http.invalidateHost('http://{0}:32400/library/sections'.format(host))
+    socket.getaddrinfo(host, 32400)
+    check(resolver.count(host) == 2, 'invalidateHost drops the entry')
+
+    ttl, http.DNS_CACHE.ttl = http.DNS_CACHE.ttl, 0
+    try:
+        socket.getaddrinfo('expiring' + BENCH_DOMAIN, 32400)
+        socket.getaddrinfo('expiring' + BENCH_DOMAIN, 32400)
+    finally:
+        http.DNS_CACHE.ttl = ttl
+    check(resolver.count('expiring' + BENCH_DOMAIN) == 2, 'expired entries are looked up again')
+
+    results = concurrent('concurrent' + BENCH_DOMAIN, threads)
+    check(resolver.count('concurrent' + BENCH_DOMAIN) == 1 and len(results) == threads and
+          all(r == results[0] for r in results),
+          '{0} concurrent lookups ask the resolver {1} time(s)'.format(threads,
+                                                                       resolver.count('concurrent' + BENCH_DOMAIN)))
+
+    errors = failures(MISSING, 5)
+    check(resolver.count(MISSING) == 1 and errors == [socket.EAI_NONAME] * 5,
+          'a name that does not exist is cached')
+    errors = failures(FLAKY, 5)
+    check(resolver.count(FLAKY) == 5 and errors == [socket.EAI_AGAIN] * 5, 'temporary failures are not cached')
+
+    pd = '192-168-1-10.0123456789abcdef0123456789abcdef.plex.direct'
+    result = socket.getaddrinfo(pd, 32400)
+    check(resolver.count(pd) == 0 and result[0][4] == ('192.168.1.10', 32400),
+          'plex.direct names are resolved without the resolver')
+
+
+def checkRequests(check, resolver, requests):
+    stand_in = pms.PMS(pms.Library(10, 1)).start()
+    try:
+        host = 'server' + BENCH_DOMAIN
+        server = bench.connect('http://{0}:{1}'.format(host, stand_in.port))
+        for _ in range(requests):
+            # a fresh connection per request, so every one of them resolves the name
+            server.query('/library/sections')
+            server.close()
+        check(resolver.count(host) == 1, '{0} requests through a name ask the resolver {1} time(s)'
+              .format(requests, resolver.count(host)))
+    finally:
+        stand_in.stop()
+
+
+def timed(hosts):
+    start = time.perf_counter()
+    for host in hosts:
+        socket.getaddrinfo(host, 32400)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--lookups', type=int, default=100, help='lookups timed with and without the cache')
+    parser.add_argument('--delay', type=float, default=20, help='time per resolver lookup, in ms')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent lookups of the same name')
+    parser.add_argument('--addon', default=os.path.join(bench.ROOT, 'omega', 'script.plexmod'))
+    args = parser.parse_args()
+
+    bench.setup(os.path.abspath(args.addon))
+    from plexnet import http
+
+    check = Checks()
+    with CountingResolver(http.DNS_CACHE, args.delay / 1000.0) as resolver:
+        checkCache(check, resolver, http, args.threads)
+        resolver.reset()
+        checkRequests(check, resolver, 5)
+
+        # the few servers a session talks to, looked up over and over
+        hosts = ['server{0}{1}'.format(i % 4, BENCH_DOMAIN) for i in range(args.lookups)]
+        resolver.reset()
+        ttl, http.DNS_CACHE.ttl = http.DNS_CACHE.ttl, 0
+        try:
+            uncached = timed(hosts), resolver.count()
+        finally:
+            http.DNS_CACHE.ttl = ttl
+        resolver.reset()
+        cached = timed(hosts), resolver.count()
+
+    print('{0} lookups of 4 names, {1} ms per resolver lookup'.format(args.lookups, args.delay))
+    for name, (elapsed, lookups) in (('uncached', uncached), ('cached', cached)):
+        print('{0:>9}: {1:7.1f} ms, {2} resolver lookup(s)'.format(name, elapsed * 1000, lookups))
+    sys.exit(check.failed and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Check and benchmark of the batched JSON-RPC calls of lib.kodijsonrpc, run headless through the xbmc shims in shims/
+with a counting xbmc.executeJSONRPC that takes the configured time per round-trip.
+
+Checks:
+  - KodiCacheManager reads and writes the file cache settings in one round-trip each
+  - a batch returns the same results as the calls made one by one, whatever order the answers come in
+  - an errored call raises JSONRPCMethod.Exception from its result() only, the other calls of the batch succeed
+
+Then times --calls Settings.GetSettingValue calls made one by one against a single batch.
+
+usage: jsonrpc.py [--calls 10] [--delay 5] [--addon omega/script.plexmod]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import run as bench
+
+SETTINGS = ('filecache.memorysize', 'filecache.readfactor', 'locale.language', 'locale.timeformat',
+            'locale.shortdateformat', 'videoplayer.adjustrefreshrate', 'subtitles.align', 'audiooutput.channels',
+            'audiooutput.passthrough', 'lookandfeel.skin')
+
+
+class CountingRPC(object):
+    """
+    Replaces xbmc.executeJSONRPC; counts the round-trips and the calls in them, answers batches in reverse order and
+    errors calls of FAILING
+    """
+    FAILING = 'Bench.Fail'
+
+    def __init__(self, xbmc, delay):
+        self.xbmc = xbmc
+        self.orig = xbmc.executeJSONRPC
+        self.delay = delay
+        self.roundTrips = 0
+        self.calls = 0
+
+    def __enter__(self):
+        self.xbmc.executeJSONRPC = self
+        return self
+
+    def __exit__(self, *exc):
+        self.xbmc.executeJSONRPC = self.orig
+
+    def reset(self):
+        self.roundTrips = self.calls = 0
+
+    def answer(self, request):
+        if request.get('method') == self.FAILING:
+            return {'id': request.get('id'), 'jsonrpc': '2.0', 'error': {'code': -32601, 'message': 'Method not found'}}
+        return json.loads(self.orig(json.dumps(request)))
+
+    def __call__(self, data):
+        self.roundTrips += 1
+        time.sleep(self.delay)
+        request = json.loads(data)
+        if isinstance(request, list):
+            self.calls += len(request)
+            return json.dumps([self.answer(r) for r in reversed(request)])
+
+        self.calls += 1
+        return json.dumps(self.answer(request))
+
+
+class Checks(object):
+    def __init__(self):
+        self.failed = 0
+
+    def __call__(self, ok, what):
+        self.failed += not ok
+        print('{0}: {1}'.format(ok and 'OK' or 'FAIL', what))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--calls', type=int, default=10, help='calls timed one by one and as a batch')
+    parser.add_argument('--delay', type=float, default=5, help='time per executeJSONRPC round-trip, in ms')
+    parser.add_argument('--addon', default=os.path.join(bench.ROOT, 'omega', 'script.plexmod'))
+    args = parser.parse_args()
+
+    bench.setup(os.path.abspath(args.addon))
+    import xbmc
+    from lib import kodijsonrpc
+    from lib.kodijsonrpc import rpc
+
+    check = Checks()
+    with CountingRPC(xbmc, args.delay / 1000.0) as counter:
+        from lib import cache
+        counter.reset()
+        kcm = cache.KodiCacheManager()
+        check(counter.roundTrips == 1 and counter.calls == 2 and kcm.memorySize == 128 and kcm.readFactor == 4,
+              'KodiCacheManager reads both settings in {0} round-trip(s)'.format(counter.roundTrips))
+        counter.reset()
+        kcm.write(memorySize=256, readFactor=5)
+        check(counter.roundTrips == 1 and counter.calls == 2 and xbmc.SETTINGS['filecache.memorysize'] == 256 and
+              xbmc.SETTINGS['filecache.readfactor'] == 500,
+              'KodiCacheManager.write sets both settings in {0} round-trip(s)'.format(counter.roundTrips))
+
+        single = [rpc.Settings.GetSettingValue(setting=s) for s in SETTINGS]
+        with rpc.batch() as batch:
+            results = [batch.Settings.GetSettingValue(setting=s) for s in SETTINGS]
+        check([r.result() for r in results] == single, 'batch results match the single calls')
+
+        with rpc.batch() as batch:
+            before = batch.Settings.GetSettingValue(setting='lookandfeel.skin')
+            failing = batch.Bench.Fail()
+            after = batch.Settings.GetSettingValue(setting='locale.language')
+        try:
+            failing.result()
+            raised = False
+        except kodijsonrpc.JSONRPCMethod.Exception:
+            raised = True
+        check(raised and before.result()['value'] == 'skin.estuary' and after.result()['value'].startswith('resource'),
+              'an errored call only fails its own result')
+
+        settings = (SETTINGS * (args.calls // len(SETTINGS) + 1))[:args.calls]
+        counter.reset()
+        start = time.perf_counter()
+        for s in settings:
+            rpc.Settings.GetSettingValue(setting=s)
+        oneByOne = time.perf_counter() - start, counter.roundTrips
+
+        counter.reset()
+        start = time.perf_counter()
+        with rpc.batch() as batch:
+            for s in settings:
+                batch.Settings.GetSettingValue(setting=s)
+        batched = time.perf_counter() - start, counter.roundTrips
+
+    print('{0} calls, {1} ms per round-trip'.format(args.calls, args.delay))
+    for name, (elapsed, roundTrips) in (('one by one', oneByOne), ('batched', batched)):
+        print('{0:>11}: {1:7.1f} ms, {2} round-trip(s)'.format(name, elapsed * 1000, roundTrips))
+    sys.exit(check.failed and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
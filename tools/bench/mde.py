@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of MediaDecisionEngine.chooseMedia on synthetic multi-version movies, run headless through the xbmc
+shims in shims/ against an in-process PMS stand-in (pms.py), which only provides the server.
+
+A play queue's items are built with a few versions each, drawn from a small set of encoding profiles, and every item's
+media is chosen:
+  - uncached: the decision cache is cleared before every item
+  - cached: the decision cache is kept, as it is across a play queue
+
+It also compares the single composite sort key of sortChoices with the chained stable sorts it replaced, and checks
+that both rank the choices the same.
+
+usage: mde.py [--items 2000] [--versions 3] [--profiles 6] [--repeat 3] [--addon omega/script.plexmod]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+import pms
+import run as bench
+
+# height, width, video codec, bitrate, audio codec, channels, container
+PROFILES = (
+    (2160, 3840, 'hevc', 40000, 'eac3', 6, 'mkv'),
+    (2160, 3840, 'hevc', 20000, 'truehd', 8, 'mkv'),
+    (1080, 1920, 'h264', 10000, 'ac3', 6, 'mkv'),
+    (1080, 1920, 'hevc', 6000, 'aac', 2, 'mp4'),
+    (720, 1280, 'h264', 4000, 'aac', 2, 'mp4'),
+    (576, 720, 'mpeg2video', 5000, 'ac3', 6, 'mkv'),
+    (1080, 1920, 'vc1', 18000, 'dca', 6, 'mkv'),
+    (480, 640, 'h264', 1500, 'mp3', 2, 'avi'),
+)
+
+MEDIA = ('<Media id="{id}" duration="6000000" bitrate="{bitrate}" width="{width}" height="{height}" '
+         'audioChannels="{channels}" audioCodec="{acodec}" videoCodec="{vcodec}" videoResolution="{res}" '
+         'container="{container}">'
+         '<Part id="{id}" key="/library/parts/{id}/1/file.{container}" duration="6000000" '
+         'file="/media/{id}.{container}" size="6623000000" container="{container}">'
+         '<Stream id="{id}1" streamType="1" default="1" codec="{vcodec}" index="0" bitrate="{bitrate}" '
+         'height="{height}" width="{width}" />'
+         '<Stream id="{id}2" streamType="2" selected="1" default="1" codec="{acodec}" index="1" '
+         'channels="{channels}" language="English" languageCode="eng" />'
+         '<Stream id="{id}3" streamType="3" codec="srt" index="2" language="English" languageCode="eng" />'
+         '</Part></Media>')
+
+
+def buildItems(server, count, versions, profiles, seed=1):
+    from xml.etree import ElementTree
+    from plexnet import plexobjects
+
+    rnd = random.Random(seed)
+    videos = []
+    for i in range(count):
+        rk = 1000000 + i
+        media = ''.join(MEDIA.format(id=rk * 10 + v, height=p[0], width=p[1], vcodec=p[2], bitrate=p[3], acodec=p[4],
+                                     channels=p[5], container=p[6], res=p[0] >= 2160 and '4k' or p[0])
+                        for v, p in enumerate(rnd.sample(PROFILES[:profiles], versions)))
+        videos.append('<Video type="movie" ratingKey="{0}" key="/library/metadata/{0}" title="Movie {0}" '
+                      'librarySectionID="1">{1}</Video>'.format(rk, media))
+
+    # a play queue response carrying all of them
+    data = ElementTree.fromstring(pms.container(''.join(videos), size=count, playQueueID=1, librarySectionID=1,
+                                                identifier='com.plexapp.plugins.library'))
+    return plexobjects.listItems(server, '/playQueues/1', data=data)
+
+
+def chained(engine, choices):
+    # sortChoices before the composite key
+    engine.sort(choices, "bitrate")
+    engine.sort(choices, "audioChannels")
+    engine.sort(choices, "audioDS")
+    engine.sort(choices, "resolution")
+    engine.sort(choices, "videoDS")
+    engine.sort(choices, "isDirectPlayable")
+    engine.sort(choices, engine.higherResIfCapable)
+    engine.sort(choices, engine.cloudIfRemote)
+    return choices
+
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--items', type=int, default=2000, help='items of the play queue')
+    parser.add_argument('--versions', type=int, default=3, help='versions (media) per item')
+    parser.add_argument('--profiles', type=int, default=6, help='encoding profiles the versions are drawn from')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the fastest one is reported')
+    parser.add_argument('--addon', default=os.path.join(bench.ROOT, 'omega', 'script.plexmod'))
+    args = parser.parse_args()
+    args.profiles = max(args.versions, min(args.profiles, len(PROFILES)))
+
+    bench.setup(os.path.abspath(args.addon))
+    from plexnet import mediadecisionengine
+
+    stand_in = pms.PMS(pms.Library(1, 1)).start()
+    try:
+        server = bench.connect(stand_in.address)
+        items = buildItems(server, args.items, args.versions, args.profiles)
+        engine = mediadecisionengine.MediaDecisionEngine()
+        cache = mediadecisionengine.DECISION_CACHE
+
+        def uncached():
+            for item in items:
+                cache.invalidate()
+                engine.chooseMedia(item, forceUpdate=True)
+
+        def cached():
+            for item in items:
+                engine.chooseMedia(item, forceUpdate=True)
+
+        results = [('uncached', timed(uncached, args.repeat))]
+        cache.invalidate()
+        cache.hits = cache.misses = 0
+        results.append(('cached', timed(cached, args.repeat)))
+        hits, misses = cache.hits, cache.misses
+
+        choices = [[engine.evaluateMediaVideo(item, media) for media in item.media] for item in items]
+        results.append(('sort chained', timed(lambda: [chained(engine, list(c)) for c in choices], args.repeat)))
+        results.append(('sort composite', timed(lambda: [engine.sortChoices(list(c)) for c in choices], args.repeat)))
+        same = all([id(c) for c in chained(engine, list(cs))] == [id(c) for c in engine.sortChoices(list(cs))]
+                   for cs in choices)
+        server.close()
+    finally:
+        stand_in.stop()
+
+    print('{0} items, {1} versions each out of {2} profiles'.format(args.items, args.versions, args.profiles))
+    for name, elapsed in results:
+        print('{0:>15}: {1:8.1f} ms, {2:7.1f} us/item'.format(name, elapsed * 1000, elapsed / args.items * 1e6))
+    print('{0:>15}: {1} hits, {2} misses'.format('decision cache', hits, misses))
+    print('{0:>15}: {1}'.format('same ranking', same and 'yes' or 'NO'))
+    sys.exit(not same and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
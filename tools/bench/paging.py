@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the page prefetch of lib.windows.pagination.MCLPaginator, run headless through the xbmc shims in shims/
+against an in-process PMS stand-in (pms.py) answering with the configured latency.
+
+A paginator over the stand-in's movie section is scrolled right from the first to the last item and back, one move
+per --dwell ms, the way the episodes window drives it: a move checks boundaryHit and paginates when the boundary item is
+selected. Measured is the time paginate() blocks on a boundary, with prefetching disabled and with the paginator's
+default prefetch distance. Both have to show every item of the section in order both ways and fetch every page once
+per page turn; the first turn against the direction of travel isn't prefetched.
+
+usage: paging.py [--items 200] [--latency 100] [--jitter 10] [--dwell 100] [--addon omega/script.plexmod]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pms
+import run as bench
+
+
+class ListControl(object):
+    """
+    The parts of kodigui.ManagedControlList the paginator uses
+    """
+    def __init__(self):
+        self.items = []
+        self.pos = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def size(self):
+        return len(self.items)
+
+    def replaceItems(self, items):
+        self.items = items
+        self.pos = 0
+
+    def selectItem(self, pos):
+        self.pos = min(pos, len(self.items) - 1)
+
+    def getSelectedPos(self):
+        return self.pos
+
+    def getSelectedItem(self):
+        return self.items and self.items[self.pos] or None
+
+
+class Window(object):
+    initialized = True
+
+
+def scroll(section, leafCount, dwell, prefetchDistance):
+    """
+    Returns the time paginate() blocked on every boundary, the rating keys of the items shown, in order, and the number
+    of pages fetched, scrolling to the last item and back to the first
+    """
+    from lib.windows import kodigui, pagination
+
+    class Paginator(pagination.MCLPaginator):
+        fetches = 0
+
+        def getData(self, offset, amount):
+            self.fetches += 1
+            return section.all(offset, amount)
+
+        def createListItem(self, data):
+            return kodigui.ManagedListItem(data.title, data_source=data)
+
+    control = ListControl()
+    paginator = Paginator(control, Window(), leaf_count=leafCount, prefetch_distance=prefetchDistance)
+    paginator.paginate()
+
+    blocked = []
+    shown = [control.getSelectedItem().dataSource.ratingKey]
+    for step, last in ((1, lambda: control.getSelectedItem().getProperty('last.item')),
+                       (-1, lambda: not paginator.offset and not control.pos)):
+        while not last():
+            time.sleep(dwell)
+            control.selectItem(control.pos + step)
+            if paginator.boundaryHit:
+                start = time.perf_counter()
+                paginator.paginate()
+                blocked.append(time.perf_counter() - start)
+            shown.append(control.getSelectedItem().dataSource.ratingKey)
+
+    paginator.cancelPrefetch()
+    return blocked, shown, paginator.fetches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--items', type=int, default=200, help='items of the section scrolled through')
+    parser.add_argument('--latency', type=float, default=100, help='stand-in response latency, in ms')
+    parser.add_argument('--jitter', type=float, default=10, help='+/- random part of the latency, in ms')
+    parser.add_argument('--dwell', type=float, default=100, help='time between two moves, in ms')
+    parser.add_argument('--addon', default=os.path.join(bench.ROOT, 'omega', 'script.plexmod'))
+    args = parser.parse_args()
+
+    bench.setup(os.path.abspath(args.addon))
+    from lib.windows import pagination
+
+    stand_in = pms.PMS(pms.Library(args.items, 1), latency=args.latency, jitter=args.jitter).start()
+    results = []
+    try:
+        server = bench.connect(stand_in.address)
+        section = [s for s in server.library.sections() if s.TYPE == 'movie'][0]
+        expected = [item.ratingKey for item in section.all(0, args.items)]
+        expected += expected[-2::-1]
+        for name, distance in (('no prefetch', 0), ('prefetch', pagination.MCLPaginator.prefetchDistance)):
+            blocked, shown, fetches = scroll(section, args.items, args.dwell / 1000.0, distance)
+            # the initial page and one per boundary
+            results.append((name, blocked, shown == expected, fetches, fetches == len(blocked) + 1))
+        server.close()
+    finally:
+        stand_in.stop()
+
+    print('{0} items, latency {1}+/-{2} ms, {3} ms per move'.format(args.items, args.latency, args.jitter, args.dwell))
+    failed = 0
+    for name, blocked, complete, fetches, once in results:
+        ordered = sorted(blocked)
+        print('{0:>11}: {1} page turns, blocked {2:6.1f} ms median, {3:6.1f} ms max, {4:7.1f} ms total'
+              .format(name, len(blocked), ordered[len(ordered) // 2] * 1000, ordered[-1] * 1000, sum(blocked) * 1000))
+        print('{0:>11}  {1} fetches, one per page turn: {2}, all items shown: {3}'
+              .format('', fetches, once and 'yes' or 'NO', complete and 'yes' or 'NO'))
+        failed += not (complete and once)
+    sys.exit(failed and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
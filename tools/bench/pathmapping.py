@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of lib.path_mapping, run headless through the xbmc shims in shims/.
+
+For a synthetic set of path mappings (nested library roots, some of them in Windows notation) it times mapping a
+list of PMS file paths:
+  - linear: the scan over all mappings of a server the manager did before PathTrie
+  - trie: PathMappingManager.getMappedPathFor
+and checks that both map every path to the same mapping.
+
+It also times PathMappingManager.exists for files spread over a few folders of a scratch directory against probing
+every file with xbmcvfs.exists, counting the calls that reach the share and taking --delay for each of them.
+
+usage: pathmapping.py [--mappings 200] [--paths 20000] [--files 2000] [--folders 20] [--delay 2]
+                      [--addon omega/script.plexmod]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import run as bench
+
+SERVER = 'Bench PMS'
+
+
+class Server(object):
+    name = SERVER
+
+
+def linear(pathMap, path, server):
+    # PathMappingManager.getMappedPathFor before PathTrie
+    match = ("", "")
+    for map_path, pms_path in pathMap.get(server.name, {}).items():
+        if path.startswith(pms_path) and len(pms_path) > len(match[1]):
+            match = (map_path, pms_path)
+    if all(match):
+        return match
+    return None, None
+
+
+def buildMappings(count, rnd):
+    mappings = {}
+    roots = []
+    while len(mappings) < count:
+        if roots and rnd.random() < .4:
+            # a mapping below an existing one, which has to win for its paths
+            parent = rnd.choice(roots)
+            sep = '\\' in parent and '\\' or '/'
+            pms_path = '{0}sub{1}{2}'.format(parent, len(mappings), sep)
+        elif rnd.random() < .2:
+            pms_path = 'D:\\Media{0}\\Movies\\'.format(len(mappings))
+        else:
+            pms_path = '/mnt/disk{0}/{1}/'.format(len(mappings), rnd.choice(('movies', 'tv', 'music')))
+        roots.append(pms_path)
+        mappings['smb://nas/share{0}/'.format(len(mappings))] = pms_path
+    return mappings
+
+
+def buildPaths(mappings, count, rnd):
+    targets = list(mappings.values())
+    paths = []
+    for i in range(count):
+        if rnd.random() < .1:
+            paths.append('/srv/unmapped/Movie {0}/Movie {0}.mkv'.format(i))
+            continue
+        base = rnd.choice(targets)
+        sep = '\\' in base and '\\' or '/'
+        paths.append('{0}Movie {1} ({2}){3}Movie {1}.mkv'.format(base, i, 1950 + i % 70, sep))
+    return paths
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class CountingVFS(object):
+    """
+    Counts the xbmcvfs.listdir and xbmcvfs.exists calls of lib.path_mapping, each taking the round-trip time of a share
+    """
+    def __init__(self, module, delay):
+        self.module = module
+        self.vfs = module.xbmcvfs
+        self.delay = delay
+        self.calls = 0
+
+    def __enter__(self):
+        self.module.xbmcvfs = self
+        return self
+
+    def __exit__(self, *exc):
+        self.module.xbmcvfs = self.vfs
+
+    def listdir(self, path):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.vfs.listdir(path)
+
+    def exists(self, path):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.vfs.exists(path)
+
+
+def benchExists(path_mapping, files, folders, delay, rnd):
+    scratch = tempfile.mkdtemp(prefix='plexmod-bench-pm-')
+    try:
+        paths = []
+        for f in range(folders):
+            folder = os.path.join(scratch, 'Show {0}'.format(f))
+            os.mkdir(folder)
+            for i in range(files // folders):
+                name = 'S01E{0:02d}.mkv'.format(i)
+                open(os.path.join(folder, name), 'w').close()
+                paths.append(os.path.join(folder, name))
+        # files the listing doesn't have
+        paths += [os.path.join(scratch, 'Show {0}'.format(f), 'missing.mkv') for f in range(folders)]
+        rnd.shuffle(paths)
+        expected = [os.path.exists(p) for p in paths]
+
+        manager = path_mapping.PathMappingManager()
+        with CountingVFS(path_mapping, delay) as vfs:
+            start = time.perf_counter()
+            probed = [vfs.exists(p) for p in paths]
+            direct = time.perf_counter() - start, vfs.calls
+
+            vfs.calls = 0
+            start = time.perf_counter()
+            cached = [manager.exists(p) for p in paths]
+            listed = time.perf_counter() - start, vfs.calls
+        return probed == expected and cached == expected, direct, listed
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--mappings', type=int, default=200, help='path mappings of the server')
+    parser.add_argument('--paths', type=int, default=20000, help='PMS file paths mapped')
+    parser.add_argument('--files', type=int, default=2000, help='files checked for existence')
+    parser.add_argument('--folders', type=int, default=20, help='folders the files are spread over')
+    parser.add_argument('--delay', type=float, default=2, help='round-trip time of a call to the share, in ms')
+    parser.add_argument('--addon', default=os.path.join(bench.ROOT, 'omega', 'script.plexmod'))
+    args = parser.parse_args()
+
+    bench.setup(os.path.abspath(args.addon))
+    from lib import path_mapping
+
+    rnd = random.Random(1)
+    mappings = buildMappings(args.mappings, rnd)
+    paths = buildPaths(mappings, args.paths, rnd)
+    server = Server()
+
+    manager = path_mapping.PathMappingManager()
+    manager.PATH_MAP = {SERVER: mappings}
+    same = [linear(manager.PATH_MAP, p, server) for p in paths] == [manager.getMappedPathFor(p, server)
+                                                                      for p in paths]
+    results = [
+        ('linear', timed(lambda: [linear(manager.PATH_MAP, p, server) for p in paths])),
+        ('trie', timed(lambda: [manager.getMappedPathFor(p, server) for p in paths])),
+    ]
+    existsOK, direct, cached = benchExists(path_mapping, args.files, args.folders, args.delay / 1000.0, rnd)
+
+    print('{0} paths, {1} mappings'.format(args.paths, args.mappings))
+    for name, elapsed in results:
+        print('{0:>14}: {1:8.1f} ms, {2:6.2f} us/path'.format(name, elapsed * 1000, elapsed / args.paths * 1e6))
+    print('{0:>14}: {1}'.format('same mappings', same and 'yes' or 'NO'))
+    print('{0} files in {1} folders, {2} ms per call to the share'.format(args.files, args.folders, args.delay))
+    for name, (elapsed, calls) in (('xbmcvfs.exists', direct), ('cached exists', cached)):
+        print('{0:>14}: {1:8.1f} ms, {2} call(s) to the share'.format(name, elapsed * 1000, calls))
+    print('{0:>14}: {1}'.format('same results', existsOK and 'yes' or 'NO'))
+    sys.exit(not (same and existsOK) and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
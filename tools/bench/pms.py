@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+Plex Media Server stand-in serving synthetic XML, for benchmarking plexnet without a real server.
+
+Serves the root, /library/sections (listings paged by X-Plex-Container-Start/Size, firstCharacter, both optionally
+unwatched only), /hubs, /library/metadata, /playQueues, /:/timeline and /:/(un)scrobble for a movie and a TV show
+section of configurable sizes. Every response is delayed by the configured latency plus a random jitter.
+
+usage: pms.py [--port 0] [--movies 10000] [--shows 1000] [--latency 0] [--jitter 0] [--seed 1]
+
+Prints "listening on <port>" once it accepts connections.
+"""
+import argparse
+import random
+import re
+import socket
+import sys
+import threading
+import time
+import unicodedata
+from xml.sax.saxutils import quoteattr
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import urlsplit, parse_qsl, unquote
+except ImportError:
+    sys.exit('pms.py needs Python 3.7+')
+
+MACHINE_ID = 'b3nchb3nchb3nchb3nchb3nchb3nchb3nchb3nc'
+VERSION = '1.41.0.8994-f2c27da23'
+HUB_SIZE = 20
+# items around the selected one a play queue response carries
+PLAY_QUEUE_WINDOW = 50
+ARTICLES = ('The ', 'A ', 'An ')
+
+WORDS = ('Alpha', 'Bright', 'Crimson', 'Dark', 'Echo', 'Falling', 'Golden', 'Hidden', 'Iron', 'Jade', 'Kingdom',
+         'Last', 'Midnight', 'Night', 'Ocean', 'Paper', 'Quiet', 'River', 'Silent', 'Tiger', 'Under', 'Velvet',
+         'Winter', 'Xenon', 'Yellow', 'Zero', 'Émilie', 'Örnek', '12', '1984', 'Ángel', 'Über', 'Sky', 'Storm',
+         'Moon', 'Fire', 'Glass', 'House', 'Road', 'City', 'Star', 'Heart', 'Ghost', 'Dream', 'Line', 'Edge')
+
+
+def titleSort(title):
+    for article in ARTICLES:
+        if title.startswith(article):
+            return title[len(article):]
+    return title
+
+
+def sortKey(title):
+    return unicodedata.normalize('NFKD', title).upper()
+
+
+class Section(object):
+    """
+    A library section of synthetic items, kept sorted by titleSort. Items are numbered from 1, the ratingKey of an item
+    is the section's base plus its number.
+    """
+    def __init__(self, id, type_, title, size, rnd):
+        self.id = id
+        self.type = type_
+        self.title = title
+        self.uuid = '{0:08x}-bench-section-{1}'.format(id, type_)
+        self.base = id * 1000000
+        self.now = int(time.time())
+
+        titles = []
+        for i in range(size):
+            title = ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 3)))
+            if rnd.random() < .15:
+                title = rnd.choice(ARTICLES) + title
+            titles.append('{0} {1}'.format(title, i))
+        titles.sort(key=lambda t: sortKey(titleSort(t)))
+        self.titles = titles
+        self.watched = [rnd.random() < .4 for _ in range(size)]
+
+    def __len__(self):
+        return len(self.titles)
+
+    def ratingKey(self, index):
+        return self.base + index + 1
+
+    def index(self, ratingKey):
+        index = ratingKey - self.base - 1
+        if 0 <= index < len(self.titles):
+            return index
+        return None
+
+    def directory(self):
+        agent = self.type == 'movie' and 'tv.plex.agents.movie' or 'tv.plex.agents.series'
+        return ('<Directory allowSync="1" art="/:/resources/{type}-fanart.jpg" composite="/library/sections/{id}/'
+                'composite/1" filters="1" refreshing="0" thumb="/:/resources/{type}.png" key="{id}" type="{type}" '
+                'title="{title}" agent="{agent}" scanner="Plex Scanner" language="en-US" uuid="{uuid}" '
+                'updatedAt="{now}" createdAt="{now}" scannedAt="{now}" content="1" directory="1" '
+                'contentChangedAt="1" hidden="0"><Location id="{id}" path="/media/{title}" /></Directory>'
+                .format(type=self.type, id=self.id, title=self.title, agent=agent, uuid=self.uuid, now=self.now))
+
+    def item(self, index, full=False):
+        if self.type == 'movie':
+            return self.movie(index, full)
+        return self.show(index)
+
+    def _common(self, index):
+        title = self.titles[index]
+        rk = self.ratingKey(index)
+        attrs = ('ratingKey="{rk}" key="/library/metadata/{rk}" guid="plex://bench/{rk}" title={title} '
+                 'titleSort={sort} librarySectionTitle="{section}" librarySectionID="{id}" '
+                 'librarySectionKey="/library/sections/{id}" summary="Synthetic item {rk}." rating="7.{r}" '
+                 'year="{year}" thumb="/library/metadata/{rk}/thumb/{now}" art="/library/metadata/{rk}/art/{now}" '
+                 'addedAt="{added}" updatedAt="{now}"'
+                 .format(rk=rk, title=quoteattr(title), sort=quoteattr(titleSort(title)), section=self.title,
+                         id=self.id, r=rk % 10, year=1950 + rk % 75, now=self.now, added=self.now - rk % 100000))
+        return rk, attrs
+
+    def movie(self, index, full=False):
+        rk, attrs = self._common(index)
+        watched = self.watched[index] and ' viewCount="1" lastViewedAt="{0}"'.format(self.now) or ''
+        streams = ''
+        if full:
+            streams = ('<Stream id="{rk}1" streamType="1" default="1" codec="h264" index="0" bitrate="8000" '
+                       'height="1080" width="1920" frameRate="23.976" profile="high" displayTitle="1080p (H.264)" />'
+                       '<Stream id="{rk}2" streamType="2" selected="1" default="1" codec="ac3" index="1" '
+                       'channels="6" bitrate="640" language="English" languageCode="eng" '
+                       'displayTitle="English (AC3 5.1)" />'
+                       '<Stream id="{rk}3" streamType="2" codec="aac" index="2" channels="2" bitrate="192" '
+                       'language="Deutsch" languageCode="ger" displayTitle="Deutsch (AAC Stereo)" />'
+                       '<Stream id="{rk}4" streamType="3" codec="srt" index="3" language="English" '
+                       'languageCode="eng" displayTitle="English (SRT)" />'
+                       '<Stream id="{rk}5" key="/library/streams/{rk}5" streamType="3" codec="srt" '
+                       'language="Deutsch" languageCode="ger" displayTitle="Deutsch (SRT External)" />'
+                       .format(rk=rk))
+        return ('<Video type="movie" contentRating="PG-13" duration="6000000" {attrs}{watched}>'
+                '<Media id="{rk}" duration="6000000" bitrate="8832" width="1920" height="1080" aspectRatio="1.78" '
+                'audioChannels="6" audioCodec="ac3" videoCodec="h264" videoResolution="1080" container="mkv" '
+                'videoFrameRate="24p" videoProfile="high">'
+                '<Part id="{rk}" key="/library/parts/{rk}/{now}/file.mkv" duration="6000000" '
+                'file="/media/Movies/{rk}.mkv" size="6623000000" container="mkv" videoProfile="high">{streams}'
+                '</Part></Media>'
+                '<Genre tag="Drama" /><Director tag="Bench Director" /><Role tag="Bench Actor" /></Video>'
+                .format(attrs=attrs, watched=watched, rk=rk, now=self.now, streams=streams))
+
+    def show(self, index):
+        rk, attrs = self._common(index)
+        viewed = self.watched[index] and 10 or 0
+        return ('<Directory type="show" contentRating="TV-14" duration="2700000" leafCount="10" '
+                'viewedLeafCount="{viewed}" childCount="1" {attrs}><Genre tag="Drama" /></Directory>'
+                .format(attrs=attrs, viewed=viewed))
+
+    def indexes(self, unwatched=False):
+        if unwatched:
+            return [i for i, watched in enumerate(self.watched) if not watched]
+        return list(range(len(self.titles)))
+
+    def firstCharacters(self, indexes):
+        groups = []
+        for index in indexes:
+            char = sortKey(titleSort(self.titles[index]))[0]
+            if not 'A' <= char <= 'Z':
+                char = '#'
+            if groups and groups[-1][0] == char:
+                groups[-1][1] += 1
+            else:
+                groups.append([char, 1])
+        return groups
+
+
+class Library(object):
+    def __init__(self, movies=10000, shows=1000, seed=1):
+        rnd = random.Random(seed)
+        self.sections = [s for s in (Section(1, 'movie', 'Movies', movies, rnd),
+                                     Section(2, 'show', 'TV Shows', shows, rnd)) if len(s)]
+        self.playQueues = {}
+        self._pqLock = threading.Lock()
+
+    def section(self, id):
+        for section in self.sections:
+            if str(section.id) == id:
+                return section
+        return None
+
+    def byRatingKey(self, ratingKey):
+        for section in self.sections:
+            index = section.index(ratingKey)
+            if index is not None:
+                return section, index
+        return None, None
+
+    def createPlayQueue(self, ratingKeys):
+        with self._pqLock:
+            pqID = len(self.playQueues) + 1
+            self.playQueues[pqID] = ratingKeys
+        return pqID
+
+
+def container(children='', **attrs):
+    attrs = ''.join(' {0}={1}'.format(k, quoteattr(str(v))) for k, v in attrs.items())
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<MediaContainer{0}>{1}</MediaContainer>'.format(attrs, children)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    library = None
+    latency = 0
+    jitter = 0
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        # headers and body are written separately; with Nagle's algorithm the body would wait for the client's
+        # delayed ACK, adding ~40ms to every response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.respond()
+
+    do_POST = do_PUT = do_DELETE = do_GET
+
+    def respond(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0, self.latency + random.uniform(-self.jitter, self.jitter)) / 1000.0)
+
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        # the container window can be given as query parameters or headers
+        for name in ('X-Plex-Container-Start', 'X-Plex-Container-Size'):
+            if name not in params and self.headers.get(name):
+                params[name] = self.headers.get(name)
+
+        body = self.route(url.path.rstrip('/') or '/', params)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml;charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    def route(self, path, params):
+        library = self.library
+        if path == '/':
+            return container(friendlyName='Bench PMS', machineIdentifier=MACHINE_ID, version=VERSION,
+                             platform='Linux', myPlex='1', multiuser='1', allowMediaDeletion='1',
+                             transcoderAudio='1', transcoderVideo='1', transcoderPhoto='1',
+                             transcoderVideoQualities='0,1,2,3,4,5,6,7,8,9,10,11,12', size=0)
+        if path == '/identity':
+            return container(machineIdentifier=MACHINE_ID, version=VERSION, claimed='1', size=0)
+        if path == '/library':
+            return container('<Directory key="sections" title="Library Sections" />', size=1, title1='Plex Library')
+        if path == '/library/sections':
+            return container(''.join(s.directory() for s in library.sections), size=len(library.sections),
+                             title1='Plex Library')
+        if path == '/:/timeline':
+            return container(size=0)
+        if path in ('/:/scrobble', '/:/unscrobble'):
+            section, index = library.byRatingKey(int(params.get('key', 0)))
+            if section is None:
+                return None
+            section.watched[index] = path == '/:/scrobble'
+            return container(size=0)
+        if path in ('/hubs', '/hubs/continueWatching') or path.startswith('/hubs/sections/'):
+            return self.hubs(path, params)
+
+        match = re.match(r'/library/sections/(\d+)/(all|firstCharacter)$', path)
+        if match:
+            section = library.section(match.group(1))
+            if not section:
+                return None
+            indexes = section.indexes('1' in (params.get('unwatched'), params.get('unwatchedLeaves')))
+            if params.get('sort', 'titleSort:asc').endswith(':desc'):
+                indexes.reverse()
+            if match.group(2) == 'firstCharacter':
+                return self.firstCharacter(section, indexes)
+            return self.listing(section, indexes, params)
+
+        match = re.match(r'/library/metadata/(\d+)$', path)
+        if match:
+            section, index = library.byRatingKey(int(match.group(1)))
+            if section is None:
+                return None
+            return container(section.item(index, full=True), size=1, librarySectionID=section.id,
+                             librarySectionTitle=section.title, librarySectionUUID=section.uuid,
+                             identifier='com.plexapp.plugins.library', mediaTagPrefix='/system/bundle/media/flags/')
+
+        match = re.match(r'/playQueues(?:/(\d+))?$', path)
+        if match:
+            return self.playQueue(match.group(1), params)
+
+        return None
+
+    def listing(self, section, indexes, params):
+        total = len(indexes)
+        start = int(params.get('X-Plex-Container-Start', 0))
+        size = int(params.get('X-Plex-Container-Size', total))
+
+        window = indexes[start:start + size]
+        children = ''.join(section.item(i) for i in window)
+        return container(children, size=len(window), totalSize=total, offset=start, allowSync='1',
+                         librarySectionID=section.id, librarySectionTitle=section.title,
+                         librarySectionUUID=section.uuid, identifier='com.plexapp.plugins.library',
+                         mediaTagPrefix='/system/bundle/media/flags/', title1=section.title, title2='All')
+
+    def firstCharacter(self, section, indexes):
+        children = ''.join('<Directory size="{0}" key="{1}" title="{1}" />'.format(count, quoteattr(char)[1:-1])
+                           for char, count in section.firstCharacters(indexes))
+        return container(children, size=children.count('<Directory'), allowSync='0',
+                         librarySectionID=section.id, librarySectionTitle=section.title,
+                         librarySectionUUID=section.uuid, title1=section.title)
+
+    def hubs(self, path, params):
+        count = int(params.get('count', HUB_SIZE))
+        sections = self.library.sections
+        if path.startswith('/hubs/sections/'):
+            sections = [s for s in sections if str(s.id) == path.rsplit('/', 1)[-1]]
+
+        hubs = []
+        for section in sections:
+            for ident, title, offset in (('recentlyAdded', 'Recently Added', 0), ('ondeck', 'On Deck', 7)):
+                if path == '/hubs/continueWatching' and ident != 'ondeck':
+                    continue
+                size = min(count, len(section))
+                items = ''.join(section.item((offset + i * 13) % len(section)) for i in range(size))
+                hubIdent = path == '/hubs/continueWatching' and 'home.continue' or \
+                    '{0}.{1}.{2}'.format(path.startswith('/hubs/sections/') and section.type or 'home', ident,
+                                         section.id)
+                hubs.append('<Hub hubKey="/library/metadata/{keys}" key="/hubs/sections/{id}/{ident}" '
+                            'title="{title}" type="{type}" hubIdentifier="{hubIdent}" context="hub.{ident}" '
+                            'size="{size}" more="{more}" style="shelf" promoted="1">{items}</Hub>'
+                            .format(keys=','.join(str(section.ratingKey(i)) for i in range(size)), id=section.id,
+                                    ident=ident, title='{0} in {1}'.format(title, section.title), type=section.type,
+                                    hubIdent=hubIdent, size=size, more=int(len(section) > size), items=items))
+        return container(''.join(hubs), size=len(hubs), allowSync='0', identifier='com.plexapp.plugins.library')
+
+    def playQueue(self, pqID, params):
+        library = self.library
+        if pqID is None:
+            # library://<uuid>/item/%2Flibrary%2Fmetadata%2F<ratingKey> or
+            # library://<uuid>/directory/%2Flibrary%2Fsections%2F<id>%2Fall?...
+            uri = unquote(params.get('uri', ''))
+            match = re.search(r'/library/metadata/(\d+)', uri)
+            if match:
+                ratingKeys = [int(match.group(1))]
+            else:
+                match = re.search(r'/library/sections/(\d+)', uri)
+                section = match and library.section(match.group(1))
+                if not section:
+                    return None
+                ratingKeys = [section.ratingKey(i) for i in range(len(section))]
+                if params.get('shuffle') == '1':
+                    random.shuffle(ratingKeys)
+            pqID = library.createPlayQueue(ratingKeys)
+        else:
+            pqID = int(pqID)
+
+        ratingKeys = library.playQueues.get(pqID)
+        if not ratingKeys:
+            return None
+
+        items = []
+        for offset, ratingKey in enumerate(ratingKeys[:PLAY_QUEUE_WINDOW]):
+            section, index = library.byRatingKey(ratingKey)
+            items.append(section.item(index, full=True).replace(
+                ' ratingKey=', ' playQueueItemID="{0}" ratingKey='.format(offset + 1), 1))
+
+        section, index = library.byRatingKey(ratingKeys[0])
+        return container(''.join(items), size=len(items), playQueueID=pqID, playQueueSelectedItemID=1,
+                         playQueueSelectedItemOffset=0, playQueueSelectedMetadataItemID=ratingKeys[0],
+                         playQueueShuffled=params.get('shuffle', '0'), playQueueSourceURI=params.get('uri', ''),
+                         playQueueTotalCount=len(ratingKeys), playQueueVersion=1, librarySectionID=section.id,
+                         librarySectionTitle=section.title, librarySectionUUID=section.uuid, allowSeek='1',
+                         allowShuffle='1', allowRepeat='1', identifier='com.plexapp.plugins.library')
+
+
+class PMS(object):
+    """
+    Runs the stand-in on a background thread
+    """
+    def __init__(self, library, port=0, latency=0, jitter=0):
+        handler = type('BoundHandler', (Handler,), {'library': library, 'latency': latency, 'jitter': jitter})
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def port(self):
+        return self.httpd.server_address[1]
+
+    @property
+    def address(self):
+        return 'http://127.0.0.1:{0}'.format(self.port)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='BENCH-PMS')
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--movies', type=int, default=10000, help='items in the movie section')
+    parser.add_argument('--shows', type=int, default=1000, help='items in the TV show section')
+    parser.add_argument('--latency', type=float, default=0, help='added to every response, in ms')
+    parser.add_argument('--jitter', type=float, default=0, help='+/- random part of the latency, in ms')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    pms = PMS(Library(args.movies, args.shows, args.seed), args.port, args.latency, args.jitter)
+    print('listening on {0}'.format(pms.port))
+    sys.stdout.flush()
+    try:
+        pms.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
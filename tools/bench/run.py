@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark of plexnet against the PMS stand-in (pms.py), run headless through the xbmc shims in shims/.
+
+For every library size it starts a fresh stand-in in a subprocess, then measures in this process:
+  - startup to first hub: server root, library sections and home hubs until the first hub with items
+  - library listing: the library window's titleSort sequence (jumpList for the placeholders, then all chunks), split
+    into fetch, XML parse and object build time per chunk
+  - item: reloading a listed movie, MediaDecisionEngine.chooseMedia, creating a PlayQueue of the section and a
+    timeline report
+  - peak memory of each phase (tracemalloc), with the listing's items kept alive like the window does
+
+usage: run.py [--sizes 1000,10000,100000] [--chunk 240] [--latency 0] [--jitter 0] [--repeat 1]
+              [--addon omega/script.plexmod] [--json results.json]
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+
+
+def setup(addon):
+    """
+    Makes the shims and the addon importable and initializes plexnet the way the addon does
+    """
+    os.environ.setdefault('BENCH_ADDON_PATH', addon)
+    sys.path[:0] = [os.path.join(HERE, 'shims'), addon]
+
+    import xbmcaddon
+    xbmcaddon.ADDON_PATH = addon
+    xbmcaddon.SETTINGS.setdefault('client.ID', 'bench-client')
+
+    import lib  # noqa: F401
+    # sets up the plexnet interface, timer and app
+    from lib import plex  # noqa: F401
+    from plexnet import tracing
+    tracing.TRACER.enabled = True
+
+
+def startPMS(args, size):
+    proc = subprocess.Popen([sys.executable, os.path.join(HERE, 'pms.py'), '--movies', str(size), '--shows',
+                             str(max(1, size // 10)), '--latency', str(args.latency), '--jitter', str(args.jitter)],
+                            stdout=subprocess.PIPE, universal_newlines=True)
+    line = proc.stdout.readline()
+    if not line.startswith('listening on '):
+        proc.kill()
+        raise RuntimeError('PMS stand-in failed to start: {0!r}'.format(line))
+    return proc, 'http://127.0.0.1:{0}'.format(line.split()[-1])
+
+
+def connect(address):
+    from plexnet import plexconnection, plexserver
+
+    conn = plexconnection.PlexConnection(plexconnection.PlexConnection.SOURCE_MANUAL, address, True, 'bench-token',
+                                         skipLocalCheck=True)
+    server = plexserver.createPlexServerForConnection(conn)
+    root = server.query('/')
+    server.uuid = root.attrib.get('machineIdentifier')
+    server.owned = True
+    server.collectDataFromRoot(root)
+    conn.state = conn.STATE_REACHABLE
+    return server
+
+
+class Phase(object):
+    """
+    Times a block and records the peak traced memory allocated within it
+    """
+    def __init__(self, results, name):
+        self.results = results
+        self.name = name
+
+    def __enter__(self):
+        tracemalloc.reset_peak()
+        self.base = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.results[self.name] = time.perf_counter() - self.start
+        self.results[self.name + '_peak_mb'] = (tracemalloc.get_traced_memory()[1] - self.base) / 1048576.0
+
+
+class Steps(object):
+    """
+    Times the steps of a phase into results as <name>_ms
+    """
+    def __init__(self, results):
+        self.results = results
+
+    @contextlib.contextmanager
+    def __call__(self, name):
+        start = time.perf_counter()
+        yield
+        self.results[name + '_ms'] = (time.perf_counter() - start) * 1000
+
+
+def queryTimings(spans):
+    """
+    Returns (fetch, parse) seconds of the plexserver.query spans, parse being the XML parse within them
+    """
+    query = sum(s.duration for s in spans if s.cat == 'plexserver' and s.name == 'query')
+    parse = sum(s.duration for s in spans if s.cat == 'xml')
+    return query - parse, parse
+
+
+def benchStartup(results, address):
+    with Phase(results, 'startup_to_first_hub'):
+        server = connect(address)
+        server.library.sections()
+        hubs = server.hubs(count=20)
+        first = next((hub for hub in hubs if hub.items), None)
+        assert first, 'no hub with items'
+    return server
+
+
+def benchListing(results, section):
+    from plexnet import tracing
+
+    sort = ('titleSort', 'asc')
+    chunks = []
+    kept = []
+    with Phase(results, 'listing'):
+        jumpList = section.jumpList(sort=sort)
+        assert jumpList, 'no jump list'
+        total = sum(ji.size.asInt() for ji in jumpList)
+        for start in range(0, total, results['chunk']):
+            tracing.TRACER.clear()
+            began = time.perf_counter()
+            items = section.all(start, results['chunk'], sort=sort)
+            elapsed = time.perf_counter() - began
+            fetch, parse = queryTimings(tracing.TRACER.spans())
+            chunks.append((fetch, parse, elapsed - fetch - parse))
+            kept.extend(items)
+        # served locally now that the listing is complete
+        began = time.perf_counter()
+        section.jumpList(sort=sort)
+        results['local_jumplist_ms'] = (time.perf_counter() - began) * 1000
+
+    assert len(kept) == total, 'listed {0} of {1} items'.format(len(kept), total)
+    results['chunks'] = len(chunks)
+    for i, name in enumerate(('chunk_fetch', 'chunk_parse', 'chunk_build')):
+        values = sorted(c[i] for c in chunks)
+        results[name + '_avg_ms'] = sum(values) / len(values) * 1000
+        results[name + '_p95_ms'] = values[int(len(values) * .95)] * 1000
+    return kept
+
+
+def benchItem(results, server, section, items):
+    from plexnet import mediadecisionengine, playqueue, plexrequest
+
+    steps = Steps(results)
+    with Phase(results, 'item'):
+        # what the pre-play screen does with a listed item
+        video = items[len(items) // 2]
+        with steps('item_reload'):
+            video.reload(checkFiles=1)
+
+        with steps('item_choose_media'):
+            choice = mediadecisionengine.MediaDecisionEngine().chooseMedia(video)
+        assert choice and choice.media, 'no media choice'
+
+        # the library window's play button; PlayQueue.waitForInitialization polls every 100ms
+        with steps('item_play_queue'):
+            pq = playqueue.createPlayQueueForItem(section, options={'shuffle': False},
+                                                  args={'sort': 'titleSort:asc', 'sourceType': '1'})
+            assert pq and pq.waitForInitialization(), 'play queue not initialized'
+
+        with steps('item_timeline'):
+            request = plexrequest.PlexRequest(server, '/:/timeline?ratingKey={0}&key={1}&state=playing&time=1000'
+                                                      '&duration={2}'.format(video.ratingKey, video.key,
+                                                                             video.duration))
+            request.getToStringWithTimeout(10)
+        assert request.wasOK(), 'timeline report failed'
+
+
+def run(args, size):
+    from plexnet import jumpindex
+
+    proc, address = startPMS(args, size)
+    results = {'size': size, 'chunk': args.chunk}
+    try:
+        # every run starts out cold
+        jumpindex.INDEXES = jumpindex.JumpIndexes()
+        tracemalloc.start()
+        server = benchStartup(results, address)
+        section = [s for s in server.library.sections() if s.TYPE == 'movie'][0]
+        items = benchListing(results, section)
+        benchItem(results, server, section, items)
+        tracemalloc.stop()
+        server.close()
+    finally:
+        proc.kill()
+        proc.wait()
+    return results
+
+
+COLUMNS = (
+    ('size', '{0:>7}'),
+    ('startup_to_first_hub', '{0:>9.0f}', 1000, 'first hub'),
+    ('listing', '{0:>8.2f}', 1, 'listing s'),
+    ('chunks', '{0:>6}'),
+    ('chunk_fetch_avg_ms', '{0:>9.1f}', 1, 'fetch ms'),
+    ('chunk_parse_avg_ms', '{0:>9.1f}', 1, 'parse ms'),
+    ('chunk_build_avg_ms', '{0:>9.1f}', 1, 'build ms'),
+    ('chunk_fetch_p95_ms', '{0:>9.1f}', 1, 'fetch p95'),
+    ('listing_peak_mb', '{0:>9.1f}', 1, 'list MB'),
+    ('item_reload_ms', '{0:>9.1f}', 1, 'reload ms'),
+    ('item_choose_media_ms', '{0:>6.1f}', 1, 'mde ms'),
+    ('item_play_queue_ms', '{0:>6.0f}', 1, 'pq ms'),
+    ('item_timeline_ms', '{0:>8.1f}', 1, 'tl ms'),
+    ('item_peak_mb', '{0:>8.2f}', 1, 'item MB'),
+)
+
+
+def header():
+    return ' '.join((col[3] if len(col) > 3 else col[0]).rjust(len(col[1].format(0))) for col in COLUMNS)
+
+
+def line(row):
+    return ' '.join(col[1].format(row[col[0]] * (col[2] if len(col) > 2 else 1)) for col in COLUMNS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--sizes', default='1000,10000,100000', help='movie section sizes, comma separated')
+    parser.add_argument('--chunk', type=int, default=240, help='library chunk size (libraryChunkSize)')
+    parser.add_argument('--latency', type=float, default=0, help='stand-in response latency, in ms')
+    parser.add_argument('--jitter', type=float, default=0, help='+/- random part of the latency, in ms')
+    parser.add_argument('--repeat', type=int, default=1, help='runs per size, the fastest one is reported')
+    parser.add_argument('--addon', default=os.path.join(ROOT, 'omega', 'script.plexmod'))
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    setup(os.path.abspath(args.addon))
+
+    print(header())
+    rows = []
+    for size in [int(s) for s in args.sizes.split(',')]:
+        runs = [run(args, size) for _ in range(args.repeat)]
+        rows.append(min(runs, key=lambda r: r['listing']))
+        print(line(rows[-1]))
+        sys.stdout.flush()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+"""
+Headless stand-in for kodi_six, handing out the xbmc* shims next to it
+"""
+import xbmc
+import xbmcaddon
+import xbmcgui
+import xbmcplugin
+import xbmcvfs
+
+__all__ = ['xbmc', 'xbmcaddon', 'xbmcgui', 'xbmcplugin', 'xbmcvfs']
@@ -0,0 +1,19 @@
+"""
+Headless stand-in for kodi_six.utils
+"""
+import six
+
+
+def py2_encode(s, encoding='utf-8', errors='strict'):
+    if six.PY2 and isinstance(s, six.text_type):
+        s = s.encode(encoding, errors)
+    return s
+
+
+def py2_decode(s, encoding='utf-8', errors='strict'):
+    if six.PY2 and isinstance(s, bytes):
+        s = s.decode(encoding, errors)
+    return s
+
+
+encode_decode = py2_encode
@@ -0,0 +1,188 @@
+"""
+Headless stand-in for Kodi's xbmc module, just enough for plexnet and lib.util to run outside of Kodi
+"""
+import json
+import os
+import re
+import sys
+import time
+
+LOGDEBUG = 0
+LOGINFO = 1
+LOGWARNING = 2
+LOGERROR = 3
+LOGFATAL = 4
+LOGNONE = 5
+
+ISO_639_1 = 0
+ISO_639_2 = 1
+ENGLISH_NAME = 2
+
+PLAYLIST_MUSIC = 0
+PLAYLIST_VIDEO = 1
+
+# messages at or above this level are written to stderr
+LOG_LEVEL = int(os.environ.get('BENCH_LOG_LEVEL', LOGWARNING))
+
+# answers to Settings.GetSettingValue
+SETTINGS = {
+    'locale.language': 'resource.language.en_gb',
+    'locale.audiolanguage': 'original',
+    'locale.subtitlelanguage': 'original',
+    'locale.timeformat': 'regional',
+    'locale.use24hourclock': 'regional',
+    'locale.shortdateformat': 'regional',
+    'locale.longdateformat': 'regional',
+    'locale.speedunit': 'regional',
+    'locale.temperatureunit': 'regional',
+    'videoplayer.adjustrefreshrate': 0,
+    'videoplayer.usedisplayasclock': False,
+    'subtitles.align': 0,
+    'audiooutput.channels': 1,
+    'audiooutput.passthrough': False,
+    'lookandfeel.skin': 'skin.estuary',
+    'filecache.memorysize': 128,
+    'filecache.readfactor': 400,
+}
+
+INFO_LABELS = {
+    'System.BuildVersion': '21.0 (21.0.0) Git:bench',
+    'System.Memory(free)': '4096MB',
+    'System.Memory(total)': '8192MB',
+}
+
+
+def log(msg, level=LOGDEBUG):
+    if level >= LOG_LEVEL:
+        sys.stderr.write('{0}\n'.format(msg))
+
+
+def _rpc_result(method, params):
+    if method == 'Settings.GetSettingValue':
+        return {'value': SETTINGS.get(params.get('setting'), '')}
+    if method == 'Settings.SetSettingValue':
+        SETTINGS[params.get('setting')] = params.get('value')
+        return True
+    if method == 'Application.GetProperties':
+        return {'version': {'major': 21, 'minor': 0, 'revision': '', 'tag': 'stable'}, 'name': 'Kodi',
+                'volume': 100, 'muted': False}
+    if method == 'JSONRPC.Version':
+        return {'version': {'major': 13, 'minor': 0, 'patch': 0}}
+    if method == 'Player.GetActivePlayers':
+        return []
+    return {}
+
+
+def _rpc_response(request):
+    return {'id': request.get('id', 1), 'jsonrpc': '2.0',
+            'result': _rpc_result(request.get('method'), request.get('params') or {})}
+
+
+def executeJSONRPC(data):
+    request = json.loads(data)
+    if isinstance(request, list):
+        return json.dumps([_rpc_response(r) for r in request])
+    return json.dumps(_rpc_response(request))
+
+
+def executebuiltin(function, wait=False):
+    pass
+
+
+def getCondVisibility(condition):
+    if condition == 'System.GetBool(debug.showloginfo)':
+        # the addon logs everything at LOGINFO, debug messages included
+        return LOG_LEVEL <= LOGINFO
+    return False
+
+
+def getInfoLabel(label):
+    if label == 'System.Time':
+        return time.strftime('%H:%M')
+    if label in INFO_LABELS:
+        return INFO_LABELS[label]
+    match = re.match(r'Window\((\d+)\)\.Property\((.+)\)$', label)
+    if match:
+        import xbmcgui
+        return xbmcgui.Window(int(match.group(1))).getProperty(match.group(2))
+    return ''
+
+
+def getRegion(key):
+    return {'dateshort': '%d/%m/%Y', 'datelong': '%A, %d %B %Y', 'time': '%H:%M:%S', 'meridiem': ''}.get(key, '')
+
+
+def getLanguage(format=ENGLISH_NAME, region=False):
+    return {ISO_639_1: 'en', ISO_639_2: 'eng'}.get(format, 'English')
+
+
+def getSkinDir():
+    return 'skin.estuary'
+
+
+def getUserAgent():
+    return 'Kodi/21.0 (X11; Linux x86_64) Bench'
+
+
+def translatePath(path):
+    from xbmcvfs import translatePath as _translatePath
+    return _translatePath(path)
+
+
+def sleep(ms):
+    time.sleep(ms / 1000.0)
+
+
+def restart():
+    pass
+
+
+def shutdown():
+    pass
+
+
+class Monitor(object):
+    def abortRequested(self):
+        return False
+
+    def waitForAbort(self, timeout=None):
+        if timeout:
+            time.sleep(timeout)
+        return False
+
+
+class Player(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def isPlaying(self):
+        return False
+
+    def isPlayingVideo(self):
+        return False
+
+    def isPlayingAudio(self):
+        return False
+
+    def play(self, *args, **kwargs):
+        pass
+
+    def stop(self):
+        pass
+
+
+class PlayList(object):
+    def __init__(self, playlist):
+        self._items = []
+
+    def clear(self):
+        self._items = []
+
+    def add(self, url, listitem=None, index=-1):
+        self._items.append((url, listitem))
+
+    def size(self):
+        return len(self._items)
+
+    def __len__(self):
+        return len(self._items)
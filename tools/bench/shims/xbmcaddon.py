@@ -0,0 +1,83 @@
+"""
+Headless stand-in for Kodi's xbmcaddon module. Settings start out as the addon's settings.xml defaults and can be
+overridden through SETTINGS.
+"""
+import os
+import re
+from xml.etree import ElementTree
+
+import xbmcvfs
+
+# the addon to run, set by the benchmark before anything imports it
+ADDON_PATH = os.environ.get('BENCH_ADDON_PATH', '')
+SETTINGS = {}
+_defaults = None
+
+
+def _settingsDefaults():
+    global _defaults
+    if _defaults is None:
+        _defaults = {}
+        path = os.path.join(ADDON_PATH, 'resources', 'settings.xml')
+        if os.path.exists(path):
+            for setting in ElementTree.parse(path).iter('setting'):
+                if not setting.get('id'):
+                    continue
+                default = setting.find('default')
+                value = default.text if default is not None else setting.get('default')
+                _defaults[setting.get('id')] = value or ''
+    return _defaults
+
+
+class Addon(object):
+    def __init__(self, id=None):
+        self._info = {'id': 'script.plexmod', 'name': 'PM4K', 'version': '0.0.0'}
+        path = os.path.join(ADDON_PATH, 'addon.xml')
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                head = f.read(2048).decode('utf-8')
+            for key in ('id', 'name', 'version'):
+                match = re.search(r'<addon[^>]*\s{0}="([^"]*)"'.format(key), head)
+                if match:
+                    self._info[key] = match.group(1)
+
+    def getAddonInfo(self, key):
+        if key == 'path':
+            return ADDON_PATH
+        if key == 'profile':
+            return xbmcvfs.translatePath('special://profile/addon_data/{0}/'.format(self._info['id']))
+        return self._info.get(key, '')
+
+    def getLocalizedString(self, id):
+        return ''
+
+    def getSetting(self, key):
+        if key in SETTINGS:
+            return str(SETTINGS[key])
+        return _settingsDefaults().get(key, '')
+
+    def getSettingBool(self, key):
+        return self.getSetting(key).lower() == 'true'
+
+    def getSettingInt(self, key):
+        try:
+            return int(float(self.getSetting(key)))
+        except ValueError:
+            return 0
+
+    def getSettingNumber(self, key):
+        try:
+            return float(self.getSetting(key))
+        except ValueError:
+            return 0.0
+
+    def getSettingString(self, key):
+        return self.getSetting(key)
+
+    def setSetting(self, key, value):
+        SETTINGS[key] = value
+
+    setSettingBool = setSettingInt = setSettingNumber = setSettingString = setSetting
+
+    def openSettings(self):
+        pass
@@ -0,0 +1,110 @@
+"""
+Headless stand-in for Kodi's xbmcgui module, windows only carry properties
+"""
+NOTIFICATION_INFO = 'info'
+NOTIFICATION_WARNING = 'warning'
+NOTIFICATION_ERROR = 'error'
+
+_properties = {}
+
+
+def getCurrentWindowId():
+    return 10000
+
+
+def getCurrentWindowDialogId():
+    return 9999
+
+
+def getScreenWidth():
+    return 1920
+
+
+def getScreenHeight():
+    return 1080
+
+
+class Window(object):
+    def __init__(self, existingWindowId=-1):
+        self._properties = _properties.setdefault(existingWindowId, {})
+
+    def getProperty(self, key):
+        return self._properties.get(key.lower(), '')
+
+    def setProperty(self, key, value):
+        self._properties[key.lower()] = value
+
+    def clearProperty(self, key):
+        self._properties.pop(key.lower(), None)
+
+    def clearProperties(self):
+        self._properties.clear()
+
+
+class WindowXML(Window):
+    def __init__(self, *args, **kwargs):
+        Window.__init__(self)
+
+
+class WindowXMLDialog(WindowXML):
+    pass
+
+
+class ListItem(object):
+    def __init__(self, label='', label2='', path='', offscreen=False):
+        self._label = label
+        self._label2 = label2
+        self._path = path
+        self._properties = {}
+
+    def getLabel(self):
+        return self._label
+
+    def setLabel(self, label):
+        self._label = label
+
+    def getProperty(self, key):
+        return self._properties.get(key.lower(), '')
+
+    def setProperty(self, key, value):
+        self._properties[key.lower()] = value
+
+    def setPath(self, path):
+        self._path = path
+
+    def getPath(self):
+        return self._path
+
+    def setInfo(self, *args, **kwargs):
+        pass
+
+    def setArt(self, *args, **kwargs):
+        pass
+
+
+class Dialog(object):
+    def notification(self, *args, **kwargs):
+        pass
+
+    def ok(self, *args, **kwargs):
+        return True
+
+    def yesno(self, *args, **kwargs):
+        return False
+
+    def select(self, *args, **kwargs):
+        return -1
+
+
+class DialogProgress(object):
+    def create(self, *args, **kwargs):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def iscanceled(self):
+        return False
+
+    def close(self):
+        pass
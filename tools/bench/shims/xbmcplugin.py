@@ -0,0 +1,23 @@
+"""
+Headless stand-in for Kodi's xbmcplugin module
+"""
+
+
+def addDirectoryItem(*args, **kwargs):
+    return True
+
+
+def addDirectoryItems(*args, **kwargs):
+    return True
+
+
+def endOfDirectory(*args, **kwargs):
+    pass
+
+
+def setResolvedUrl(*args, **kwargs):
+    pass
+
+
+def setContent(*args, **kwargs):
+    pass
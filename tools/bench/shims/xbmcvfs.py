@@ -0,0 +1,96 @@
+"""
+Headless stand-in for Kodi's xbmcvfs module, special:// paths map to a scratch directory
+"""
+import os
+import shutil
+import tempfile
+
+ROOT = os.environ.get('BENCH_KODI_HOME') or os.path.join(tempfile.gettempdir(), 'plexmod-bench')
+
+
+def translatePath(path):
+    if path.startswith('special://'):
+        path = os.path.join(ROOT, *path[len('special://'):].split('/'))
+    return path
+
+
+def exists(path):
+    return os.path.exists(translatePath(path))
+
+
+def mkdir(path):
+    path = translatePath(path)
+    if not os.path.isdir(path):
+        os.mkdir(path)
+    return True
+
+
+def mkdirs(path):
+    path = translatePath(path)
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    return True
+
+
+def delete(path):
+    try:
+        os.remove(translatePath(path))
+    except OSError:
+        return False
+    return True
+
+
+def rmdir(path, force=False):
+    path = translatePath(path)
+    if force:
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        os.rmdir(path)
+    return True
+
+
+def copy(source, destination):
+    shutil.copy(translatePath(source), translatePath(destination))
+    return True
+
+
+def rename(source, destination):
+    os.rename(translatePath(source), translatePath(destination))
+    return True
+
+
+def listdir(path):
+    path = translatePath(path)
+    dirs, files = [], []
+    for name in os.listdir(path):
+        (dirs if os.path.isdir(os.path.join(path, name)) else files).append(name)
+    return dirs, files
+
+
+class File(object):
+    def __init__(self, path, mode='r'):
+        self._f = open(translatePath(path), 'wb' if 'w' in mode else 'rb')
+
+    def read(self, *args):
+        return self._f.read(*args).decode('utf-8')
+
+    def readBytes(self, *args):
+        return self._f.read(*args)
+
+    def write(self, data):
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        self._f.write(data)
+        return True
+
+    def size(self):
+        return os.fstat(self._f.fileno()).st_size
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark of marking a season's episodes watched one by one, the way the episodes window's per-episode option does,
+against an in-process PMS stand-in (pms.py) answering /:/scrobble and /library/metadata with the configured latency.
+
+Items of the stand-in's movie section stand in for the episodes and their season. Measured are:
+  - blocking: the path before plexnet.watchstate, a scrobble, a reload of the episode and a reload of the season per
+    episode, all on the calling (UI) thread
+  - queued: Video.setWatched with the season as parent; the time the calling thread is blocked and the time until the
+    queue has sent everything and reloaded the season
+
+Both have to leave all episodes watched on the stand-in.
+
+usage: watchstate.py [--episodes 10] [--latency 20] [--jitter 5] [--repeat 3] [--addon omega/script.plexmod]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pms
+import run as bench
+
+# what the episodes window reloads an episode with
+RELOAD_KW = dict(includeExtras=1, includeExtrasCount=10, includeChapters=1)
+
+
+def reset(library, items):
+    section = library.sections[0]
+    for item in items:
+        section.watched[section.index(int(item.ratingKey))] = False
+        item.reload()
+
+
+def allWatched(library, items):
+    section = library.sections[0]
+    return all(section.watched[section.index(int(item.ratingKey))] for item in items)
+
+
+def blocking(season, episodes):
+    start = time.perf_counter()
+    for episode in episodes:
+        episode.markWatched(**RELOAD_KW)
+        season.reload()
+    return {'blocked': time.perf_counter() - start}
+
+
+def queued(season, episodes):
+    from plexnet import watchstate
+
+    start = time.perf_counter()
+    for episode in episodes:
+        episode.setWatched(True, parents=(season,))
+    blocked = time.perf_counter() - start
+    # the queue is drained once the parents have been reloaded
+    assert watchstate.QUEUE.wait(60), 'queue not drained'
+    return {'blocked': blocked, 'done': time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--episodes', type=int, default=10, help='episodes marked one by one')
+    parser.add_argument('--latency', type=float, default=20, help='stand-in response latency, in ms')
+    parser.add_argument('--jitter', type=float, default=5, help='+/- random part of the latency, in ms')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per path, the fastest one is reported')
+    parser.add_argument('--addon', default=os.path.join(bench.ROOT, 'omega', 'script.plexmod'))
+    args = parser.parse_args()
+
+    bench.setup(os.path.abspath(args.addon))
+
+    library = pms.Library(args.episodes + 1, 1)
+    stand_in = pms.PMS(library, latency=args.latency, jitter=args.jitter).start()
+    results = {}
+    failed = 0
+    try:
+        server = bench.connect(stand_in.address)
+        section = [s for s in server.library.sections() if s.TYPE == 'movie'][0]
+        items = section.all(0, args.episodes + 1)
+        season, episodes = items[0], list(items[1:])
+        season.reload()
+
+        for name, path in (('blocking', blocking), ('queued', queued)):
+            for _ in range(args.repeat):
+                reset(library, episodes)
+                timings = path(season, episodes)
+                if not allWatched(library, episodes):
+                    failed += 1
+                    print('FAIL: {0} left episodes unwatched on the server'.format(name))
+                if name not in results or timings['blocked'] < results[name]['blocked']:
+                    results[name] = timings
+        server.close()
+    finally:
+        stand_in.stop()
+
+    print('{0} episodes, latency {1}+/-{2} ms'.format(args.episodes, args.latency, args.jitter))
+    for name, timings in sorted(results.items()):
+        print('{0:>9}: '.format(name) + ', '.join('{0} {1:.0f} ms'.format(what, timings[what] * 1000)
+                                                  for what in ('blocked', 'done') if what in timings))
+    sys.exit(failed and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
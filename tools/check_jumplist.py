@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Check of the local jump lists of plexnet.jumpindex against the /firstCharacter responses of the PMS stand-in
+(bench/pms.py): after a section of a fixture library has been listed in chunks the way the library window does, the
+jump list built from titleSort must match the one the stand-in served, ascending, descending and unwatched only.
+
+Also checks that the indexes are dropped when they might be outdated: on watch state changes, on library
+notifications and when the periodic re-check finds the server's jump list changed.
+
+usage: check_jumplist.py [addon directory, default: omega/script.plexmod]
+"""
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'tools', 'bench'))
+
+import pms  # noqa: E402
+import run as bench  # noqa: E402
+
+# (movies, seed) of the fixture libraries
+LIBRARIES = ((1, 1), (37, 2), (500, 3), (2500, 4))
+LISTINGS = (
+    ('ascending', dict(sort=('titleSort', 'asc'))),
+    ('descending', dict(sort=('titleSort', 'desc'))),
+    ('unwatched', dict(sort=('titleSort', 'asc'), unwatched=True)),
+)
+CHUNK = 240
+
+
+def groups(jumpList):
+    return jumpList and [(ji.key, ji.size.asInt()) for ji in jumpList]
+
+
+def listAll(section, **kw):
+    """
+    Lists a section like the library window's titleSort path and returns the jump list it started with
+    """
+    jumpList = groups(section.jumpList(**kw))
+    for start in range(0, sum(size for char, size in jumpList or ()), CHUNK):
+        section.all(start, CHUNK, **kw)
+    return jumpList
+
+
+def localJumpList(section, **kw):
+    from plexnet import jumpindex
+
+    key = section.jumpIndexKey(None, kw['sort'], kw.get('unwatched', False), None)
+    return jumpindex.INDEXES.jumpList(key, kw['sort'][1] == 'desc')
+
+
+def waitFor(condition, timeout=10):
+    end = time.time() + timeout
+    while not condition():
+        if time.time() > end:
+            return False
+        time.sleep(.05)
+    return True
+
+
+class Checks(object):
+    def __init__(self):
+        self.failed = 0
+
+    def __call__(self, ok, what):
+        self.failed += not ok
+        print('{0}: {1}'.format(ok and 'OK' or 'FAIL', what))
+
+
+def checkListings(check, section, name):
+    for listing, kw in LISTINGS:
+        served = listAll(section, **kw)
+        local = localJumpList(section, **kw)
+        check(local is not None and served is not None and local == served,
+              '{0}, {1}: local jump list matches /firstCharacter ({2} groups)'.format(name, listing, len(served or ())))
+        check(groups(section.jumpList(**kw)) == served, '{0}, {1}: jumpList() served locally'.format(name, listing))
+
+
+def checkInvalidation(check, server, section):
+    from plexnet import jumpindex, plexapp, plexrequest
+
+    unwatched = dict(sort=('titleSort', 'asc'), unwatched=True)
+    before = listAll(section, **unwatched)
+    video = section.all(0, 1, **unwatched)[0]
+    video.setWatched(True)
+    check(waitFor(lambda: localJumpList(section, **unwatched) is None), 'watch state change drops the index')
+    after = listAll(section, **unwatched)
+    check(sum(n for c, n in after) == sum(n for c, n in before) - 1 and localJumpList(section, **unwatched) == after,
+          'index rebuilt with the watched item gone')
+
+    asc = dict(sort=('titleSort', 'asc'))
+    listAll(section, **asc)
+    plexapp.util.APP.trigger('notifications:changed', server=server, sections={section.key}, onDeck=False)
+    check(localJumpList(section, **asc) is None, 'library notification drops the index')
+
+    # changed on the server without us noticing; the re-check has to catch it
+    listAll(section, **unwatched)
+    video = section.all(0, 1, **unwatched)[0]
+    request = plexrequest.PlexRequest(server, '/:/scrobble?key={0}&identifier=com.plexapp.plugins.library'
+                                              .format(video.ratingKey))
+    request.getToStringWithTimeout(10)
+    check(localJumpList(section, **unwatched) is not None, 'index served before the re-check is due')
+    interval, jumpindex.RECHECK_INTERVAL = jumpindex.RECHECK_INTERVAL, -1
+    try:
+        served = groups(section.jumpList(**unwatched))
+    finally:
+        jumpindex.RECHECK_INTERVAL = interval
+    check(localJumpList(section, **unwatched) is None and served != before,
+          'outdated index dropped on re-check')
+
+
+def main():
+    addon = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, 'omega', 'script.plexmod')
+    bench.setup(os.path.abspath(addon))
+    from plexnet import jumpindex
+
+    check = Checks()
+    for movies, seed in LIBRARIES:
+        stand_in = pms.PMS(pms.Library(movies, 1, seed)).start()
+        try:
+            jumpindex.INDEXES = jumpindex.JumpIndexes()
+            server = bench.connect(stand_in.address)
+            section = [s for s in server.library.sections() if s.TYPE == 'movie'][0]
+            checkListings(check, section, '{0} movies'.format(movies))
+            if movies > CHUNK:
+                checkInvalidation(check, server, section)
+            server.close()
+        finally:
+            stand_in.stop()
+
+    sys.exit(check.failed and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Regression check for the chunked html.parser tokenizer of service.subtitles.subsceneplus: text nodes crossing a
+CHUNK_SIZE boundary must come out whole, the same as with html5lib.
+
+Needs the addon's dependencies (html5lib, cloudscraper2) importable.
+
+usage: check_subscene_parser.py [addon directory, default: omega/service.subtitles.subsceneplus]
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROW = ('<tr><td class="a1"><a href="/subtitles/release/{lang}/{idx}"><span class="l r">{lang}</span>'
+       '<span>{name}</span></a></td><td class="a3">1</td><td class="a40"></td><td class="a5"></td>'
+       '<td class="a6"></td></tr>\n')
+
+
+def build_page(chunk_size, lang, name, straddle):
+    """
+    Builds a result page where the text named by straddle ('lang' or 'name') of the last row crosses chunk_size
+    """
+    head = '<html><body><table><tbody>\n'
+    filler = ROW.format(lang="English", idx=0, name="Filler.Release.720p")
+    last = ROW.format(lang=lang, idx=1, name=name)
+    text = lang if straddle == 'lang' else name
+    # offset of the straddling text within the last row
+    offset = last.index('>{0}<'.format(text)) + 1
+
+    page = head
+    while len(page) + len(filler) + offset < chunk_size - len(text) // 2:
+        page += filler
+    # pad with whitespace, so the middle of the text lands on the boundary
+    page += ' ' * (chunk_size - len(text) // 2 - offset - len(page))
+    page += last + '</tbody></table></body></html>'
+
+    start = page.index(last) + offset
+    assert start < chunk_size < start + len(text), 'text doesn\'t straddle the chunk boundary'
+    return page
+
+
+def main():
+    addon = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, 'omega', 'service.subtitles.subsceneplus')
+    sys.path.insert(0, addon)
+    from resources.lib import Subscene
+
+    service = Subscene.SubsceneSubtitleService("")
+    failed = 0
+    cases = (
+        ('lang', 'English', 'Release.Name.S01E01.1080p.WEB'),
+        ('name', 'English', 'Release.Name.64.1080p.BluRay.x264'),
+    )
+    for straddle, lang, name in cases:
+        page = build_page(Subscene.CHUNK_SIZE, lang, name, straddle)
+        fast = service.subtitles_match(Subscene.fast_stream(page))
+        reference = service.subtitles_match(Subscene.html5lib_stream(page))
+        ok = fast == reference and fast[-1][1] == lang and fast[-1][2] == name
+        failed += not ok
+        print('{0}: {1} straddling {2} -> {3}'.format(ok and 'OK' or 'FAIL', straddle, Subscene.CHUNK_SIZE,
+                                                     fast[-1][1:3]))
+
+    return failed and 1 or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())